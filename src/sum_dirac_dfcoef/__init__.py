@@ -1,2 +1,29 @@
 # If user imports this package, the following code is executed. Otherwise (used as a script), __main__.py is executed.
-from sum_dirac_dfcoef.sum_dirac_dfcoef import main  # noqa: F401
+# The attributes are imported lazily (PEP 562) so that "sum_dirac_dfcoef -v" or "-h" doesn't import the modules to read DIRAC outputs.
+import importlib
+from typing import TYPE_CHECKING, Any, Dict
+
+if TYPE_CHECKING:
+    from sum_dirac_dfcoef.input_deck import DiracInputDeck, read_dirac_input_deck
+    from sum_dirac_dfcoef.options import Options
+    from sum_dirac_dfcoef.sum_dirac_dfcoef import main
+    from sum_dirac_dfcoef.summary import Result, summarize, summarize_steps
+
+__all__ = ["DiracInputDeck", "Options", "Result", "main", "read_dirac_input_deck", "summarize", "summarize_steps"]
+
+_lazy_attributes: Dict[str, str] = {
+    "DiracInputDeck": "sum_dirac_dfcoef.input_deck",
+    "Options": "sum_dirac_dfcoef.options",
+    "Result": "sum_dirac_dfcoef.summary",
+    "main": "sum_dirac_dfcoef.sum_dirac_dfcoef",
+    "read_dirac_input_deck": "sum_dirac_dfcoef.input_deck",
+    "summarize": "sum_dirac_dfcoef.summary",
+    "summarize_steps": "sum_dirac_dfcoef.summary",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _lazy_attributes:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    return getattr(importlib.import_module(_lazy_attributes[name]), name)
@@ -1,6 +1,11 @@
 import argparse
 import os
+import shlex
 import sys
+from pathlib import Path
+from typing import List, Tuple
+
+from sum_dirac_dfcoef.options import Options
 
 
 class PrintVersionExitAction(argparse.Action):
@@ -31,21 +36,51 @@ class PrintHelpArgumentParser(argparse.ArgumentParser):
         self.exit(2, err_msg)
 
 
-def parse_args() -> "argparse.Namespace":
-    parser = PrintHelpArgumentParser(
-        description="Summarize the coefficients from DIRAC output file that *PRIVEC option is used. (c.f. http://www.diracprogram.org/doc/master/manual/analyze/privec.html)"
-    )
-    parser.add_argument(
-        "-i", "--input", type=str, required=True, help="(required) file path of DIRAC output. Please quote if the path include spaces.", dest="input", metavar='"INPUT"'
-    )
-    parser.add_argument(
-        "-o",
-        "--output",
-        type=str,
-        help="File path of sum_dirac_dfcoef output. Default: sum_dirac_dfcoef.out. Please quote if the path include spaces.",
-        dest="output",
-        metavar='"OUTPUT"',
-    )
+class VariantArgumentParser(argparse.ArgumentParser):
+    """Parse the options of --variant option. Errors are raised as ValueError to report them with the --variant option."""
+
+    def error(self, message):
+        raise ValueError(message)
+
+
+def create_variant_parser() -> VariantArgumentParser:
+    """Create the parser of the write options which can be set for each --variant option (the same meanings as the command line options)."""
+    parser = VariantArgumentParser(prog="--variant", add_help=False)
+    parser.add_argument("-g", "--for-generator", action="store_true", dest="for_generator")
+    parser.add_argument("-c", "--compress", action="store_true", dest="compress")
+    parser.add_argument("-t", "--threshold", type=float, default=0.1, dest="threshold")
+    parser.add_argument("-d", "--decimal", type=int, default=5, choices=range(1, 16), dest="decimal")
+    parser.add_argument("--ignore-atom-num", action="store_true", dest="ignore_atom_num")
+    parser.add_argument("--ignore-ml", action="store_true", dest="ignore_ml")
+    parser.add_argument("--ignore-sym", action="store_true", dest="ignore_sym")
+    parser.add_argument("-a", "--all-write", action="store_true", dest="all_write")
+    parser.add_argument("-p", "--positronic-write", action="store_true", dest="positronic_write")
+    parser.add_argument("--no-sort", action="store_true", dest="no_sort")
+    parser.add_argument("--group-by", type=str, dest="group_by")
+    return parser
+
+
+def parse_variant_spec(parser: argparse.ArgumentParser, args: "argparse.Namespace", variant_spec: str) -> "Tuple[str, argparse.Namespace]":
+    """Parse the argument of --variant option (e.g. "uo2.d15.out=-d 15 -t 1.0") into the output path and the arguments of the variant.
+
+    The write options of the variant are the default values unless they are set in variant_spec,
+    and the other options (e.g. --energy-window, --atoms) are the same as args.
+    """
+    output, separator, options_str = variant_spec.partition("=")
+    if separator == "" or output.strip() == "":
+        parser.error(f'--variant must be OUTPUT=OPTIONS (e.g. "uo2.d15.out=-d 15 -t 1.0"), but got {variant_spec}.')
+    try:
+        write_args = create_variant_parser().parse_args(shlex.split(options_str))
+    except ValueError as e:
+        parser.error(f"--variant {variant_spec}: {e}")
+    # Overwrite all write options of args with the values (or the default values) of the variant
+    variant_args = argparse.Namespace(**{**vars(args), **vars(write_args)})
+    variant_args.variants = None
+    return output.strip(), variant_args
+
+
+def add_summary_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the arguments shared by the single-file mode and the batch mode."""
     parser.add_argument(
         "-g",
         "--for-generator",
@@ -63,7 +98,8 @@ This option is equivalent to set -c/--compress and not set -p/--positronic and -
         const=-1,
         default=1,
         help="Number of parallel processes. Default: 1 (single process).\
-        If you set -j option without argument, the number of parallel processes is set to the number of CPU cores(=os.cpu_count()).",
+        If you set -j option without argument, the number of parallel processes is set to the number of CPU cores(=os.cpu_count()).\
+        With -g/--for-generator option, the header information is read by another process while the Vector print section is read.",
         dest="parallel",
     )
     parser.add_argument(
@@ -130,33 +166,231 @@ This options is useful when you want to use the result in a spreadsheet like Mic
     )
     parser.add_argument("--debug", action="store_true", help="print debug output (Normalization constant, Sum of kramers pair coefficient)", dest="debug")
     parser.add_argument("--no-sort", action="store_true", help="Don't sort the output by kramers pair energy")
-    # If -v or --version option is used, print version and exit
-    args = parser.parse_args()
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Follow the DIRAC output that is still being written (like tail -f).\
+            Each MO is printed to stdout as soon as its coefficients are completed,\
+            and the output file is written when the Vector print section ends (or when you press Ctrl+C).\
+            This option cannot be used with -j/--parallel.",
+        dest="follow",
+    )
+    parser.add_argument(
+        "--follow-interval",
+        type=float,
+        default=1.0,
+        help="Polling interval in seconds used with --follow option. Default: 1.0",
+        dest="follow_interval",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=0,
+        help="Write a checkpoint of reading the Vector print section at most every CHECKPOINT_INTERVAL seconds\
+            to OUTPUT.checkpoint (OUTPUT is the path of -o/--output). Default: 0 (no checkpoint).\
+            The checkpoint is removed when the Vector print section has been read to the end.\
+            This option cannot be used with -j/--parallel.",
+        dest="checkpoint_interval",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue reading the DIRAC output from OUTPUT.checkpoint written by --checkpoint-interval option.\
+            The result is the same as the result without interruption.\
+            If the checkpoint cannot be used, the DIRAC output is read from the beginning.\
+            This option cannot be used with -j/--parallel.",
+        dest="resume",
+    )
+    parser.add_argument(
+        "--energy-window",
+        type=float,
+        nargs=2,
+        help="Only read and write the kramers pairs whose energy is in [EMIN, EMAX] (Hartree). (e.g.) --energy-window -1.0 0.5\
+            The coefficients of the other kramers pairs are skipped without being parsed.\
+            With -g/--for-generator option, the other electronic kramers pairs are written without coefficients.",
+        dest="energy_window",
+        metavar=("EMIN", "EMAX"),
+    )
+    parser.add_argument(
+        "--mo-range",
+        type=str,
+        nargs="+",
+        help="Only read and write the kramers pairs whose eigenvalue number is in FIRST..LAST for the symmetry type SYM.\
+            (e.g.) --mo-range E1g:10..20 E1u:8..18\
+            The kramers pairs of the symmetry types which are not specified are not written.\
+            The eigenvalue numbers of electronic and positronic kramers pairs are counted separately as in the DIRAC output.",
+        dest="mo_range",
+        metavar="SYM:FIRST..LAST",
+    )
+    parser.add_argument(
+        "--symmetry",
+        type=str,
+        help="Only read and write the kramers pairs of the comma separated symmetry types. (e.g.) --symmetry E1g,E1u",
+        dest="symmetry",
+        metavar="SYM[,SYM...]",
+    )
+    parser.add_argument(
+        "--moltra-active-only",
+        action="store_true",
+        help="Only read the coefficients of the electronic kramers pairs within the **MOLTRA > .ACTIVE ranges (and --moltra-margin).\
+            The other kramers pairs are written without coefficients, and the header information is the same as without this option.\
+            This option can be used only with -g/--for-generator option.",
+        dest="moltra_active_only",
+    )
+    parser.add_argument(
+        "--moltra-margin",
+        type=int,
+        default=0,
+        help="Number of kramers pairs added to both sides of each **MOLTRA > .ACTIVE range used with --moltra-active-only option. Default: 0",
+        dest="moltra_margin",
+    )
+    parser.add_argument(
+        "--header-only",
+        action="store_true",
+        help="Only write the header information for dcaspt2_input_generator (electron number, point group, **MOLTRA ranges and the number of orbitals)\
+            without reading the Vector print section. The **MOLTRA > .ACTIVE ENERGY ranges are calculated from the eigenvalues of the SCF calculation.\
+            This option can be used only with -g/--for-generator option.",
+        dest="header_only",
+    )
+    parser.add_argument(
+        "--atoms",
+        type=str,
+        help="Only summarize the coefficients of the comma separated atom labels. (e.g.) --atoms Cm,N\
+            The other atomic orbitals are only used to calculate the normalization constant, so the percentages are the same as without this option.",
+        dest="atoms",
+        metavar="ATOM[,ATOM...]",
+    )
+    parser.add_argument(
+        "--shells",
+        type=str,
+        help="Only summarize the coefficients of the comma separated azimuthal labels. (e.g.) --shells d,f\
+            The other atomic orbitals are only used to calculate the normalization constant, so the percentages are the same as without this option.",
+        dest="shells",
+        metavar="SHELL[,SHELL...]",
+    )
+    parser.add_argument(
+        "--all-steps",
+        action="store_true",
+        help="Summarize every Vector print section of the DIRAC output (e.g. each step of a geometry optimization or a scan) in one pass.\
+            The result of the N-th Vector print section is written to OUTPUT_NAME.stepN.OUTPUT_SUFFIX (e.g. sum_dirac_dfcoef.step1.out)\
+            with the eigenvalues of the last SCF calculation before it.",
+        dest="all_steps",
+    )
+    parser.add_argument(
+        "--group-by",
+        type=str,
+        help="Write the coefficients grouped by each of the comma separated levels (label, atom+shell, atom, shell) to OUTPUT_NAME.LEVEL.OUTPUT_SUFFIX\
+            (e.g. sum_dirac_dfcoef.atom+shell.out) from the same coefficients without reading the DIRAC output again.\
+            label: the same labels as without this option, atom+shell: atom and azimuthal labels, atom: atom labels, shell: azimuthal labels.\
+            The atom numbers are kept unless --ignore-atom-num option is set. (e.g.) --group-by label,atom+shell,atom,shell",
+        dest="group_by",
+        metavar="LEVEL[,LEVEL...]",
+    )
+
 
+def parse_args() -> "argparse.Namespace":
+    """Parse the command line arguments (sys.argv).
+
+    This function is called only by the sum_dirac_dfcoef command. Use sum_dirac_dfcoef.Options to call sum_dirac_dfcoef from Python.
+    The returned args.options is the Options converted from the arguments.
+    """
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        return parse_batch_args(sys.argv[2:])
+
+    parser = PrintHelpArgumentParser(
+        description="Summarize the coefficients from DIRAC output file that *PRIVEC option is used. (c.f. http://www.diracprogram.org/doc/master/manual/analyze/privec.html)",
+        epilog="Use 'sum_dirac_dfcoef batch -h' to see how to summarize many DIRAC outputs in one invocation.",
+    )
+    parser.add_argument(
+        "-i",
+        "--input",
+        type=str,
+        required=True,
+        help="(required) file path of DIRAC output. gzip, bz2 and xz compressed DIRAC outputs are decompressed while reading. \
+Please quote if the path include spaces.",
+        dest="input",
+        metavar='"INPUT"',
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help="File path of sum_dirac_dfcoef output. Default: sum_dirac_dfcoef.out. \
+If the path ends with .gz, .bz2 or .xz, the output is compressed in that format. Please quote if the path include spaces.",
+        dest="output",
+        metavar='"OUTPUT"',
+    )
+    add_summary_arguments(parser)
+    parser.add_argument(
+        "--variant",
+        type=str,
+        action="append",
+        help='Also write OUTPUT with the write options OPTIONS from the same coefficients without reading the DIRAC output again.\
+            This option can be set multiple times. (e.g.) --variant "uo2.d15.out=-d 15" --variant "uo2.g.out=-g -t 1.0"\
+            OPTIONS can include -g, -c, -t, -d, --ignore-atom-num, --ignore-ml, --ignore-sym, -a, -p, --no-sort and --group-by options,\
+            and the options not in OPTIONS are the default values. The other options (e.g. --energy-window) are the same as the main output.',
+        dest="variant_specs",
+        metavar='"OUTPUT=OPTIONS"',
+    )
+    # If -v or --version option is used, print version and exit
+    args = parser.parse_args(sys.argv[1:])
+    args.batch = False
     args.parallel = os.cpu_count() if args.parallel == -1 else args.parallel
+    args.variants = None if args.variant_specs is None else [parse_variant_spec(parser, args, variant_spec) for variant_spec in args.variant_specs]
+    if args.variants is not None:
+        output_paths = [Path(output).expanduser().resolve() for output in [args.output or "sum_dirac_dfcoef.out"] + [output for output, _ in args.variants]]
+        if len(set(output_paths)) != len(output_paths):
+            parser.error("The outputs of --variant options must be different from each other and from the output of -o/--output option.")
 
-    # -g and -p, --no-scf options are exclusive
-    if args.for_generator and args.positronic_write:
-        msg = "-g/--for-generator and -p/--positronic-write options cannot be set at the same time \
-because dcaspt2_input_generator needs data of electronic orbitals."
-        parser.error(msg)
-    if args.for_generator and args.no_scf:
-        msg = "-g/--for-generator and --no-scf options cannot be set at the same time \
-because dcaspt2_input_generator needs eigenvalues information after SCF calculation."
-        parser.error(msg)
+    return validate_summary_args(parser, args)
 
-    if args.for_generator:
-        args.no_scf = False
-        args.compress = True
-        args.positronic_write = False
 
-    if not (args.no_scf or args.positronic_write) and args.compress:
-        args.for_generator = True
+def parse_batch_args(argv: List[str]) -> "argparse.Namespace":
+    parser = PrintHelpArgumentParser(
+        prog="sum_dirac_dfcoef batch",
+        description="Summarize many DIRAC output files in one invocation. \
+The files are processed in a process pool (the number of processes is set by -j/--parallel), largest file first, \
+and one sum_dirac_dfcoef output is written for each DIRAC output.",
+    )
+    parser.add_argument(
+        "inputs",
+        type=str,
+        nargs="+",
+        help="File paths or glob patterns (e.g. 'outputs/*.out') of DIRAC outputs. Please quote glob patterns to expand them by this program. \
+Tar archives (.tar, .tar.gz, .tgz, .tar.bz2, .tar.xz) are read as a stream without extracting them to disk, and their *.out members are summarized.",
+        metavar='"INPUT"',
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        type=str,
+        default=".",
+        help="Directory of sum_dirac_dfcoef outputs. The output of INPUT_NAME.out is written to OUTPUT_DIR/INPUT_NAME.sum_dirac_dfcoef.out. \
+Default: current directory.",
+        dest="output_dir",
+        metavar='"OUTPUT_DIR"',
+    )
+    add_summary_arguments(parser)
+    args = parser.parse_args(argv)
+    args.batch = True
+    args.input = None
+    args.output = None
+    args.variants = None
+    # In the batch mode, -j/--parallel sets the number of DIRAC outputs processed at the same time,
+    # and each DIRAC output is read by a single process.
+    args.batch_parallel = os.cpu_count() if args.parallel == -1 else args.parallel
+    args.parallel = 1
 
-    if args.all_write and args.positronic_write:
-        parser.error("-a/--all-write and -p/--positronic-write options cannot be set at the same time.")
+    if args.follow:
+        parser.error("--follow option cannot be used in the batch mode.")
 
-    return args
+    return validate_summary_args(parser, args)
 
 
-args = parse_args()
+def validate_summary_args(parser: argparse.ArgumentParser, args: "argparse.Namespace") -> "argparse.Namespace":
+    """Convert args to Options and set it to args.options (an invalid combination of the options is reported by parser.error)"""
+    try:
+        args.options = Options.from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
@@ -2,9 +2,7 @@ from collections import OrderedDict
 from typing import Optional, Set
 from typing import OrderedDict as ODict
 
-from pydantic import BaseModel, validator
-
-from sum_dirac_dfcoef.subshell import subshell_order
+from sum_dirac_dfcoef.subshell import Subshell, get_subshell_order
 
 
 class FuncIndices:
@@ -83,12 +81,11 @@ func_idx_dirac21: {self.func_idx_dirac21}, func_idx_dirac19: {self.func_idx_dira
         return OrderedDict({k: v for k, v in self.functions.items() if v > 0})
 
 
-class AtomicOrbital(BaseModel, validate_assignment=True):
+class AtomicOrbital:
     """Class for handling the information of the atomic orbital.
 
     Raises:
         ValueError: Raises an error if the subshell is not in the subshell_order.
-        ValueError: Raises an error if the subshell is not one character.
 
     Attributes:
         atom (str): The label of the atom. (e.g. "C", "H", "He")
@@ -96,38 +93,37 @@ class AtomicOrbital(BaseModel, validate_assignment=True):
         gto_type (str): The label of the GTO type. (e.g. "s", "px", "dxy", "fxxx")
     """
 
-    atom: str = ""
-    subshell: str = "s"
-    gto_type: str = "s"
+    __slots__ = ("atom", "subshell", "gto_type")
 
-    @validator("subshell")
-    def validate_subshell(cls, v: str) -> str:  # noqa: N805 (pydantic method)
-        if v not in subshell_order.orbital_labels:
-            msg = f"subshell must be one of '{subshell_order.orbital_labels}', but got '{v}'"
-            raise ValueError(msg)
-        if len(v) != 1:
-            msg = f"subshell must be one character, but got '{v}'"
-            raise ValueError(msg)
-        return v
+    atom: str
+    subshell: str
+    gto_type: str
+
+    def __init__(self, atom: str = "", subshell: str = "s", gto_type: str = "s") -> None:
+        self.update(atom, subshell, gto_type)
 
-    def reset(self):
-        self.atom = ""
-        self.subshell = "s"
-        self.gto_type = "s"
+    def __repr__(self) -> str:
+        return f"AtomicOrbital(atom: {self.atom}, subshell: {self.subshell}, gto_type: {self.gto_type})"
+
+    def reset(self) -> None:
+        self.update("", "s", "s")
 
-    def update(self, atom: str, subshell: str, gto_type: str):
+    def update(self, atom: str, subshell: str, gto_type: str) -> None:
+        if subshell not in get_subshell_order().orbital_label_rank:
+            msg = f"subshell must be one of '{Subshell.orbital_labels}', but got '{subshell}'"
+            raise ValueError(msg)
         self.atom = atom
         self.subshell = subshell
         self.gto_type = gto_type
 
 
-class AtomicOrbitals(BaseModel, validate_assignment=True):
+class AtomicOrbitals:
     """Class for handling the information of the atomic orbitals.
 
     Main purpose of this class is to check if the current ao and the previous ao are the same atom.
 
     Attributes:
-        prev_ao (AtomicOrbital): The previous atomic orbital.
+        prev_ao (AtomicOrbital): The first atomic orbital of the current atom.
         current_ao (AtomicOrbital): The current atomic orbital.
         idx_within_same_atom (int): The index of the order of atoms in the same AtomLabel.
         function_types (Set[str]): The set of function types.
@@ -137,12 +133,23 @@ class AtomicOrbitals(BaseModel, validate_assignment=True):
         is_different_atom: Check if the current ao and the previous ao are the same atom.
     """
 
-    prev_ao: AtomicOrbital = AtomicOrbital()
-    current_ao: AtomicOrbital = AtomicOrbital()
-    idx_within_same_atom: int = 1
-    function_types: Set[str] = set()
+    __slots__ = ("prev_ao", "current_ao", "idx_within_same_atom", "function_types")
 
-    def reset(self):
+    prev_ao: AtomicOrbital
+    current_ao: AtomicOrbital
+    idx_within_same_atom: int
+    function_types: Set[str]
+
+    def __init__(self) -> None:
+        self.prev_ao = AtomicOrbital()
+        self.current_ao = AtomicOrbital()
+        self.idx_within_same_atom = 1
+        self.function_types = set()
+
+    def __repr__(self) -> str:
+        return f"AtomicOrbitals(prev_ao: {self.prev_ao}, current_ao: {self.current_ao}, idx_within_same_atom: {self.idx_within_same_atom})"
+
+    def reset(self) -> None:
         self.prev_ao.reset()
         self.current_ao.reset()
         self.idx_within_same_atom = 1
@@ -150,20 +157,19 @@ class AtomicOrbitals(BaseModel, validate_assignment=True):
 
     def is_different_atom(self, function_label: str) -> bool:
         def is_reverse_subshell() -> bool:
-            prev_subshell_idx = subshell_order.orbital_labels.index(self.prev_ao.subshell)
-            current_subshell_idx = subshell_order.orbital_labels.index(self.current_ao.subshell)
-            if prev_subshell_idx > current_subshell_idx:
-                return True
-            elif prev_subshell_idx < current_subshell_idx:
-                return False
-            else:  # Same subshell
-                subshell_idx = subshell_order.orbital_labels.index(self.prev_ao.subshell)
-                prev_gto_idx = subshell_order.gto_label_order[subshell_idx].index(self.prev_ao.gto_type)
-                current_gto_idx = subshell_order.gto_label_order[subshell_idx].index(self.current_ao.gto_type)
-                if prev_gto_idx > current_gto_idx:  # reverse subshell. e.g. self.prev_ato.gto_type = "pz", self.current_ao.gto_type = "px"
-                    return True
-                else:
-                    return False
+            subshell_order = get_subshell_order()
+            prev_subshell_rank = subshell_order.orbital_label_rank[self.prev_ao.subshell]
+            current_subshell_rank = subshell_order.orbital_label_rank[self.current_ao.subshell]
+            if prev_subshell_rank != current_subshell_rank:
+                return prev_subshell_rank > current_subshell_rank
+            # Same subshell
+            gto_label_rank = subshell_order.gto_label_rank[self.prev_ao.subshell]
+            try:
+                # reverse subshell. e.g. self.prev_ao.gto_type = "pz", self.current_ao.gto_type = "px"
+                return gto_label_rank[self.prev_ao.gto_type] > gto_label_rank[self.current_ao.gto_type]
+            except KeyError as e:
+                msg = f"Unknown GTO type: {e}, the GTO type of the subshell {self.prev_ao.subshell} must be one of {list(gto_label_rank)}"
+                raise ValueError(msg) from e
 
         if self.prev_ao.atom != self.current_ao.atom:
             return True
@@ -177,6 +183,3 @@ class AtomicOrbitals(BaseModel, validate_assignment=True):
             # Different atom
             return True
         return False  # Same atom
-
-
-ao = AtomicOrbitals()
@@ -0,0 +1,208 @@
+import argparse
+import concurrent.futures
+import glob
+import io
+import os
+import sys
+import tarfile
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sum_dirac_dfcoef.options import Options
+from sum_dirac_dfcoef.sum_dirac_dfcoef import write_summary
+from sum_dirac_dfcoef.utils import get_output_compression
+
+OUTPUT_SUFFIX = ".sum_dirac_dfcoef.out"
+TAR_ARCHIVE_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+# Members of the tar archive with this suffix are read as DIRAC outputs
+TAR_MEMBER_SUFFIX = ".out"
+# Number of the DIRAC outputs submitted to the process pool per process before the previous ones are completed
+MAX_PENDING_JOBS_PER_PROCESS = 2
+
+
+class BatchJob:
+    """A DIRAC output summarized in the batch mode.
+
+    Attributes:
+        label (str): Name of the DIRAC output shown in the messages (e.g. outputs/UO2.out, campaign.tar.gz:UO2/UO2.out)
+        dirac_filepath (Path): File path of the DIRAC output (or the tar archive if member_bytes is not None)
+        output_path (Path): File path of the sum_dirac_dfcoef output
+        member_bytes (Optional[bytes]): Contents of the DIRAC output read from the tar archive (None if the DIRAC output is a file)
+    """
+
+    label: str
+    dirac_filepath: Path
+    output_path: Path
+    member_bytes: Optional[bytes]
+
+    def __init__(self, label: str, dirac_filepath: Path, output_path: Path, member_bytes: Optional[bytes] = None) -> None:
+        self.label = label
+        self.dirac_filepath = dirac_filepath
+        self.output_path = output_path
+        self.member_bytes = member_bytes
+
+    def __repr__(self) -> str:
+        return f"BatchJob(label: {self.label}, output_path: {self.output_path})"
+
+
+def get_batch_dirac_filepaths(inputs: List[str]) -> List[Path]:
+    """Expand inputs (file paths or glob patterns) into the file paths of DIRAC outputs.
+
+    Returns:
+        List[Path]: File paths of DIRAC outputs sorted by file size (largest first)
+            so that the longest jobs are started first and the process pool is not left waiting for a straggler.
+    """
+    dirac_filepaths: List[Path] = []
+    for pattern in inputs:
+        expanded = sorted(glob.glob(os.path.expanduser(pattern)))
+        if len(expanded) == 0:
+            # Not a glob pattern or no match. Report it as a missing file later.
+            expanded = [pattern]
+        for path_str in expanded:
+            path = Path(path_str).expanduser().resolve()
+            if path not in dirac_filepaths:
+                dirac_filepaths.append(path)
+    for path in dirac_filepaths:
+        if not path.exists():
+            sys.exit(f"ERROR: DIRAC output file is not found. file={path}")
+        elif path.is_dir():
+            sys.exit(f"ERROR: The path you specified as the DIRAC output is a directory. Not a file. path={path}")
+    return sorted(dirac_filepaths, key=lambda path: path.stat().st_size, reverse=True)
+
+
+def get_batch_output_dir(output_dir_str: str) -> Path:
+    output_dir = Path(output_dir_str).expanduser().resolve()
+    if output_dir.exists() and not output_dir.is_dir():
+        sys.exit(f"ERROR: The path you specified as the output directory is not a directory. path={output_dir}")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    return output_dir
+
+
+def get_batch_output_paths(dirac_filepaths: List[Path], output_dir: Path) -> List[Path]:
+    """Get the sum_dirac_dfcoef output path for each DIRAC output (e.g. outputs/UO2.out => OUTPUT_DIR/UO2.sum_dirac_dfcoef.out)
+
+    The compression suffix of the DIRAC output is removed first (e.g. outputs/UO2.out.gz => OUTPUT_DIR/UO2.sum_dirac_dfcoef.out)
+    """
+    output_paths = [output_dir / (get_uncompressed_path(dirac_filepath).stem + OUTPUT_SUFFIX) for dirac_filepath in dirac_filepaths]
+    for output_path in set(output_paths):
+        if output_paths.count(output_path) > 1:
+            duplicated = [str(p) for p, o in zip(dirac_filepaths, output_paths) if o == output_path]
+            sys.exit(f"ERROR: The following DIRAC outputs would be written to the same file {output_path}. Please rename them.\n" + "\n".join(duplicated))
+    return output_paths
+
+
+def is_tar_archive(path: Path) -> bool:
+    return path.name.lower().endswith(TAR_ARCHIVE_SUFFIXES)
+
+
+def iter_tar_members(archive_path: Path) -> Iterator[Tuple[str, bytes]]:
+    """Read the DIRAC outputs (regular files named *.out) in the tar archive in one streaming pass.
+
+    The tar archive is opened in the stream mode, so the compressed tar archive is decompressed only once
+    and the members are not extracted to disk.
+
+    Yields:
+        Tuple[str, bytes]: Name and contents of each DIRAC output in the order of the tar archive
+    """
+    with tarfile.open(archive_path, "r|*") as tar:
+        for member in tar:
+            if not member.isfile() or not member.name.endswith(TAR_MEMBER_SUFFIX):
+                continue
+            member_file = tar.extractfile(member)
+            if member_file is not None:
+                yield member.name, member_file.read()
+
+
+def iter_batch_jobs(dirac_filepaths: List[Path], output_dir: Path) -> Iterator[BatchJob]:
+    """Iterate over the DIRAC outputs given as files first, then the members of the tar archives.
+
+    The members of the tar archives are read lazily, so only the members which are being summarized are kept in memory.
+    (e.g. campaign.tar.gz:UO2/UO2.out => OUTPUT_DIR/UO2.sum_dirac_dfcoef.out)
+    """
+    file_paths = [path for path in dirac_filepaths if not is_tar_archive(path)]
+    for dirac_filepath, output_path in zip(file_paths, get_batch_output_paths(file_paths, output_dir)):
+        yield BatchJob(str(dirac_filepath), dirac_filepath, output_path)
+    for archive_path in (path for path in dirac_filepaths if is_tar_archive(path)):
+        for member_name, member_bytes in iter_tar_members(archive_path):
+            output_path = output_dir / (PurePosixPath(member_name).stem + OUTPUT_SUFFIX)
+            yield BatchJob(f"{archive_path}:{member_name}", archive_path, output_path, member_bytes)
+
+
+def get_uncompressed_path(dirac_filepath: Path) -> Path:
+    return dirac_filepath.with_suffix("") if get_output_compression(dirac_filepath) is not None else dirac_filepath
+
+
+def summarize_one(job: BatchJob, options: Options) -> Optional[str]:
+    """Summarize one DIRAC output in the batch mode.
+
+    Returns:
+        Optional[str]: None if succeeded, otherwise the error message
+    """
+    try:
+        if job.member_bytes is not None:
+            # The member of the tar archive is summarized in memory
+            write_summary(io.TextIOWrapper(io.BytesIO(job.member_bytes), encoding="utf-8"), job.output_path, options)
+        else:
+            write_summary(job.dirac_filepath, job.output_path, options)
+    except SystemExit as e:
+        return str(e.code)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+def run_batch(args: argparse.Namespace, options: Options) -> None:
+    """Summarize all DIRAC outputs given by args.inputs.
+
+    Each DIRAC output is read by one process and the outputs are processed in parallel by args.batch_parallel processes.
+    The members of the tar archives are read by this process and sent to the process pool while the tar archive is being read,
+    and at most MAX_PENDING_JOBS_PER_PROCESS members per process are kept in memory.
+    A failure of a DIRAC output does not stop the others. This program exits with non-zero status if any of them failed.
+    """
+    dirac_filepaths = get_batch_dirac_filepaths(args.inputs)
+    output_dir = get_batch_output_dir(args.output_dir)
+    # (label, output_path) of the submitted jobs (the contents of the tar members are not kept after they are summarized)
+    submitted: List[Tuple[str, Path]] = []
+    errors: Dict[str, str] = {}
+
+    def iter_new_jobs() -> Iterator[BatchJob]:
+        for job in iter_batch_jobs(dirac_filepaths, output_dir):
+            if any(job.output_path == output_path for _, output_path in submitted):
+                # The file outputs are already checked by get_batch_output_paths, so this is a member of a tar archive
+                errors[job.label] = f"The DIRAC output would be written to the same file {job.output_path} as another DIRAC output. Please rename it."
+                continue
+            submitted.append((job.label, job.output_path))
+            yield job
+
+    has_tar_archive = any(is_tar_archive(path) for path in dirac_filepaths)
+    num_processes = int(args.batch_parallel) if has_tar_archive else min(int(args.batch_parallel), len(dirac_filepaths))
+    if num_processes > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=num_processes) as executor:
+            future_to_label: Dict[concurrent.futures.Future, str] = {}
+
+            def collect(futures: Iterable[concurrent.futures.Future]) -> None:
+                for future in futures:
+                    error = future.result()
+                    if error is not None:
+                        errors[future_to_label[future]] = error
+                    del future_to_label[future]
+
+            for job in iter_new_jobs():
+                if len(future_to_label) >= num_processes * MAX_PENDING_JOBS_PER_PROCESS:
+                    done, _ = concurrent.futures.wait(future_to_label, return_when=concurrent.futures.FIRST_COMPLETED)
+                    collect(done)
+                future_to_label[executor.submit(summarize_one, job, options)] = job.label
+            collect(concurrent.futures.as_completed(list(future_to_label)))
+    else:
+        for job in iter_new_jobs():
+            error = summarize_one(job, options)
+            if error is not None:
+                errors[job.label] = error
+
+    for label, output_path in submitted:
+        if label not in errors:
+            print(f"{label} => {output_path}")
+    if len(errors) > 0:
+        for label, error in errors.items():
+            print(f"ERROR: Failed to summarize {label}\n{error}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,175 @@
+import hashlib
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from sum_dirac_dfcoef.data import DataAllMO
+from sum_dirac_dfcoef.options import Options
+from sum_dirac_dfcoef.utils import debug_print
+
+if TYPE_CHECKING:
+    from sum_dirac_dfcoef.privec_reader import PrivecProcessor
+
+FINGERPRINT_SIZE = 4096
+
+
+def get_checkpoint_path(output_path: Path) -> Path:
+    return output_path.with_name(output_path.name + ".checkpoint")
+
+
+def get_parse_options(options: Options) -> Dict[str, Any]:
+    # The options that change the data stored in the checkpoint
+    return {
+        "compress": options.compress,
+        "for_generator": options.for_generator,
+        "electronic": options.should_write_electronic(),
+        "positronic": options.should_write_positronic(),
+        "energy_window": options.energy_window,
+        "mo_range": options.mo_range,
+        "symmetry": options.symmetry,
+        "moltra_active_only": options.moltra_active_only,
+        "moltra_margin": options.moltra_margin,
+        "atoms": options.atoms,
+        "shells": options.shells,
+    }
+
+
+def get_fingerprint(dirac_filepath: Path, byte_offset: int) -> str:
+    """Get the fingerprint of the DIRAC output before byte_offset.
+
+    The first and the last FINGERPRINT_SIZE bytes before byte_offset are used,
+    so that the checkpoint can be used even if the DIRAC output has grown after the checkpoint was written.
+    """
+    sha256 = hashlib.sha256()
+    with open(dirac_filepath, "rb") as f:
+        sha256.update(f.read(min(FINGERPRINT_SIZE, byte_offset)))
+        f.seek(max(0, byte_offset - FINGERPRINT_SIZE))
+        sha256.update(f.read(byte_offset - f.tell()))
+    return sha256.hexdigest()
+
+
+class PrivecCheckpoint:
+    """This class stores the state of PrivecProcessor just after a MO has been read.
+
+    Attributes:
+        byte_offset (int): Byte offset of the DIRAC output from which reading is continued
+        fingerprint (str): Fingerprint of the DIRAC output before byte_offset
+        parse_options (Dict[str, Any]): Options that change the stored data
+        data_all_mo (DataAllMO): Results of the MOs which have already been read
+        mo_sym_type (str): Symmetry type of the MO which is read next
+        eigenvalue_no (int): Eigenvalue number of the last MO
+        mo_cnt (int): Number of MOs which have already been read
+    """
+
+    byte_offset: int
+    fingerprint: str
+    parse_options: Dict[str, Any]
+    data_all_mo: DataAllMO
+    mo_sym_type: str
+    eigenvalue_no: int
+    mo_cnt: int
+
+    def __init__(
+        self,
+        byte_offset: int,
+        fingerprint: str,
+        parse_options: Dict[str, Any],
+        data_all_mo: DataAllMO,
+        mo_sym_type: str,
+        eigenvalue_no: int,
+        mo_cnt: int,
+    ) -> None:
+        self.byte_offset = byte_offset
+        self.fingerprint = fingerprint
+        self.parse_options = parse_options
+        self.data_all_mo = data_all_mo
+        self.mo_sym_type = mo_sym_type
+        self.eigenvalue_no = eigenvalue_no
+        self.mo_cnt = mo_cnt
+
+    def __repr__(self) -> str:
+        return f"PrivecCheckpoint(byte_offset: {self.byte_offset}, mo_sym_type: {self.mo_sym_type}, eigenvalue_no: {self.eigenvalue_no}, mo_cnt: {self.mo_cnt})"
+
+
+def load_checkpoint(checkpoint_path: Path, dirac_filepath: Path, options: Options) -> Optional[PrivecCheckpoint]:
+    """Load the checkpoint if it can be used to continue reading dirac_filepath.
+
+    Returns:
+        Optional[PrivecCheckpoint]: None if the checkpoint does not exist or cannot be used
+    """
+    if not checkpoint_path.exists():
+        print(f"The checkpoint file {checkpoint_path} is not found. Start reading the DIRAC output from the beginning.")
+        return None
+    with open(checkpoint_path, "rb") as f:
+        checkpoint: PrivecCheckpoint = pickle.load(f)  # noqa: S301
+    if checkpoint.parse_options != get_parse_options(options):
+        print(f"The checkpoint file {checkpoint_path} was written with different options. Start reading the DIRAC output from the beginning.")
+        return None
+    if os.path.getsize(dirac_filepath) < checkpoint.byte_offset or get_fingerprint(dirac_filepath, checkpoint.byte_offset) != checkpoint.fingerprint:
+        print(f"The checkpoint file {checkpoint_path} was written for another DIRAC output. Start reading the DIRAC output from the beginning.")
+        return None
+    debug_print(f"Resume from {checkpoint}")
+    return checkpoint
+
+
+class CheckpointWriter:
+    """This class writes the checkpoints of PrivecProcessor periodically.
+
+    Attributes:
+        checkpoint_path (Path): Path of the checkpoint file
+        dirac_filepath (Path): Path of the DIRAC output
+        interval (float): Minimum interval between the checkpoints (seconds)
+        last_time (float): The time when the last checkpoint was written
+        line_idx (int): Index of the line (counted from the first line read by PrivecProcessor) where self.reader is located
+        reader: Text file object of the DIRAC output used to convert the line index to the byte offset
+    """
+
+    def __init__(self, checkpoint_path: Path, dirac_filepath: Path, interval: float, start_byte_offset: int = 0) -> None:
+        self.checkpoint_path = checkpoint_path
+        self.dirac_filepath = dirac_filepath
+        self.interval = interval
+        self.last_time = time.monotonic()
+        self.line_idx = 0
+        self.reader = open(dirac_filepath, encoding="utf-8")
+        self.reader.seek(start_byte_offset)
+
+    def get_byte_offset(self, line_idx: int) -> int:
+        # readline() is used instead of iteration because tell() cannot be used during iteration
+        while self.line_idx < line_idx:
+            self.reader.readline()
+            self.line_idx += 1
+        return self.reader.tell()
+
+    def write_if_needed(self, line_idx: int, privec_processor: "PrivecProcessor") -> None:
+        """Write the checkpoint if the interval has passed since the last checkpoint.
+
+        Args:
+            line_idx (int): Index of the next line to read (counted from the first line read by PrivecProcessor)
+            privec_processor (PrivecProcessor): PrivecProcessor just after a MO has been read
+        """
+        if time.monotonic() - self.last_time < self.interval:
+            return
+        byte_offset = self.get_byte_offset(line_idx)
+        checkpoint = PrivecCheckpoint(
+            byte_offset,
+            get_fingerprint(self.dirac_filepath, byte_offset),
+            get_parse_options(privec_processor.options),
+            privec_processor.data_all_mo,
+            privec_processor.mo_sym_type,
+            privec_processor.data_mo.eigenvalue_no,
+            privec_processor.mo_cnt,
+        )
+        # Write to the temporary file first not to break the previous checkpoint if this program is killed while writing
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.checkpoint_path)
+        debug_print(f"Write {checkpoint}")
+        self.last_time = time.monotonic()
+
+    def close(self, remove: bool) -> None:
+        self.reader.close()
+        if remove and self.checkpoint_path.exists():
+            self.checkpoint_path.unlink()
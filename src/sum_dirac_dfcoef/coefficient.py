@@ -53,6 +53,19 @@ idx_within_same_atom: {self.idx_within_same_atom}, \
 multiplication: {self.multiplication})"
 
 
+def get_coefficient_value(line_str: str) -> float:
+    """Get the sum of the squares of the 4 coefficients (real and imaginary parts of the alpha and beta components) of the line."""
+    # COEF (4F14.10)
+    # coefficients = [line_str[24:38], line_str[38:52], line_str[52:66], line_str[66:80]]
+    coef_num = 4
+    coef_len = 14
+    coef_start_idx = 24
+    return sum(
+        pow(float(line_str[i : i + coef_len]) if is_float(line_str[i : i + coef_len]) else -100, 2)
+        for i in range(coef_start_idx, coef_start_idx + coef_len * coef_num, coef_len)
+    )
+
+
 def get_coefficient(line_str: str, orbitals: FunctionsInfo, idx_within_same_atom: int) -> Coefficient:
     """
     This function parses the line that contains the coefficient and returns the Coefficient object.
@@ -94,15 +107,7 @@ def get_coefficient(line_str: str, orbitals: FunctionsInfo, idx_within_same_atom
         azimuthal_label = line_str[18:19].strip().replace(" ", "")  # NAMN (e.g. "Ag U  dzz   " => "d")
         magnetic_label = line_str[19:22].strip().replace(" ", "")  # GTOTYP (e.g. "Ag U  dzz " => "zz")
 
-        # COEF (4F14.10)
-        # coefficients = [line_str[24:38], line_str[38:52], line_str[52:66], line_str[66:80]]
-        coef_num = 4
-        coef_len = 14
-        coef_start_idx = 24
-        coefficient = sum(
-            pow(float(line_str[i : i + coef_len]) if is_float(line_str[i : i + coef_len]) else -100, 2)
-            for i in range(coef_start_idx, coef_start_idx + coef_len * coef_num, coef_len)
-        )
+        coefficient = get_coefficient_value(line_str)
 
         need_identifier = (
             True if len(orbitals[component_func][symmetry_label][atom_label]) > 1 or orbitals[component_func][symmetry_label][atom_label][idx_within_same_atom].mul > 1 else False
@@ -1,14 +1,26 @@
 from collections import OrderedDict
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 from typing import OrderedDict as ODict
 
-from sum_dirac_dfcoef.args import args
 from sum_dirac_dfcoef.coefficient import Coefficient
 
 
+def get_mo_info(sym_type: str, eigenvalue_no: int, is_electronic: bool, compress: bool) -> str:
+    """Get the MO information written to the output file (e.g. "E1g 22" if compress, otherwise "Electronic no. 22 E1g")"""
+    if compress:
+        return f"{sym_type} {eigenvalue_no}"
+    return f"{'Electronic' if is_electronic else 'Positronic'} no. {eigenvalue_no} {sym_type}"
+
+
 class CoefKey:
     """This class is used to store the key of the coefficient dictionary.
 
+    The key always holds every label of the coefficient (the finest-grained aggregation).
+    The --ignore-* options are applied afterwards by CoefKey.reduce, so that any combination of them
+    can be computed from the same stored data without reading the DIRAC output again.
+    The symmetry-equivalent atoms have the same coefficients, so they are stored once
+    as the key of the first atom with the multiplicity, and expanded to the key of each atom by DataMO.group_coefficients.
+
     Attributes:
         atom_label (str): The atom label to identify the vector.
         azimuthal_label (str): The azimuthal quantum number label to identify the vector.
@@ -17,6 +29,8 @@ class CoefKey:
         atom_index (int): The atom index to identify the vector.
         symmetry_label (str): The symmetry label to identify the vector.
         magnetic_label (str): The magnetic quantum number label to identify the vector.
+        multiplication (int): The number of the symmetry-equivalent atoms from atom_idx which have the same coefficient.
+                              This field is not a part of the key because it is determined by the other labels.
     """
 
     atom_label: str
@@ -25,14 +39,29 @@ class CoefKey:
     atom_idx: int
     symmetry_label: str
     magnetic_label: str
+    multiplication: int = 1
+
+    def __init__(
+        self,
+        atom_label: str = "",
+        azimuthal_label: str = "",
+        need_identifier: bool = False,
+        atom_idx: int = -1,
+        symmetry_label: str = "",
+        magnetic_label: str = "",
+        multiplication: int = 1,
+    ) -> None:
+        self.atom_label = atom_label
+        self.azimuthal_label = azimuthal_label
+        self.need_identifier = need_identifier
+        self.atom_idx = atom_idx
+        self.symmetry_label = symmetry_label
+        self.magnetic_label = magnetic_label
+        self.multiplication = multiplication
 
-    def __init__(self, atom_idx: int, coef: Coefficient) -> None:
-        self.atom_label = coef.atom_label
-        self.azimuthal_label = coef.azimuthal_label
-        self.need_identifier = coef.need_identifier
-        self.atom_idx = -1 if args.ignore_atom_num else atom_idx
-        self.symmetry_label = "" if args.ignore_sym else coef.symmetry_label
-        self.magnetic_label = "" if args.ignore_ml else coef.magnetic_label
+    @classmethod
+    def from_coefficient(cls, coef: Coefficient) -> "CoefKey":
+        return cls(coef.atom_label, coef.azimuthal_label, coef.need_identifier, coef.idx_within_same_atom, coef.symmetry_label, coef.magnetic_label, coef.multiplication)
 
     def __repr__(self) -> str:
         return f"CoefKey(atom_label: {self.atom_label}, \
@@ -40,7 +69,8 @@ azimuthal_label: {self.azimuthal_label}, \
 need_identifier: {self.need_identifier}, \
 atom_idx: {self.atom_idx}, \
 symmetry_label: {self.symmetry_label}, \
-magnetic_label: {self.magnetic_label})"
+magnetic_label: {self.magnetic_label}, \
+multiplication: {self.multiplication})"
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, CoefKey):
@@ -56,6 +86,40 @@ magnetic_label: {self.magnetic_label})"
     def __hash__(self) -> int:
         return hash((self.atom_label, self.azimuthal_label, self.atom_idx, self.symmetry_label, self.magnetic_label))
 
+    def reduce(self, ignore_atom_num: bool, ignore_ml: bool, ignore_sym: bool, ignore_atom: bool = False, ignore_shell: bool = False) -> "CoefKey":
+        """Return the key with the ignored labels removed.
+
+        ignore_atom removes the atom label and the atom number (used by --group-by shell),
+        and ignore_shell removes the azimuthal and the magnetic labels (used by --group-by atom).
+
+        (e.g.) CoefKey(atom_label: U, azimuthal_label: d, atom_idx: 1, symmetry_label: Ag, magnetic_label: zz).reduce(False, True, True)
+               => CoefKey(atom_label: U, azimuthal_label: d, atom_idx: 1, symmetry_label: "", magnetic_label: "")
+        """
+        if not (ignore_atom_num or ignore_ml or ignore_sym or ignore_atom or ignore_shell):
+            return self
+        return CoefKey(
+            "" if ignore_atom else self.atom_label,
+            "" if ignore_shell else self.azimuthal_label,
+            False if ignore_atom else self.need_identifier,
+            -1 if ignore_atom_num or ignore_atom else self.atom_idx,
+            "" if ignore_sym else self.symmetry_label,
+            "" if ignore_ml or ignore_shell else self.magnetic_label,
+            1 if ignore_atom_num or ignore_atom else self.multiplication,
+        )
+
+    def expand_atoms(self) -> "List[CoefKey]":
+        """Return the key of each symmetry-equivalent atom.
+
+        (e.g.) CoefKey(atom_label: O, azimuthal_label: s, atom_idx: 1, symmetry_label: Ag, magnetic_label: "", multiplication: 2).expand_atoms()
+               => [CoefKey(atom_label: O, ..., atom_idx: 1, ..., multiplication: 1), CoefKey(atom_label: O, ..., atom_idx: 2, ..., multiplication: 1)]
+        """
+        if self.multiplication == 1:
+            return [self]
+        return [
+            CoefKey(self.atom_label, self.azimuthal_label, self.need_identifier, self.atom_idx + idx, self.symmetry_label, self.magnetic_label)
+            for idx in range(self.multiplication)
+        ]
+
 
 class DataMO:
     """This class is used to store the specific MO coefficient information.
@@ -67,7 +131,12 @@ class DataMO:
         sym_type (str): The symmetry type of the MO. (e.g. "E1g")
         eigenvalue_no (int): The eigenvalue number of the MO.
         coef_dict (ODict[CoefKey, float]): The dictionary of the coefficients of the MO.
-                                           It is sorted before printing to the file by calling the filter_coefficients_by_threshold method.
+                                           Stores the finest-grained aggregation (per symmetry, atom, index, azimuthal and magnetic label),
+                                           but the symmetry-equivalent atoms are stored once (see CoefKey.multiplication).
+                                           Use the get_coefficients method to get the grouped, filtered and sorted coefficients.
+        coef_rows (List[Tuple[CoefKey, float]]): The key and the coefficient of each row of the Vector print section in the order of the DIRAC output.
+                                                 The --ignore-* options add them to the grouped keys in this order,
+                                                 to get the same sums as adding each row to the grouped key while reading the DIRAC output.
     """
 
     norm_const_sum: float = 0.0
@@ -76,6 +145,7 @@ class DataMO:
     sym_type: str = ""
     eigenvalue_no: int = 0
     coef_dict: ODict[CoefKey, float]
+    coef_rows: List[Tuple[CoefKey, float]]
 
     def __init__(
         self,
@@ -84,23 +154,35 @@ class DataMO:
         eigenvalue_no: int = 0,
         sym_type: str = "",
         coef_dict: Optional[ODict[CoefKey, float]] = None,
+        coef_rows: Optional[List[Tuple[CoefKey, float]]] = None,
     ) -> None:
         self.mo_info = mo_info
         self.mo_energy = mo_energy
         self.eigenvalue_no = eigenvalue_no
         self.sym_type = sym_type
         self.coef_dict = coef_dict if coef_dict is not None else OrderedDict()
+        self.coef_rows = coef_rows if coef_rows is not None else []
 
     def __repr__(self) -> str:
         return f"DataMO(mo_info: {self.mo_info}, mo_energy: {self.mo_energy}, eigenvalue_no: {self.eigenvalue_no}, mo_sym_type: {self.sym_type}, coef_dict: {self.coef_dict})"
 
-    def add_coefficient(self, atom_idx: int, coef: Coefficient) -> None:
-        key = CoefKey(atom_idx, coef)
+    def add_coefficient(self, coef: Coefficient) -> None:
+        key = CoefKey.from_coefficient(coef)
         if key in self.coef_dict:
             self.coef_dict[key] += coef.coefficient
         else:
             self.coef_dict[key] = coef.coefficient
-        self.norm_const_sum += coef.coefficient
+        self.coef_rows.append((key, coef.coefficient))
+        self.add_norm_const(coef.coefficient, coef.multiplication)
+
+    def add_norm_const(self, coefficient: float, multiplication: int = 1) -> None:
+        """Add the coefficient of multiplication symmetry-equivalent atoms to the normalization constant.
+
+        The contribution of each atom is added in turn (not coefficient * multiplication),
+        to get the same normalization constant as adding them per atom.
+        """
+        for _ in range(multiplication):
+            self.norm_const_sum += coefficient
 
     def reset(self):
         self.norm_const_sum = 0.0
@@ -108,10 +190,89 @@ class DataMO:
         self.mo_info = ""
         self.eigenvalue_no = 0
         self.coef_dict.clear()
+        self.coef_rows.clear()
 
-    def filter_coefficients_by_threshold(self) -> None:
-        self.coef_dict = OrderedDict((key, coef) for key, coef in self.coef_dict.items() if abs(coef / self.norm_const_sum * 100) >= args.threshold)
-        self.coef_dict = OrderedDict(sorted(self.coef_dict.items(), key=lambda x: x[1], reverse=True))
+    def group_coefficients(
+        self, ignore_atom_num: bool = False, ignore_ml: bool = False, ignore_sym: bool = False, ignore_atom: bool = False, ignore_shell: bool = False
+    ) -> "ODict[CoefKey, float]":
+        """Group the finest-grained coefficients by the labels which are not ignored (see CoefKey.reduce).
+
+        The order of the keys is the order in which they first appear in the DIRAC output.
+        The symmetry-equivalent atoms are expanded to the key of each atom unless ignore_atom_num or ignore_atom is True.
+        """
+        grouped: ODict[CoefKey, float] = OrderedDict()
+        if not (ignore_atom_num or ignore_ml or ignore_sym or ignore_atom or ignore_shell):
+            # self.coef_dict already has the sum of the rows of each key
+            for key, coef in self.coef_dict.items():
+                for atom_key in key.expand_atoms():
+                    grouped[atom_key] = coef
+            return grouped
+        if ignore_atom_num or ignore_atom:
+            # The atom index is ignored, so the contributions of the symmetry-equivalent atoms are added to the same key without expanding them.
+            # They are added once per atom (not coef * multiplication) in the same way as DataMO.add_norm_const
+            reduced_keys = {key: key.reduce(ignore_atom_num, ignore_ml, ignore_sym, ignore_atom, ignore_shell) for key in self.coef_dict}
+            for key, coef in self.coef_rows:
+                reduced_key = reduced_keys[key]
+                for _ in range(key.multiplication):
+                    grouped[reduced_key] = grouped.get(reduced_key, 0.0) + coef
+            return grouped
+        # Add each row to the grouped keys in the order of the DIRAC output (not the sum of self.coef_dict) to get the same sums as the ungrouped rows
+        atom_reduced_keys = {key: [atom_key.reduce(ignore_atom_num, ignore_ml, ignore_sym, ignore_atom, ignore_shell) for atom_key in key.expand_atoms()] for key in self.coef_dict}
+        for key, coef in self.coef_rows:
+            for reduced_key in atom_reduced_keys[key]:
+                grouped[reduced_key] = grouped.get(reduced_key, 0.0) + coef
+        return grouped
+
+    def get_coefficients(
+        self, threshold: float, ignore_atom_num: bool = False, ignore_ml: bool = False, ignore_sym: bool = False, ignore_atom: bool = False, ignore_shell: bool = False
+    ) -> "ODict[CoefKey, float]":
+        """Get the coefficients grouped by the labels which are not ignored,
+        filtered by the threshold (%) and sorted by the coefficient in descending order.
+        """
+        grouped = self.group_coefficients(ignore_atom_num, ignore_ml, ignore_sym, ignore_atom, ignore_shell)
+        filtered = [(key, coef) for key, coef in grouped.items() if abs(coef / self.norm_const_sum * 100) >= threshold]
+        return OrderedDict(sorted(filtered, key=lambda x: x[1], reverse=True))
+
+
+class NonPrintedMO:
+    """This class is used to store the electronic MO which is not found in the Vector print data (e.g. outside the .PRIVEC range).
+
+    Only the eigenvalue is known for this MO, so it has no coefficients.
+    This class is much smaller than DataMO because a DIRAC output can have thousands of such MOs,
+    and mo_info is created only when the MO is written to the output file.
+
+    Attributes:
+        sym_type (str): The symmetry type of the MO. (e.g. "E1g")
+        eigenvalue_no (int): The eigenvalue number of the MO.
+        mo_energy (float): The energy of the MO.
+        compress (bool): Whether mo_info is written in the compressed format or not.
+    """
+
+    __slots__ = ("sym_type", "eigenvalue_no", "mo_energy", "compress")
+
+    sym_type: str
+    eigenvalue_no: int
+    mo_energy: float
+    compress: bool
+    norm_const_sum = 0.0
+
+    def __init__(self, sym_type: str, eigenvalue_no: int, mo_energy: float, compress: bool) -> None:
+        self.sym_type = sym_type
+        self.eigenvalue_no = eigenvalue_no
+        self.mo_energy = mo_energy
+        self.compress = compress
+
+    def __repr__(self) -> str:
+        return f"NonPrintedMO(mo_info: {self.mo_info}, mo_energy: {self.mo_energy}, eigenvalue_no: {self.eigenvalue_no}, mo_sym_type: {self.sym_type})"
+
+    @property
+    def mo_info(self) -> str:
+        return get_mo_info(self.sym_type, self.eigenvalue_no, True, self.compress)
+
+    def get_coefficients(  # noqa: ARG002
+        self, threshold: float, ignore_atom_num: bool = False, ignore_ml: bool = False, ignore_sym: bool = False, ignore_atom: bool = False, ignore_shell: bool = False
+    ) -> "ODict[CoefKey, float]":
+        return OrderedDict()
 
 
 class DataAllMO:
@@ -120,16 +281,25 @@ class DataAllMO:
     This class holds information used for output excluding header information.
 
     Attributes:
-        electronic (List[DataMO]): The list of the electronic MO data.
+        electronic (List[Union[DataMO, NonPrintedMO]]): The list of the electronic MO data.
+                                                        NonPrintedMO is used for the MOs which are not found in the Vector print data.
         positronic (List[DataMO]): The list of the positronic MO data.
+        electronic_sym_slices (Dict[str, slice]): The range of each symmetry type in self.electronic.
+                                                  This index is only valid while self.electronic is sorted by the symmetry type
+                                                  (it is created by sort_mo_sym_type and cleared by sort_mo_energy).
+        is_sorted_by_sym_type (bool): Whether self.electronic is sorted by sort_mo_sym_type (and not sorted by sort_mo_energy after that)
     """
 
-    electronic: List[DataMO]
+    electronic: List[Union[DataMO, NonPrintedMO]]
     positronic: List[DataMO]
+    electronic_sym_slices: Dict[str, slice]
+    is_sorted_by_sym_type: bool
 
-    def __init__(self, electronic: Optional[List[DataMO]] = None, positronic: Optional[List[DataMO]] = None) -> None:
+    def __init__(self, electronic: Optional[List[Union[DataMO, NonPrintedMO]]] = None, positronic: Optional[List[DataMO]] = None) -> None:
         self.electronic = electronic if electronic is not None else []
         self.positronic = positronic if positronic is not None else []
+        self.electronic_sym_slices = {}
+        self.is_sorted_by_sym_type = False
 
     def __repr__(self) -> str:
         return f"DataAllMO(electronic: {self.electronic}, positronic: {self.positronic})"
@@ -137,7 +307,31 @@ class DataAllMO:
     def sort_mo_sym_type(self) -> None:
         self.electronic.sort(key=lambda mo: (mo.sym_type, mo.mo_energy))
         self.positronic.sort(key=lambda mo: (mo.sym_type, mo.mo_energy))
+        self.create_electronic_sym_slices()
+        self.is_sorted_by_sym_type = True
 
     def sort_mo_energy(self) -> None:
         self.electronic.sort(key=lambda mo: mo.mo_energy)
         self.positronic.sort(key=lambda mo: mo.mo_energy)
+        self.electronic_sym_slices.clear()
+        self.is_sorted_by_sym_type = False
+
+    def create_electronic_sym_slices(self) -> None:
+        """Create the range of each symmetry type in self.electronic (self.electronic must be sorted by the symmetry type)"""
+        self.electronic_sym_slices.clear()
+        start_idx = 0
+        for idx in range(1, len(self.electronic) + 1):
+            if idx == len(self.electronic) or self.electronic[idx].sym_type != self.electronic[start_idx].sym_type:
+                self.electronic_sym_slices[self.electronic[start_idx].sym_type] = slice(start_idx, idx)
+                start_idx = idx
+
+    def get_electronic_sym_slice(self, symmetry_type: str) -> slice:
+        """Get the range of symmetry_type in self.electronic (an empty slice if there is no MO of symmetry_type)
+
+        Raises:
+            ValueError: If self.electronic is not sorted by sort_mo_sym_type
+        """
+        if not self.is_sorted_by_sym_type:
+            msg = "DataAllMO.electronic must be sorted by sort_mo_sym_type() before getting the range of the symmetry type."
+            raise ValueError(msg)
+        return self.electronic_sym_slices.get(symmetry_type, slice(0, 0))
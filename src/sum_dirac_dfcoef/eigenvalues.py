@@ -1,21 +1,18 @@
 import re
+from array import array
 from collections import OrderedDict
 from enum import Enum, auto
-from io import TextIOWrapper
-from typing import Dict, List, Optional, Tuple
+from itertools import repeat
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from typing import OrderedDict as ODict
 
-from sum_dirac_dfcoef.utils import (
-    debug_print,
-    delete_dirac_input_comment_out,
-    is_dirac_input_keyword,
-    is_dirac_input_line_should_be_skipped,
-    is_dirac_input_section_one_star,
-    is_end_dirac_input_field,
-    is_start_dirac_input_field,
-    space_separated_parsing,
-    space_separated_parsing_upper,
-)
+from sum_dirac_dfcoef.input_deck import DiracInputDeck
+from sum_dirac_dfcoef.utils import debug_print, space_separated_parsing
+
+
+# An eigenvalue and its degeneracy printed in the SCF section (e.g. "-775.202926514  ( 2)")
+# https://gitlab.com/dirac/dirac/-/blob/364663fd2bcc419e41ad01703fd782889435b576/src/dirac/dirout.F#L1043
+EIGENVALUE_DEGENERACY_PATTERN = re.compile(r"(-?[0-9]+\.?[0-9]+) *\( *([0-9]+)\)")
 
 
 class StageEigenvalues(Enum):
@@ -27,15 +24,6 @@ class StageEigenvalues(Enum):
     WAIT_END = auto()
 
 
-class StageEIGPRI(Enum):
-    INIT = auto()
-    SEARCH_SCF_SECTION = auto()
-    SEARCH_SCF_DETAIL_SECTION = auto()
-    SEARCH_EIGPRI = auto()
-    NEXT_LINE_EIGPRI = auto()
-    WAIT_END = auto()
-
-
 # type definition eigenvalues.shell_num
 # type shell_num = {
 #     "E1g": {
@@ -58,23 +46,23 @@ class Eigenvalues:
 
     Attributes:
         shell_num (ODict[str, Dict[str, int]]): The number of closed, open, and virtual orbitals for each symmetry type.
-        energies (ODict[str, Dict[int, float]]): The eigenvalues for each symmetry type.
-        energies_used (ODict[str, Dict[int, bool]]): The flag to check whether a specified index eigenvalue exists in the Vector print data or not.
-                                                     Set to True if the eigenvalue is found in the Vector print data.
-                                                     (read Vector print data at PrivecProcessor.read_privec_data_wrapper() method)
-                                                     This flag is used when filling the eigenvalues info which is not found in the Vector print data.
+        energies (ODict[str, array]): The eigenvalues for each symmetry type. energies[symmetry_type][eigenvalue_no - 1] is the eigenvalue of eigenvalue_no.
+        energies_used (ODict[str, bytearray]): The bitset to check whether a specified index eigenvalue exists in the Vector print data or not.
+                                               The bit (eigenvalue_no - 1) is set if the eigenvalue is found in the Vector print data.
+                                               (set by PrivecProcessor.complete_data_all_mo() after reading the Vector print data)
+                                               This flag is used when filling the eigenvalues info which is not found in the Vector print data.
 
     """
 
     shell_num: ODict[str, Dict[str, int]]
-    energies: ODict[str, Dict[int, float]]
-    energies_used: ODict[str, Dict[int, bool]]
+    energies: "ODict[str, array[float]]"
+    energies_used: ODict[str, bytearray]
 
     def __init__(
         self,
         shell_num: Optional[ODict[str, Dict[str, int]]] = None,
-        energies: Optional[ODict[str, Dict[int, float]]] = None,
-        energies_used: Optional[ODict[str, Dict[int, bool]]] = None,
+        energies: "Optional[ODict[str, array[float]]]" = None,
+        energies_used: Optional[ODict[str, bytearray]] = None,
     ) -> None:
         self.shell_num = shell_num if shell_num is not None else OrderedDict()
         self.energies = energies if energies is not None else OrderedDict()
@@ -85,13 +73,42 @@ class Eigenvalues:
 
     def setdefault(self, key: str):
         self.shell_num.setdefault(key, {"closed": 0, "open": 0, "virtual": 0, "negative": 0, "positronic": 0})
-        self.energies.setdefault(key, {})
-        self.energies_used.setdefault(key, {})
+        self.energies.setdefault(key, array("d"))
+        self.energies_used.setdefault(key, bytearray())
+
+    def get_eigenvalue_num(self, symmetry_type: str) -> int:
+        return len(self.energies[symmetry_type])
+
+    def get_energy(self, symmetry_type: str, eigenvalue_no: int) -> float:
+        return self.energies[symmetry_type][eigenvalue_no - 1]
+
+    def get_sorted_energies(self, symmetry_type: str) -> "array[float]":
+        """Get the eigenvalues of symmetry_type in ascending order (the eigenvalues are usually printed in ascending order, so they are not copied in that case)"""
+        energies = self.energies[symmetry_type]
+        if all(energies[i] <= energies[i + 1] for i in range(len(energies) - 1)):
+            return energies
+        return array("d", sorted(energies))
+
+    def set_energy_used(self, symmetry_type: str, eigenvalue_no: int) -> None:
+        bit = eigenvalue_no - 1
+        self.energies_used[symmetry_type][bit >> 3] |= 1 << (bit & 7)
+
+    def is_energy_used(self, symmetry_type: str, eigenvalue_no: int) -> bool:
+        bit = eigenvalue_no - 1
+        return bool(self.energies_used[symmetry_type][bit >> 3] & (1 << (bit & 7)))
+
+    def get_unused_eigenvalue_nos(self, symmetry_type: str) -> Iterator[int]:
+        return (eigenvalue_no for eigenvalue_no in range(1, self.get_eigenvalue_num(symmetry_type) + 1) if not self.is_energy_used(symmetry_type, eigenvalue_no))
+
+    def reset_energies_used(self) -> None:
+        for key in self.energies.keys():
+            num = len(self.energies[key])
+            self.energies_used[key] = bytearray((num + 7) // 8)
 
     def get_electronic_spinor_num(self, symmetry_type: str) -> int:
         return self.shell_num[symmetry_type]["closed"] + self.shell_num[symmetry_type]["open"] + self.shell_num[symmetry_type]["virtual"]
 
-    def get_eigenvalues(self, dirac_output: TextIOWrapper):
+    def get_eigenvalues(self, dirac_output: Iterable[str]):
         def is_end_of_read(line) -> bool:
             return True if "HOMO - LUMO" in line else False
 
@@ -164,9 +181,8 @@ class Eigenvalues:
                 if item not in occ_idx.keys():
                     msg = f"Cannot find {item} in occ_idx.keys()!, occ_idx.keys(): {occ_idx.keys()}"
                     raise ValueError(msg)
-                val = omega[current_symmetry_type][item][occ_idx[item]]
-                idx = len(self.energies[current_symmetry_type]) + 1
-                self.energies[current_symmetry_type][idx] = val
+                val = omega[current_symmetry_type][item][occ_idx[item] - 1]
+                self.energies[current_symmetry_type].append(val)
                 occ_idx[item] += 1
 
         def create_splitted_by_slash2_list(line: str) -> List[str]:
@@ -186,38 +202,23 @@ class Eigenvalues:
             return omega_list
 
         def read_eigenvalues(line: str) -> None:
-            start_idx = 0
-            while True:
-                # e.g. -775.202926514  ( 2) => -775.202926514
-                regex = r"[-]?[0-9]+\.?[0-9]+"
-                match = re.search(regex, line[start_idx:])
-                if match is None:
-                    break
-                val = float(match.group())
-
-                # e.g. -775.202926514  ( 2) => 2
-                regex = r"\([ ]*[0-9]+\)"
-                match = re.search(regex, line[start_idx:])
-                if match is None:
-                    break
-                # match.group() == ( 2) => [1 : len(match.group()) - 1] == 2
-                num = int(match.group()[1 : len(match.group()) - 1])
+            # e.g. "-775.202926514  ( 2)     -30.123456789  ( 4)" => (-775.202926514, 2), (-30.123456789, 4)
+            values: List[float] = []
+            for match in EIGENVALUE_DEGENERACY_PATTERN.finditer(line):
+                num = int(match.group(2))
                 self.shell_num[current_symmetry_type][current_eigenvalue_type] += num
-                if print_type == "standard":
-                    for _ in range(0, num, 2):
-                        idx = len(self.energies[current_symmetry_type]) + 1
-                        self.energies[current_symmetry_type][idx] = val
-                elif print_type == "supersymmetry":
-                    for _ in range(0, num, 2):
-                        idx = len(omega[current_symmetry_type][omega_str]) + 1
-                        omega[current_symmetry_type][omega_str][idx] = val
-                start_idx += match.end()
+                # A Kramers pair is stored as one eigenvalue
+                values.extend(repeat(float(match.group(1)), (num + 1) // 2))
+            if print_type == "standard":
+                self.energies[current_symmetry_type].extend(values)
+            else:
+                omega[current_symmetry_type][omega_str].extend(values)
 
         stage = StageEigenvalues.INIT
         atomic = False
         print_type = ""  # "standard" or "supersymmetry"
         occ_idx: Dict[str, int] = {}
-        omega: Dict[str, Dict[str, Dict[int, float]]] = {}
+        omega: Dict[str, Dict[str, List[float]]] = {}
         omega_str = ""  # 1/2 or 3/2 or 5/2 or p 3/2 -3/2 ...
         omega_list: List[str] = []
         current_eigenvalue_type = ""  # "closed" or "open" or "virtual"
@@ -248,7 +249,7 @@ class Eigenvalues:
                     atomic = ";" in line
                     omega_str = get_omega_str(words)
                     self.setdefault(current_symmetry_type)
-                    omega.setdefault(current_symmetry_type, {}).setdefault(omega_str, {})
+                    omega.setdefault(current_symmetry_type, {}).setdefault(omega_str, [])
             elif is_end_of_read(line) or stage == StageEigenvalues.WAIT_END:
                 break
             elif stage == StageEigenvalues.EIGENVALUES_READ:
@@ -259,7 +260,7 @@ class Eigenvalues:
                     current_symmetry_type = get_symmetry_type_supersym(line)
                     omega_str = get_omega_str(words)
                     self.setdefault(current_symmetry_type)
-                    omega.setdefault(current_symmetry_type, {}).setdefault(omega_str, {})
+                    omega.setdefault(current_symmetry_type, {}).setdefault(omega_str, [])
                 elif is_eigenvalue_type_written(words):
                     current_eigenvalue_type = get_current_eigenvalue_type(words)
                 elif is_occupation_info_header(line):
@@ -286,59 +287,42 @@ class Eigenvalues:
                     omega_list = create_splitted_by_slash2_list(line)
                     supersym_append_energies()
 
-        for key in self.energies.keys():
-            num = len(self.energies[key])
-            self.energies_used[key] = {i: False for i in range(1, num + 1)}
+        self.reset_energies_used()
 
         debug_print(f"eigenvalues: {self}")
 
-    def validate_eigpri_option(self, dirac_output: TextIOWrapper):
+    def validate_eigpri_option(self, input_deck: DiracInputDeck):
         """Validate the .EIGPRI option in the DIRAC input file,
         if is not set, it is a valid input
         because only the positive energy eigenvalues are printed as default.
 
         Args:
-            dirac_output (TextIOWrapper): _description_
+            input_deck (DiracInputDeck): Input file of DIRAC written in the output file
         """
 
-        stage = StageEIGPRI.INIT
-        for line in dirac_output:
-            no_comment_out_line = delete_dirac_input_comment_out(line)
-            words = space_separated_parsing_upper(no_comment_out_line)
-            if is_dirac_input_line_should_be_skipped(words):
-                continue
-
-            if is_end_dirac_input_field(no_comment_out_line) or stage == StageEIGPRI.WAIT_END:
-                break
-
-            if stage == StageEIGPRI.INIT:
-                if is_start_dirac_input_field(no_comment_out_line):
-                    stage = StageEIGPRI.SEARCH_SCF_SECTION
-
-            if stage == StageEIGPRI.SEARCH_SCF_SECTION:
-                if is_dirac_input_keyword(words[0]) and ".SCF" in words[0]:
-                    stage = StageEIGPRI.SEARCH_SCF_DETAIL_SECTION
-
-            if stage == StageEIGPRI.SEARCH_SCF_DETAIL_SECTION:
-                if is_dirac_input_section_one_star(words[0]) and "*SCF" in words[0]:
-                    stage = StageEIGPRI.SEARCH_EIGPRI
-
-            if stage == StageEIGPRI.SEARCH_EIGPRI:
-                if is_dirac_input_keyword(words[0]) and ".EIGPRI" in words[0]:
-                    stage = StageEIGPRI.NEXT_LINE_EIGPRI
-
-            if stage == StageEIGPRI.NEXT_LINE_EIGPRI:
-                # https://diracprogram.org/doc/master/manual/wave_function/scf.html#eigpri
-                if len(words) == 2 and words[0].isdigit() and words[1].isdigit():
-                    if int(words[0]) == 0:  # positive energy eigenvalues are not printed
-                        msg = f"\nYour .EIGPRI option in your DIRAC input file is invalid!\n\
+        # The .EIGPRI option is read only if *SCF section is written after .SCF keyword
+        is_scf_found = False
+        is_scf_section_found = False
+        for section in input_deck.sections:
+            if is_scf_found and section.name == "*SCF":
+                is_scf_section_found = True
+            for keyword in section.keywords:
+                if keyword.name == ".SCF":
+                    is_scf_found = True
+                elif is_scf_section_found and keyword.name == ".EIGPRI":
+                    for arg in keyword.args:
+                        # https://diracprogram.org/doc/master/manual/wave_function/scf.html#eigpri
+                        words = space_separated_parsing(arg)
+                        if len(words) == 2 and words[0].isdigit() and words[1].isdigit():
+                            if int(words[0]) == 0:  # positive energy eigenvalues are not printed
+                                msg = f"\nYour .EIGPRI option in your DIRAC input file is invalid!\n\
 .EIGPRI\n\
-{line}\n\
+{arg}\n\
 We cannot get the eigenvalues with your .EIGPRI option.\n\
 If you want to use this output file with this program, you must use --no-scf option to skip reading eigenvalues information.\n\
 But you cannot use the output using --no-scf option to dcaspt2_input_generator program.\n\
 If you want to get the eigenvalues information, please refer the .EIGPRI option in the manual of DIRAC.\n\
 https://diracprogram.org/doc/master/manual/wave_function/scf.html#eigpri\n\
 You must enable to print out the positive eigenvalues energy.\n"
-                        raise ValueError(msg)
-                    stage = StageEIGPRI.WAIT_END
+                                raise ValueError(msg)
+                            return
@@ -1,30 +1,43 @@
+import sys
 from pathlib import Path
-from typing import List
+from typing import IO, List, Optional, Union
 
-from sum_dirac_dfcoef.args import args
-from sum_dirac_dfcoef.data import DataMO
+from sum_dirac_dfcoef.data import DataMO, NonPrintedMO
 from sum_dirac_dfcoef.header_info import HeaderInfo
-from sum_dirac_dfcoef.utils import debug_print
+from sum_dirac_dfcoef.options import Options
+from sum_dirac_dfcoef.utils import debug_print, get_output_compression, open_compressed_text
 
 
 class OutputFileWriter:
-    """This class has methods to write data to the output file."""
+    """This class has methods to write data to the output file.
 
-    def __init__(self) -> None:
+    Attributes:
+        output_path (Path): File path of the sum_dirac_dfcoef output
+        options (Options): Options of sum_dirac_dfcoef
+        group_by (str): Level of --group-by option used to group the coefficients (default: "label", the same as without --group-by option)
+    """
+
+    output_path: Path
+    options: Options
+    group_by: str
+
+    def __init__(self, output_path: Path, options: Options, group_by: str = "label") -> None:
         super().__init__()
-        self.output_path = self.get_output_path()
+        self.output_path = output_path
+        self.options = options
+        self.group_by = group_by
 
     def write_no_header_info(self) -> None:
         # Print NO_HEADERINFO twice because the first and second lines are used for the header
         # If user uses --no-scf option, we cannot get the eigenvalues and the number of electrons from the output file.
         # Therefore, print NO_HEADERINFO twice to avoid using the output file for dcaspt2_input_generator program.
-        with open(self.output_path, "a", encoding="utf-8") as f:
+        with self.open_output("a") as f:
             msg = "NO_HEADERINFO: This output cannot be used for the dcaspt2_input_generator program.\n"
             f.write(msg)
             f.write(msg)
 
     def write_headerinfo(self, header_info: HeaderInfo) -> None:
-        with open(self.output_path, "a", encoding="utf-8") as f:
+        with self.open_output("a") as f:
             scheme = "default" if header_info.scheme.value == 0 else str(header_info.scheme.value)
             line = f"electron_num {header_info.electrons} point_group {header_info.point_group} moltra_scheme {scheme}\n"
             for symmetry_type, d in header_info.moltra_info.range_dict.items():
@@ -39,51 +52,77 @@ class OutputFileWriter:
             line += "\n"
             f.write(line)
 
-    def write_mo_data(self, mo_data: List[DataMO]) -> None:
-        with open(self.output_path, "a", encoding="utf-8") as f:
+    def write_mo_data(self, mo_data: List[Union[DataMO, NonPrintedMO]]) -> None:
+        with self.open_output("a") as f:
             f.write("\n")
             for mo in mo_data:
-                digit_int = len(str(int(mo.mo_energy)))  # number of digits of integer part
-                # File write but if args.compress is True \n is not added
-                mo_info_energy = f"{mo.mo_info} {mo.mo_energy:{digit_int}.{args.decimal}f}" + ("\n" if not args.compress else "")
-                f.write(mo_info_energy)
-
-                for key, coef in mo.coef_dict.items():
-                    percentage = coef / mo.norm_const_sum * 100
-                    atom_num_label = f"({key.atom_idx})" if key.need_identifier and not args.ignore_atom_num else ""
-                    sym_label = key.symmetry_label if not args.ignore_sym else ""
-                    ml_label = key.magnetic_label if not args.ignore_ml else ""
-                    atomic_symmetry_label = f"{sym_label}{key.atom_label}{key.azimuthal_label}{ml_label}{atom_num_label}"
-                    output_str: str
-                    if args.compress:
-                        output_str = f" {atomic_symmetry_label} {percentage:.{args.decimal}f}"
-                    else:
-                        output_str = f"{atomic_symmetry_label:<12} {percentage:{args.decimal+4}.{args.decimal}f} %\n"
-                    f.write(output_str)
-                f.write("\n")  # add empty line
-                debug_print(f"sum of coefficient {mo.norm_const_sum:.{args.decimal}f}")
+                f.write(format_mo_data(mo, self.options, self.group_by))
+                debug_print(f"sum of coefficient {mo.norm_const_sum:.{self.options.decimal}f}")
 
     def create_blank_file(self) -> None:
         # Open the file in write mode
         # Even if the file already exists, it will be overwritten with a blank file
-        file = open(self.output_path, "w", encoding="utf-8")
+        file = self.open_output("w")
         file.close()
 
-    def get_output_path(self) -> Path:
-        import sys
+    def open_output(self, mode: str) -> IO[str]:
+        # If the output path ends with .gz, .bz2 or .xz, the output is compressed while writing.
+        # (Appending to the compressed file adds a new stream, and the concatenated streams are decompressed as one file)
+        return open_compressed_text(self.output_path, mode, get_output_compression(self.output_path))
 
-        if args.output is None:
-            output_name = "sum_dirac_dfcoef.out"
-            output_path = Path.absolute(Path.cwd() / output_name)
-        else:
-            output_path = Path(args.output).expanduser().resolve()
-            if output_path.is_dir():
-                sys.exit(
-                    "ERROR: The path you specified as the sum_dirac_dfcoef output is a directory. Not a file.\
+
+def get_output_path(output_path_str: Optional[str]) -> Path:
+    if output_path_str is None:
+        output_name = "sum_dirac_dfcoef.out"
+        output_path = Path.absolute(Path.cwd() / output_name)
+    else:
+        output_path = Path(output_path_str).expanduser().resolve()
+        if output_path.is_dir():
+            sys.exit(
+                "ERROR: The path you specified as the sum_dirac_dfcoef output is a directory. Not a file.\
 Please check your -o or --output option is correct."
-                )
+            )
+
+    return output_path
+
+
+def get_step_output_path(output_path: Path, step: int) -> Path:
+    """Get the output path of the step-th Vector print section used with --all-steps option (e.g. sum_dirac_dfcoef.out => sum_dirac_dfcoef.step1.out)
 
-        return output_path
+    The compression suffix is kept at the end (e.g. sum_dirac_dfcoef.out.gz => sum_dirac_dfcoef.step1.out.gz)
+    """
+    return insert_output_name_tag(output_path, f"step{step}")
 
 
-output_file_writer = OutputFileWriter()
+def get_group_output_path(output_path: Path, group_by: str) -> Path:
+    """Get the output path of the level of --group-by option (e.g. sum_dirac_dfcoef.out => sum_dirac_dfcoef.atom+shell.out)"""
+    return insert_output_name_tag(output_path, group_by)
+
+
+def insert_output_name_tag(output_path: Path, tag: str) -> Path:
+    # (e.g.) tag="step1": sum_dirac_dfcoef.out => sum_dirac_dfcoef.step1.out, sum_dirac_dfcoef.out.gz => sum_dirac_dfcoef.step1.out.gz
+    compression_suffix = output_path.suffix if get_output_compression(output_path) is not None else ""
+    base_path = output_path.with_suffix("") if compression_suffix else output_path
+    return output_path.with_name(f"{base_path.stem}.{tag}{base_path.suffix}{compression_suffix}")
+
+
+def format_mo_data(mo: Union[DataMO, NonPrintedMO], options: Options, group_by: str = "label") -> str:
+    """Format the result of one MO in the same way as it is written to the output file.
+
+    The coefficients are grouped by the level of --group-by option (group_by) in addition to the --ignore-* options.
+    """
+    digit_int = len(str(int(mo.mo_energy)))  # number of digits of integer part
+    # File write but if options.compress is True \n is not added
+    mo_str = f"{mo.mo_info} {mo.mo_energy:{digit_int}.{options.decimal}f}" + ("\n" if not options.compress else "")
+
+    coef_dict = mo.get_coefficients(options.threshold, **options.get_group_ignore_flags(group_by))
+    for key, coef in coef_dict.items():
+        percentage = coef / mo.norm_const_sum * 100
+        atom_num_label = f"({key.atom_idx})" if key.need_identifier and not options.ignore_atom_num else ""
+        atomic_symmetry_label = f"{key.symmetry_label}{key.atom_label}{key.azimuthal_label}{key.magnetic_label}{atom_num_label}"
+        if options.compress:
+            mo_str += f" {atomic_symmetry_label} {percentage:.{options.decimal}f}"
+        else:
+            mo_str += f"{atomic_symmetry_label:<12} {percentage:{options.decimal+4}.{options.decimal}f} %\n"
+    mo_str += "\n"  # add empty line
+    return mo_str
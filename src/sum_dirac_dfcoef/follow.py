@@ -0,0 +1,189 @@
+import io
+import os
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from sum_dirac_dfcoef.checkpoint import PrivecCheckpoint
+from sum_dirac_dfcoef.data import DataMO
+from sum_dirac_dfcoef.file_writer import format_mo_data
+from sum_dirac_dfcoef.functions_info import get_functions_info
+from sum_dirac_dfcoef.header_info import HeaderInfo
+from sum_dirac_dfcoef.options import Options
+from sum_dirac_dfcoef.privec_reader import STAGE, PrivecProcessor
+from sum_dirac_dfcoef.utils import debug_print, space_separated_parsing
+
+
+class FileTail:
+    """This class reads the complete lines appended to a file since the previous read.
+
+    Attributes:
+        path (Path): Path of the file to follow
+        offset (int): Byte offset of the end of the last complete line already read
+        inode (Optional[int]): Inode of the file when it was read last time (used to detect rotation)
+        partial (bytes): The incomplete last line (no line break yet) read last time
+    """
+
+    path: Path
+    offset: int
+    inode: Optional[int]
+    partial: bytes
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.offset = 0
+        self.inode = None
+        self.partial = b""
+
+    def stat(self) -> Optional[os.stat_result]:
+        try:
+            return os.stat(self.path)
+        except FileNotFoundError:
+            return None  # Rotated but not recreated yet. Wait for the new file.
+
+    def is_rotated(self, stat: os.stat_result) -> bool:
+        return self.inode is not None and stat.st_ino != self.inode
+
+    def is_truncated(self, stat: os.stat_result) -> bool:
+        return self.inode is not None and stat.st_size < self.offset + len(self.partial)
+
+    def reset(self, offset: int = 0) -> None:
+        """Read the file again from offset (the beginning of a line)"""
+        self.offset = offset
+        self.inode = None
+        self.partial = b""
+
+    def read_lines(self) -> List[str]:
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return []
+        with f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            f.seek(self.offset + len(self.partial))
+            chunk = f.read()
+        data = self.partial + chunk
+        complete, sep, self.partial = data.rpartition(b"\n")
+        if not sep:
+            # No complete line yet
+            self.partial = data
+            return []
+        self.offset += len(complete) + len(sep)
+        return (complete + sep).decode("utf-8").splitlines(keepends=True)
+
+
+class DiracOutputFollower:
+    """This class follows a DIRAC output file that is still being written.
+
+    The header information and the Symmetry Orbitals section are read once the Vector print section has started.
+    After that, every appended line advances the stage of PrivecProcessor, and each completed MO is printed to stdout at once.
+
+    If the file is truncated after the last completed MO, the MO being read is discarded
+    and reading restarts just after the last completed MO.
+    If the file is rotated (the inode is changed) or truncated before the end of the last completed MO,
+    the file is regarded as the output of a new DIRAC run, and the header information and the MOs are read from the beginning.
+
+    Attributes:
+        tail (FileTail): Reader of the appended lines
+        options (Options): Options of sum_dirac_dfcoef
+        interval (float): Polling interval (seconds)
+        header_info (HeaderInfo): Header information (read only if options.for_generator is True)
+        privec_processor (Optional[PrivecProcessor]): Created when the Vector print section is found
+        line_offset (int): Byte offset of the end of the last line passed to privec_processor
+        last_mo (Optional[PrivecCheckpoint]): The state of privec_processor just after the last MO was completed
+                                              (kept in memory, so the fingerprint and the parse options are not used)
+    """
+
+    def __init__(self, dirac_filepath: Path, options: Options) -> None:
+        self.tail = FileTail(dirac_filepath)
+        self.options = options
+        self.interval = options.follow_interval
+        self.header_info = HeaderInfo()
+        self.privec_processor: Optional[PrivecProcessor] = None
+        self.line_offset = 0
+        self.last_mo: Optional[PrivecCheckpoint] = None
+
+    def follow(self) -> PrivecProcessor:
+        """Follow the DIRAC output until the end of the Vector print section (or KeyboardInterrupt).
+
+        Returns:
+            PrivecProcessor: privec_processor.data_all_mo stores all completed MOs
+        """
+        lines: List[str] = []  # The lines before the Vector print section
+        try:
+            while self.privec_processor is None or self.privec_processor.stage != STAGE.END:
+                stat = self.tail.stat()
+                if stat is not None and (self.tail.is_rotated(stat) or self.tail.is_truncated(stat)):
+                    if self.tail.is_rotated(stat) or self.last_mo is None or stat.st_size < self.last_mo.byte_offset:
+                        debug_print(f"{self.tail.path} was rotated or rewritten. Restart reading the new DIRAC output from the beginning.")
+                        self.restart()
+                        lines.clear()
+                    else:
+                        debug_print(f"{self.tail.path} was truncated. Restart reading from the end of the last completed MO.")
+                        self.resume_from_last_mo()
+                new_lines = self.tail.read_lines()
+                if self.privec_processor is None:
+                    lines.extend(new_lines)
+                    if any(PrivecProcessor.check_start_vector_print(space_separated_parsing(line)) for line in new_lines):
+                        self.start_vector_print(lines)
+                        lines.clear()
+                else:
+                    for line_str in new_lines:
+                        self.feed_line(line_str)
+                        if self.privec_processor.stage == STAGE.END:
+                            break
+                if len(new_lines) == 0:
+                    time.sleep(self.interval)
+        except KeyboardInterrupt:
+            print("Stopped following the DIRAC output. Write the results of the completed MOs.")
+            if self.privec_processor is None:
+                raise
+        return self.privec_processor
+
+    def restart(self) -> None:
+        """Discard the results of the previous DIRAC output and read the file from the beginning."""
+        self.tail.reset()
+        self.header_info = HeaderInfo()
+        self.privec_processor = None
+        self.line_offset = 0
+        self.last_mo = None
+
+    def resume_from_last_mo(self) -> None:
+        """Discard the MO being read and read the file again from the end of the last completed MO."""
+        if self.privec_processor is None or self.last_mo is None:
+            return
+        self.privec_processor.restore_checkpoint(self.last_mo)
+        self.tail.reset(self.last_mo.byte_offset)
+        self.line_offset = self.last_mo.byte_offset
+
+    def start_vector_print(self, lines: List[str]) -> None:
+        if self.options.for_generator:
+            self.header_info.read_header_info(io.StringIO("".join(lines)))
+        functions_info = get_functions_info(lines)
+        self.privec_processor = PrivecProcessor([], functions_info, self.header_info.eigenvalues, self.options)
+        if self.options.moltra_active_only:
+            self.privec_processor.moltra_mo_range = self.header_info.get_moltra_mo_range(self.options.moltra_margin)
+        for line_str in lines:
+            self.feed_line(line_str)
+
+    def feed_line(self, line_str: str) -> None:
+        processor = self.privec_processor
+        if processor is None:
+            return
+        # The lines are decoded from the complete lines of the file, so encoding them again gives their byte length
+        self.line_offset += len(line_str.encode("utf-8"))
+        num_electronic, num_positronic = len(processor.data_all_mo.electronic), len(processor.data_all_mo.positronic)
+        processor.process_line(line_str)
+        if len(processor.data_all_mo.electronic) > num_electronic:
+            self.complete_mo(processor.data_all_mo.electronic[-1], is_electronic=True)
+        elif len(processor.data_all_mo.positronic) > num_positronic:
+            self.complete_mo(processor.data_all_mo.positronic[-1], is_electronic=False)
+
+    def complete_mo(self, mo: DataMO, is_electronic: bool) -> None:
+        processor = self.privec_processor
+        if processor is None:
+            return
+        # The MO is completed at the end of this line, so reading can be restarted from the next line after truncation
+        self.last_mo = PrivecCheckpoint(self.line_offset, "", {}, processor.data_all_mo, processor.mo_sym_type, processor.data_mo.eigenvalue_no, processor.mo_cnt)
+        if self.options.should_write_electronic() if is_electronic else self.options.should_write_positronic():
+            print(format_mo_data(mo, self.options), end="", flush=True)
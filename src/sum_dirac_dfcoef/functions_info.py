@@ -1,17 +1,17 @@
-import copy
-import re
 from collections import OrderedDict
 from io import TextIOWrapper
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from typing import OrderedDict as ODict
 
-from sum_dirac_dfcoef.atoms import AtomInfo, FuncIndices, ao
+from sum_dirac_dfcoef.atoms import AtomicOrbitals, AtomInfo, FuncIndices
 from sum_dirac_dfcoef.utils import debug_print, space_separated_parsing
 
 
 class Function:
     """Data class for storing the information of specific atom + gto_type functions."""
 
+    __slots__ = ("component_func", "symmetry", "atom", "gto_type", "idx_within_same_atom", "num_functions", "multiplicity")
+
     def __init__(self, component_func: str, symmetry: str, atom: str, gto_type: str, idx_within_same_atom: int, num_functions: int, multiplicity: int) -> None:
         self.component_func = component_func  # "large" or "small"
         self.symmetry = symmetry  # e.g. "Ag"
@@ -23,7 +23,18 @@ class Function:
 
 
 class FunctionsInfo(ODict[str, ODict[str, ODict[str, ODict[int, AtomInfo]]]]):
-    """Data class for storing all information about Function numbers and atom labels."""
+    """Data class for storing all information about Function numbers and atom labels.
+
+    Attributes:
+        dirac_version (Optional[int]): The release version of DIRAC read from the banner of the output (e.g. 21 for "Release DIRAC21 (2021)").
+                                       None if the banner is not found. The numbering of the functions in the Vector print depends on this version.
+    """
+
+    dirac_version: Optional[int]
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.dirac_version = None
 
     # FunctionsInfo(OrderedDict[str, OrderedDict[str, OrderedDict[str, OrderedDict[int, AtomInfo]]]]
     # "large": {
@@ -70,7 +81,6 @@ class FunctionsInfo(ODict[str, ODict[str, ODict[str, ODict[int, AtomInfo]]]]):
     #         }
     #     }
     # }
-    pass
 
 
 class SymmetryOrbitalsSummary:
@@ -194,6 +204,14 @@ def get_functions_info(dirac_output: TextIOWrapper) -> FunctionsInfo:
             return True
         return False
 
+    def get_dirac_version(line_str: str) -> Optional[int]:
+        # (e.g.) " *    Release DIRAC21 (2021), written by    *" => 21
+        idx = line_str.find("Release DIRAC")
+        if idx == -1:
+            return None
+        words = line_str[idx + len("Release DIRAC") :].split()
+        return int(words[0]) if len(words) > 0 and words[0].isdigit() else None
+
     def get_component_func(line_str: str) -> str:
         if "Large" in line_str:
             return "large"
@@ -241,21 +259,14 @@ def get_functions_info(dirac_output: TextIOWrapper) -> FunctionsInfo:
             Function: Function information
         """
 
-        def get_last_elem() -> Tuple[int, AtomInfo]:
-            # Get the last element of the OrderedDict element with the keys
-            last_elem_atom_idx, last_elem = functions_info[component_func][symmetry][atom].popitem()
-            # Need to restore the last element because it was popped
-            functions_info[component_func][symmetry][atom][last_elem_atom_idx] = last_elem
-            return last_elem_atom_idx, last_elem
-
         def get_idx_within_the_same_atom() -> int:
-            try:
-                last_elem_atom_idx, last_elem = get_last_elem()
-                idx_within_same_atom = last_elem_atom_idx + last_elem.mul
-                return idx_within_same_atom
-            except KeyError:
+            atom_infos = functions_info.get(component_func, {}).get(symmetry, {}).get(atom)
+            if not atom_infos:
                 # If the idx_within_same_atom does not exist, it means that this is the first element, so that the idx_within_same_atom is 1
                 return 1
+            # The last element of the OrderedDict is the previous atom with the same atom label
+            last_elem = atom_infos[next(reversed(atom_infos))]
+            return last_elem.idx_within_same_atom + last_elem.mul
 
         def parse_plabel(plabel: str) -> Tuple[str, str, str]:
             atom = plabel[4:6].strip()  # e.g. "Cm" in "    Cm g400"
@@ -264,7 +275,7 @@ def get_functions_info(dirac_output: TextIOWrapper) -> FunctionsInfo:
             return atom, subshell, gto_type
 
         def parse_multiplicity_label(multiplicity_label: str) -> int:
-            return len(re.findall("[+-]", multiplicity_label)) + 1  # (e.g.) 1+2=>2, 1+2+3=>3, 1+2-3-4=>4
+            return multiplicity_label.count("+") + multiplicity_label.count("-") + 1  # (e.g.) 1+2=>2, 1+2+3=>3, 1+2-3-4=>4
 
         try:
             num_functions = int(words[0])  # ILAB(1,I) (e.g.) 3
@@ -287,7 +298,7 @@ def get_functions_info(dirac_output: TextIOWrapper) -> FunctionsInfo:
             ao.idx_within_same_atom = get_idx_within_the_same_atom()
             # ao was reset, so set the current subshell and gto_type again
             ao.current_ao.update(atom, subshell, gto_type)
-            ao.prev_ao = copy.deepcopy(ao.current_ao)
+            ao.prev_ao.update(atom, subshell, gto_type)
 
         debug_print(f"function_label: {function_label}, ao: {ao}, idx_within_same_atom: {ao.idx_within_same_atom}")
         ao.function_types.add(function_label)
@@ -341,11 +352,14 @@ def get_functions_info(dirac_output: TextIOWrapper) -> FunctionsInfo:
     functions_info = FunctionsInfo()
     fn_summary = FuncNumSummary()
     orb_summary = SymmetryOrbitalsSummary()
+    ao = AtomicOrbitals()
     for line_str in dirac_output:
         words: List[str] = space_separated_parsing(line_str)
         if len(line_str) == 0:
             continue
         elif not start_symmetry_orbitals_section:
+            if functions_info.dirac_version is None:
+                functions_info.dirac_version = get_dirac_version(line_str)
             start_symmetry_orbitals_section = is_start_symmetry_orbitals_section(words)
         elif "Number of" in line_str:
             update_symmetry_orbitals_summary(line_str)
@@ -371,7 +385,7 @@ def get_functions_info(dirac_output: TextIOWrapper) -> FunctionsInfo:
             add_function(func)
             update_last_indices(func)
 
-        elif all(char in "* \r\n" for char in line_str) and len(re.findall("[*]", line_str)) > 0:
+        elif all(char in "* \r\n" for char in line_str) and "*" in line_str:
             # all characters in line_str are * or space or line break and at least one * is included
             break  # Stop reading symmetry orbitals
     if not start_symmetry_orbitals_section:
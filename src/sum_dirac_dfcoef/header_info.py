@@ -1,13 +1,12 @@
 import re
 from bisect import bisect_left, bisect_right
-from collections import OrderedDict
 from io import TextIOWrapper
-from typing import List
-from typing import OrderedDict as ODict
+from typing import Dict, List, Sequence, Tuple
 
-from sum_dirac_dfcoef.data import DataAllMO, DataMO
+from sum_dirac_dfcoef.data import DataAllMO, NonPrintedMO
 from sum_dirac_dfcoef.eigenvalues import Eigenvalues
 from sum_dirac_dfcoef.electron_num import get_electron_num_from_input, get_electron_num_from_scf_field
+from sum_dirac_dfcoef.input_deck import DiracInputDeck
 from sum_dirac_dfcoef.moltra import MoltraInfo
 from sum_dirac_dfcoef.scheme import Scheme
 
@@ -16,6 +15,7 @@ class HeaderInfo:
     """Class to store header information for the sum_dirac_dfcoef module.
 
     Attributes:
+        input_deck (DiracInputDeck): Input file of DIRAC written in the output file
         moltra_info (MoltraInfo): Moltra information
         eigenvalues (Eigenvalues): Eigenvalues
         point_group (str): Point group of the molecule (e.g.) "C2v"
@@ -23,6 +23,7 @@ class HeaderInfo:
     """
 
     def __init__(self):
+        self.input_deck = DiracInputDeck()
         self.moltra_info = MoltraInfo()
         self.eigenvalues = Eigenvalues()
         self.point_group = ""
@@ -39,16 +40,19 @@ class HeaderInfo:
             None: class attributes are updated
         """
         dirac_output.seek(0)
-        self.__read_electron_number(dirac_output)
-        dirac_output.seek(0)
-        self.__validate_eigpri_option(dirac_output)
-        dirac_output.seek(0)
-        self.__read_scheme(dirac_output)
-        dirac_output.seek(0)
-        self.__read_moltra(dirac_output)
+        # The input file is parsed once, and reading dirac_output continues from the end of the input file
+        self.input_deck = DiracInputDeck.from_dirac_output(dirac_output)
+        self.electrons = get_electron_num_from_input(self.input_deck)
+        self.eigenvalues.validate_eigpri_option(self.input_deck)
+        self.scheme.get_scheme_num_from_input(self.input_deck)
+        self.moltra_info.read_moltra_section(self.input_deck)
         self.__read_point_group(dirac_output)
         self.__read_eigenvalues(dirac_output)
         self.__duplicate_moltra_str()
+        if self.electrons == 0:
+            # The OPEN SHELL and CLOSED SHELL keywords are not written in the input file
+            dirac_output.seek(0)
+            self.electrons = get_electron_num_from_scf_field(dirac_output)
 
     def __read_point_group(self, dirac_output: TextIOWrapper) -> None:
         symgrp_section = False
@@ -68,23 +72,9 @@ class HeaderInfo:
         if self.point_group == "":
             raise ValueError(err_msg)
 
-    def __read_electron_number(self, dirac_output: TextIOWrapper) -> None:
-        self.electrons = get_electron_num_from_input(dirac_output)
-        if self.electrons == 0:
-            self.electrons = get_electron_num_from_scf_field(dirac_output)
-
-    def __validate_eigpri_option(self, dirac_output: TextIOWrapper) -> None:
-        self.eigenvalues.validate_eigpri_option(dirac_output)
-
-    def __read_scheme(self, dirac_output: TextIOWrapper) -> None:
-        self.scheme.get_scheme_num_from_input(dirac_output)
-
     def __read_eigenvalues(self, dirac_output: TextIOWrapper) -> None:
         self.eigenvalues.get_eigenvalues(dirac_output)
 
-    def __read_moltra(self, dirac_output: TextIOWrapper) -> None:
-        self.moltra_info.read_moltra_section(dirac_output)
-
     def __duplicate_moltra_str(self) -> None:
         # Duplicate the moltra range string if it is not enough
         if self.moltra_info.is_default:
@@ -98,27 +88,77 @@ class HeaderInfo:
                 self.moltra_info.range_str.append(self.moltra_info.range_str[0])
 
     def calculate_moltra_idx_range(self, data_all_mo: DataAllMO) -> None:
+        """Calculate self.moltra_info.range_dict from the read MOs.
+
+        data_all_mo can be in any order. If it is not sorted by the symmetry type (e.g. sorted by energy),
+        a sorted copy of the list is used, so the order of data_all_mo is not changed.
+        """
+        if not data_all_mo.is_sorted_by_sym_type:
+            data_all_mo = DataAllMO(list(data_all_mo.electronic))
+            data_all_mo.sort_mo_sym_type()
         keys = list(self.eigenvalues.shell_num.keys())
+        # The eigenvalue numbers of all electronic MOs (shared by all symmetry types) used to split the energy range string into series
+        all_eigenvalue_nos = sorted({mo.eigenvalue_no for mo in data_all_mo.electronic})
         for i, item in enumerate(self.moltra_info.range_str):
             symmetry_type = keys[i]
             if "ALL" == item.upper():
                 self.moltra_info.range_dict[symmetry_type] = f"1..{len(self.eigenvalues.energies[symmetry_type])}"
             elif "ENERGY" in item.upper():
-                self.moltra_info.range_dict[symmetry_type] = self.__parse_energy_str(item, symmetry_type, data_all_mo)
+                self.moltra_info.range_dict[symmetry_type] = self.__parse_energy_str(item, symmetry_type, data_all_mo, all_eigenvalue_nos)
             else:
                 self.moltra_info.range_dict[symmetry_type] = self.__parse_range_str(item, symmetry_type)
 
-    def __parse_energy_str(self, energy_str: str, symmetry_type: str, data_all_mo: DataAllMO) -> str:
+    def calculate_moltra_idx_range_from_eigenvalues(self) -> None:
+        """Calculate self.moltra_info.range_dict from the eigenvalues without reading the Vector print section.
+
+        The eigenvalues are used in place of the MOs of the Vector print section.
+        """
+        data_all_mo = DataAllMO(
+            [
+                NonPrintedMO(symmetry_type, eigenvalue_no, energy, compress=True)
+                for symmetry_type, energies in self.eigenvalues.energies.items()
+                for eigenvalue_no, energy in enumerate(energies, start=1)
+            ]
+        )
+        data_all_mo.sort_mo_sym_type()
+        self.calculate_moltra_idx_range(data_all_mo)
+
+    def get_moltra_mo_range(self, margin: int = 0) -> Dict[str, List[Tuple[int, int]]]:
+        """Resolve the **MOLTRA > .ACTIVE ranges from the eigenvalues before reading the Vector print section.
+
+        self.moltra_info.range_dict is recalculated from the read MOs by calculate_moltra_idx_range() afterwards.
+
+        Args:
+            margin (int): Number of eigenvalues added to both sides of each range
+
+        Returns:
+            Dict[str, List[Tuple[int, int]]]: The first and last eigenvalue numbers of the ranges for each symmetry type
+        """
+        self.calculate_moltra_idx_range_from_eigenvalues()
+        mo_range: Dict[str, List[Tuple[int, int]]] = {}
+        for symmetry_type, range_str in self.moltra_info.range_dict.items():
+            ranges = mo_range.setdefault(symmetry_type, [])
+            for item in range_str.split(","):
+                if item == "":
+                    continue
+                first, _, last = item.partition("..")
+                ranges.append((max(1, int(first) - margin), int(last if last != "" else first) + margin))
+        return mo_range
+
+    def __parse_energy_str(self, energy_str: str, symmetry_type: str, data_all_mo: DataAllMO, all_eigenvalue_nos: List[int]) -> str:
         """Parse the energy string
 
         Args:
             energy_str (str): Energy string
+            symmetry_type (str): Symmetry type of the energy string
+            data_all_mo (DataAllMO): All MO data sorted by the symmetry type and the energy
+            all_eigenvalue_nos (List[int]): Sorted eigenvalue numbers of all electronic MOs
 
         Returns:
             str: Range string
         """
 
-        def get_min_energy_idx(energies: List[float], min_energy: float, step: float) -> int:
+        def get_min_energy_idx(energies: Sequence[float], min_energy: float, step: float) -> int:
             # Find the index of the minimum energy without exceeding the step
             cur_idx = bisect_left(energies, min_energy)
             cur_min_energy = energies[cur_idx]
@@ -131,7 +171,7 @@ class HeaderInfo:
                 cur_idx -= 1
             return cur_idx
 
-        def get_max_energy_idx(energies: List[float], max_energy: float, step: float) -> int:
+        def get_max_energy_idx(energies: Sequence[float], max_energy: float, step: float) -> int:
             # Find the index of the maximum energy without exceeding the step
             cur_idx = bisect_right(energies, max_energy)
             cur_max_energy = energies[cur_idx - 1]
@@ -143,84 +183,51 @@ class HeaderInfo:
                 cur_idx += 1
             return cur_idx
 
-        def find_min_sym_idx() -> int:
-            """Find the minimum index of the symmetry type
-
-            Returns:
-                int: Minimum index of the symmetry type
-            """
-
-            def bisect_l(data: List[DataMO], key: str) -> int:
-                min_idx, max_idx = 0, len(data)
-                while min_idx < max_idx:
-                    mid_idx = (min_idx + max_idx) // 2
-                    if data[mid_idx].sym_type < key:
-                        min_idx = mid_idx + 1
-                    else:
-                        max_idx = mid_idx
-                return min_idx
-
-            key = symmetry_type
-            min_idx = bisect_l(data_all_mo.electronic, key)
-            return min_idx
-
-        def create_within_moltra_dict(start_idx: int, end_idx: int) -> OrderedDict:
-            """Create the within_moltra dictionary
-
-            Returns:
-                OrderedDict: within_moltra dictionary
-            """
-            within_moltra = OrderedDict(sorted({mo.eigenvalue_no: False for mo in data_all_mo.electronic}.items()))
-            for idx in range(start_idx, end_idx):
-                within_moltra[data_all_mo.electronic[idx].eigenvalue_no] = True
-            return within_moltra
-
-        def create_energy_str(within_moltra: ODict[int, bool]) -> str:
-            """Create the energy string from the input boolean dictionary
+        def create_energy_str(used_eigenvalue_nos: List[int]) -> str:
+            """Create the energy string from the eigenvalue numbers within the MOLTRA range
 
             Args:
-                within_moltra (ODict[int, bool]): Stores the boolean value of whether the eigenvalue is used or not. True: used, False: not used.
+                used_eigenvalue_nos (List[int]): Sorted eigenvalue numbers within the MOLTRA range.
+                    A series continues while the next eigenvalue number in all_eigenvalue_nos is also used.
 
             Returns:
                 energy_str (str): Energy string can be used in the DIRAC input file. (e.g.) "10..180,200..300,400..500"
             """
-            energy_str = ""
-            cur_mo_num = 0
-            start_mo_num = cur_mo_num
-            left = True
-            ser_end = False
-            for eigenvalue_no, is_used in within_moltra.items():
-                cur_mo_num = eigenvalue_no
-                if is_used:
-                    if left:  # Add the first number of the series
-                        if energy_str == "":
-                            energy_str += f"{cur_mo_num}"
-                        else:  # Add the comma if the string is not empty to separate the series
-                            energy_str += f",{cur_mo_num}"
-                        start_mo_num = cur_mo_num
-                        left = False
-                        ser_end = True
-                elif ser_end:  # Add the last number of the series
-                    if cur_mo_num > start_mo_num + 1:
-                        energy_str += f"..{cur_mo_num - 1}"
-                    left = True
-                    ser_end = False
-            if ser_end:  # Add the last number of the series if the series is not ended after the loop
-                energy_str += f"..{cur_mo_num}"
-            return energy_str
-
-        start_sym_idx = find_min_sym_idx()
+            series: List[str] = []
+            used_idx = 0
+            while used_idx < len(used_eigenvalue_nos):
+                start_mo_num = used_eigenvalue_nos[used_idx]
+                all_idx = bisect_left(all_eigenvalue_nos, start_mo_num)
+                while (
+                    used_idx + 1 < len(used_eigenvalue_nos)
+                    and all_idx + 1 < len(all_eigenvalue_nos)
+                    and all_eigenvalue_nos[all_idx + 1] == used_eigenvalue_nos[used_idx + 1]
+                ):
+                    used_idx += 1
+                    all_idx += 1
+                if all_idx + 1 == len(all_eigenvalue_nos):  # The series is not ended until the last eigenvalue number
+                    series.append(f"{start_mo_num}..{all_eigenvalue_nos[all_idx]}")
+                elif all_eigenvalue_nos[all_idx + 1] > start_mo_num + 1:
+                    series.append(f"{start_mo_num}..{all_eigenvalue_nos[all_idx + 1] - 1}")
+                else:
+                    series.append(f"{start_mo_num}")
+                used_idx += 1
+            return ",".join(series)
+
         energy_str = energy_str.upper().replace("ENERGY", "")
         min_energy, max_energy, step = map(float, energy_str.split())
         if min_energy > max_energy:
             msg = f"The minimum energy is larger than the maximum energy: {min_energy} > {max_energy}"
             raise ValueError(msg)
-        energies: List[float] = sorted(self.eigenvalues.energies[symmetry_type].values())
+        energies = self.eigenvalues.get_sorted_energies(symmetry_type)
         min_energy_idx = get_min_energy_idx(energies, min_energy, step)
         max_energy_idx = get_max_energy_idx(energies, max_energy, step)
 
-        within_moltra = create_within_moltra_dict(min_energy_idx + start_sym_idx, max_energy_idx + start_sym_idx)
-        energy_str = create_energy_str(within_moltra)
+        # data_all_mo.electronic is sorted by (symmetry type, energy), so the MOs within the energy range are in the slice of symmetry_type
+        sym_slice = data_all_mo.get_electronic_sym_slice(symmetry_type)
+        mo_range = range(sym_slice.start + min_energy_idx, min(sym_slice.start + max_energy_idx, sym_slice.stop))
+        used_eigenvalue_nos = sorted({data_all_mo.electronic[idx].eigenvalue_no for idx in mo_range})
+        energy_str = create_energy_str(used_eigenvalue_nos)
         return energy_str
 
     def __parse_range_str(self, range_str: str, symmetry_type: str) -> str:
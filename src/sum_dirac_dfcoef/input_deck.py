@@ -0,0 +1,191 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from sum_dirac_dfcoef.utils import (
+    delete_dirac_input_comment_out,
+    is_dirac_input_keyword,
+    is_dirac_input_line_should_be_skipped,
+    is_dirac_input_section,
+    is_end_dirac_input_field,
+    is_start_dirac_input_field,
+    open_dirac_output,
+    space_separated_parsing_upper,
+)
+
+
+class DiracInputKeyword:
+    """A keyword of the DIRAC input file and the argument lines below it.
+
+    e.g.
+    .CLOSED SHELL
+     10 8
+    -> DiracInputKeyword(words=[".CLOSED", "SHELL"], args=["10 8"])
+
+    Attributes:
+        words (List[str]): Upper-cased words of the keyword line (empty for the argument lines written before any keyword in the section)
+        args (List[str]): Argument lines of the keyword (comments are removed and the lines are stripped, the case is kept)
+    """
+
+    words: List[str]
+    args: List[str]
+
+    def __init__(self, words: List[str]) -> None:
+        self.words = words
+        self.args = []
+
+    def __repr__(self) -> str:
+        return f"DiracInputKeyword(words: {self.words}, args: {self.args})"
+
+    @property
+    def name(self) -> str:
+        # (e.g.) ".CLOSED SHELL" => ".CLOSED"
+        return self.words[0] if len(self.words) > 0 else ""
+
+
+class DiracInputSection:
+    """A section (e.g. **DIRAC, *SCF) of the DIRAC input file and its keywords.
+
+    Attributes:
+        words (List[str]): Upper-cased words of the section line (empty for the keywords written before any section)
+        keywords (List[DiracInputKeyword]): Keywords of the section in the order of the input file
+    """
+
+    words: List[str]
+    keywords: List[DiracInputKeyword]
+
+    def __init__(self, words: List[str]) -> None:
+        self.words = words
+        self.keywords = []
+
+    def __repr__(self) -> str:
+        return f"DiracInputSection(words: {self.words}, keywords: {self.keywords})"
+
+    @property
+    def name(self) -> str:
+        # (e.g.) "**WAVE FUNCTIONS" => "**WAVE"
+        return self.words[0] if len(self.words) > 0 else ""
+
+
+class DiracInputDeck:
+    """The DIRAC input file written in the DIRAC output (between "Contents of the input file" and "Contents of the molecule file").
+
+    The input file is parsed once into sections, keywords and argument lines, and the header information
+    (electron number, .EIGPRI, **MOLTRA > .SCHEME and .ACTIVE) is read from this class.
+    Two DiracInputDeck objects are equal if the input files are the same except for the comments, blank lines and spaces,
+    so they can be used as the keys of a dictionary to group DIRAC outputs by input settings.
+
+    Attributes:
+        sections (List[DiracInputSection]): Sections of the input file in the order of the input file
+    """
+
+    sections: List[DiracInputSection]
+
+    def __init__(self, sections: Optional[List[DiracInputSection]] = None) -> None:
+        self.sections = sections if sections is not None else []
+
+    def __repr__(self) -> str:
+        return f"DiracInputDeck(sections: {self.sections})"
+
+    def __str__(self) -> str:
+        lines: List[str] = []
+        for section in self.sections:
+            if len(section.words) > 0:
+                lines.append(" ".join(section.words))
+            for keyword in section.keywords:
+                if len(keyword.words) > 0:
+                    lines.append(" ".join(keyword.words))
+                lines.extend(keyword.args)
+        return "\n".join(lines)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DiracInputDeck):
+            return NotImplemented
+        return self.get_settings() == other.get_settings()
+
+    def __hash__(self) -> int:
+        return hash(self.get_settings())
+
+    @classmethod
+    def from_dirac_output(cls, dirac_output: Iterable[str]) -> "DiracInputDeck":
+        """Parse the input file written in the DIRAC output.
+
+        Reading dirac_output stops at the end of the input file, so the following lines can be read from the same file object.
+        An empty DiracInputDeck is returned if the input file is not found.
+        """
+        input_deck = cls()
+        is_reach_input_field = False
+        for line in dirac_output:
+            no_comment_out_line = delete_dirac_input_comment_out(line)
+            words = space_separated_parsing_upper(no_comment_out_line)
+
+            if is_dirac_input_line_should_be_skipped(words):
+                continue
+
+            if not is_reach_input_field:
+                is_reach_input_field = is_start_dirac_input_field(no_comment_out_line)
+                continue
+
+            if is_end_dirac_input_field(no_comment_out_line):
+                break  # end of input field
+
+            if is_dirac_input_section(words[0]):
+                input_deck.sections.append(DiracInputSection(words))
+                continue
+
+            if len(input_deck.sections) == 0:
+                input_deck.sections.append(DiracInputSection([]))
+            keywords = input_deck.sections[-1].keywords
+            if is_dirac_input_keyword(words[0]):
+                keywords.append(DiracInputKeyword(words))
+            else:
+                if len(keywords) == 0:
+                    keywords.append(DiracInputKeyword([]))
+                keywords[-1].args.append(no_comment_out_line.strip())
+        return input_deck
+
+    def get_settings(self) -> Tuple[Tuple[Tuple[str, ...], Tuple[Tuple[Tuple[str, ...], Tuple[str, ...]], ...]], ...]:
+        """Get the hashable representation of the input file (used to compare the input files)"""
+        return tuple(
+            (tuple(section.words), tuple((tuple(keyword.words), tuple(" ".join(arg.split()) for arg in keyword.args)) for keyword in section.keywords))
+            for section in self.sections
+        )
+
+    def iter_keywords(self, section_name: str = "") -> Iterator[DiracInputKeyword]:
+        """Iterate over the keywords of the sections named section_name (all sections if section_name is "") in the order of the input file"""
+        for section in self.sections:
+            if section_name == "" or section.name == section_name:
+                yield from section.keywords
+
+    def get_keyword(self, keyword_name: str, section_name: str = "") -> Optional[DiracInputKeyword]:
+        """Get the first keyword named keyword_name in the sections named section_name (e.g. get_keyword(".ACTIVE", "**MOLTRA"))
+
+        Returns:
+            Optional[DiracInputKeyword]: None if the keyword is not found
+        """
+        return next((keyword for keyword in self.iter_keywords(section_name) if keyword.name == keyword_name), None)
+
+    def has_keyword(self, keyword_name: str, section_name: str = "") -> bool:
+        return self.get_keyword(keyword_name, section_name) is not None
+
+
+def read_dirac_input_deck(dirac_filepath: Union[str, Path]) -> DiracInputDeck:
+    """Read the input file written in the DIRAC output file.
+
+    The result is cached until the DIRAC output file is modified, so the same DIRAC output is parsed only once
+    (e.g. to group many DIRAC outputs by input settings before summarizing them).
+    The returned object is shared by the callers, so don't modify it.
+
+    Raises:
+        FileNotFoundError: If dirac_filepath is not found
+    """
+    path = Path(dirac_filepath).expanduser().resolve()
+    stat = path.stat()
+    return load_dirac_input_deck(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=1024)
+def load_dirac_input_deck(path: Path, mtime_ns: int, size: int) -> DiracInputDeck:  # noqa: ARG001
+    # mtime_ns and size are only used as the cache key to read the DIRAC output again if it has been modified
+    with open_dirac_output(path) as dirac_output:
+        return DiracInputDeck.from_dirac_output(dirac_output)
@@ -0,0 +1,353 @@
+import argparse
+import copy
+from typing import Dict, List, Optional, Set, Tuple
+
+# Levels of --group-by option (key: level, value: labels summed up in addition to the --ignore-* options)
+# label: the same labels as the output without --group-by option
+# atom+shell: the atom label (and the atom number unless --ignore-atom-num) and the azimuthal label
+# atom: the atom label (and the atom number unless --ignore-atom-num)
+# shell: the azimuthal label
+GROUP_BY_LEVELS: Dict[str, Tuple[str, ...]] = {
+    "label": (),
+    "atom+shell": ("ml", "sym"),
+    "atom": ("ml", "sym", "shell"),
+    "shell": ("ml", "sym", "atom"),
+}
+
+
+class Options:
+    """Options to summarize the coefficients of a DIRAC output.
+
+    The command line options of sum_dirac_dfcoef are converted to this class by Options.from_args(),
+    and the default values are the same as the command line options.
+    The options are validated and the dependent options are set in __init__ (e.g. for_generator=True sets compress=True).
+
+    Attributes:
+        for_generator (bool): Write the output for dcaspt2_input_generator (-g/--for-generator)
+        parallel (int): Number of parallel processes to read the Vector print section (-j/--parallel)
+        compress (bool): Display the coefficients on one line for each kramers pair (-c/--compress)
+        threshold (float): Only the atomic orbitals with more than threshold % contribution are written (-t/--threshold)
+        decimal (int): Decimal places of the output (-d/--decimal)
+        ignore_atom_num (bool): Sum the coefficients ignoring the atom number label (--ignore-atom-num)
+        ignore_ml (bool): Sum the coefficients ignoring the magnetic quantum number label (--ignore-ml)
+        ignore_sym (bool): Sum the coefficients ignoring the symmetry label (--ignore-sym)
+        all_write (bool): Write both electronic and positronic kramers pairs (-a/--all-write)
+        positronic_write (bool): Write only positronic kramers pairs (-p/--positronic-write)
+        no_scf (bool): The DIRAC output has no SCF calculation (--no-scf)
+        no_sort (bool): Don't sort the kramers pairs by energy (--no-sort)
+        follow (bool): Follow the DIRAC output that is still being written (--follow)
+        follow_interval (float): Polling interval in seconds used with follow (--follow-interval)
+        checkpoint_interval (float): Minimum interval in seconds between the checkpoints, 0 means no checkpoint (--checkpoint-interval)
+        resume (bool): Continue reading the DIRAC output from the checkpoint (--resume)
+        energy_window (Optional[Tuple[float, float]]): Only the MOs whose energy is in [EMIN, EMAX] are read (--energy-window)
+        mo_range (Optional[Dict[str, List[Tuple[int, int]]]]): Only the MOs whose eigenvalue number is in one of the ranges of the symmetry type are read (--mo-range)
+                                                             (e.g.) {"E1g": [(10, 20)], "E1u": [(8, 18)]}. MOs of the other symmetry types are not read.
+        symmetry (Optional[List[str]]): Only the MOs of these symmetry types are read (--symmetry)
+        moltra_active_only (bool): Only the electronic MOs within the **MOLTRA > .ACTIVE ranges are read with for_generator (--moltra-active-only)
+        moltra_margin (int): Number of eigenvalues added to both sides of the **MOLTRA > .ACTIVE ranges used with moltra_active_only (--moltra-margin)
+        header_only (bool): Only read and write the header information for dcaspt2_input_generator without reading the Vector print section (--header-only)
+        atoms (Optional[List[str]]): Only the coefficients of these atom labels are summarized (--atoms)
+        shells (Optional[List[str]]): Only the coefficients of these azimuthal labels (e.g. ["d", "f"]) are summarized (--shells)
+        all_steps (bool): Summarize every Vector print section (e.g. each step of a geometry optimization) separately (--all-steps)
+        group_by (Optional[List[str]]): Levels of GROUP_BY_LEVELS written to separate files from the same coefficients (--group-by)
+        variants (Optional[Dict[str, Options]]): Output paths and options of the output variants written from the same coefficients (--variant).
+                                                 Only the write options (for_generator, compress, threshold, decimal, ignore_*, all_write, positronic_write,
+                                                 no_sort and group_by) of each variant are used. The other options are the same as this object.
+    """
+
+    for_generator: bool
+    parallel: int
+    compress: bool
+    threshold: float
+    decimal: int
+    ignore_atom_num: bool
+    ignore_ml: bool
+    ignore_sym: bool
+    all_write: bool
+    positronic_write: bool
+    no_scf: bool
+    no_sort: bool
+    follow: bool
+    follow_interval: float
+    checkpoint_interval: float
+    resume: bool
+    energy_window: Optional[Tuple[float, float]]
+    mo_range: Optional[Dict[str, List[Tuple[int, int]]]]
+    symmetry: Optional[List[str]]
+    moltra_active_only: bool
+    moltra_margin: int
+    header_only: bool
+    atoms: Optional[List[str]]
+    shells: Optional[List[str]]
+    all_steps: bool
+    group_by: Optional[List[str]]
+    variants: "Optional[Dict[str, Options]]"
+
+    def __init__(
+        self,
+        *,
+        for_generator: bool = False,
+        parallel: int = 1,
+        compress: bool = False,
+        threshold: float = 0.1,
+        decimal: int = 5,
+        ignore_atom_num: bool = False,
+        ignore_ml: bool = False,
+        ignore_sym: bool = False,
+        all_write: bool = False,
+        positronic_write: bool = False,
+        no_scf: bool = False,
+        no_sort: bool = False,
+        follow: bool = False,
+        follow_interval: float = 1.0,
+        checkpoint_interval: float = 0,
+        resume: bool = False,
+        energy_window: Optional[Tuple[float, float]] = None,
+        mo_range: Optional[Dict[str, List[Tuple[int, int]]]] = None,
+        symmetry: Optional[List[str]] = None,
+        moltra_active_only: bool = False,
+        moltra_margin: int = 0,
+        header_only: bool = False,
+        atoms: Optional[List[str]] = None,
+        shells: Optional[List[str]] = None,
+        all_steps: bool = False,
+        group_by: Optional[List[str]] = None,
+        variants: "Optional[Dict[str, Options]]" = None,
+    ) -> None:
+        self.for_generator = for_generator
+        self.parallel = parallel
+        self.compress = compress
+        self.threshold = threshold
+        self.decimal = decimal
+        self.ignore_atom_num = ignore_atom_num
+        self.ignore_ml = ignore_ml
+        self.ignore_sym = ignore_sym
+        self.all_write = all_write
+        self.positronic_write = positronic_write
+        self.no_scf = no_scf
+        self.no_sort = no_sort
+        self.follow = follow
+        self.follow_interval = follow_interval
+        self.checkpoint_interval = checkpoint_interval
+        self.resume = resume
+        self.energy_window = energy_window
+        self.mo_range = mo_range
+        self.symmetry = symmetry
+        self.moltra_active_only = moltra_active_only
+        self.moltra_margin = moltra_margin
+        self.header_only = header_only
+        self.atoms = atoms
+        self.shells = shells
+        self.all_steps = all_steps
+        self.group_by = group_by
+        self.variants = variants
+        self.validate()
+
+    def __repr__(self) -> str:
+        return f"Options({', '.join(f'{key}={value!r}' for key, value in self.__dict__.items())})"
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "Options":
+        """Create Options from the parsed command line arguments.
+
+        Raises:
+            ValueError: If the combination of the options is invalid
+        """
+        return cls(
+            for_generator=args.for_generator,
+            parallel=args.parallel,
+            compress=args.compress,
+            threshold=args.threshold,
+            decimal=args.decimal,
+            ignore_atom_num=args.ignore_atom_num,
+            ignore_ml=args.ignore_ml,
+            ignore_sym=args.ignore_sym,
+            all_write=args.all_write,
+            positronic_write=args.positronic_write,
+            no_scf=args.no_scf,
+            no_sort=args.no_sort,
+            follow=args.follow,
+            follow_interval=args.follow_interval,
+            checkpoint_interval=args.checkpoint_interval,
+            resume=args.resume,
+            energy_window=None if args.energy_window is None else (args.energy_window[0], args.energy_window[1]),
+            mo_range=None if args.mo_range is None else parse_mo_range(args.mo_range),
+            symmetry=None if args.symmetry is None else [sym for sym in args.symmetry.split(",") if sym != ""],
+            moltra_active_only=args.moltra_active_only,
+            moltra_margin=args.moltra_margin,
+            header_only=args.header_only,
+            atoms=None if args.atoms is None else [atom for atom in args.atoms.split(",") if atom != ""],
+            shells=None if args.shells is None else [shell for shell in args.shells.split(",") if shell != ""],
+            all_steps=args.all_steps,
+            group_by=None if args.group_by is None else [level for level in args.group_by.split(",") if level != ""],
+            variants=None if args.variants is None else {output: cls.from_variant_args(output, variant_args) for output, variant_args in args.variants},
+        )
+
+    @classmethod
+    def from_variant_args(cls, output: str, variant_args: argparse.Namespace) -> "Options":
+        try:
+            return cls.from_args(variant_args)
+        except ValueError as e:
+            msg = f"--variant {output}: {e}"
+            raise ValueError(msg) from e
+
+    def validate(self) -> None:
+        """Check the combination of the options and set the dependent options.
+
+        Raises:
+            ValueError: If the combination of the options is invalid
+        """
+        # -g and -p, --no-scf options are exclusive
+        if self.for_generator and self.positronic_write:
+            msg = "-g/--for-generator and -p/--positronic-write options cannot be set at the same time \
+because dcaspt2_input_generator needs data of electronic orbitals."
+            raise ValueError(msg)
+        if self.for_generator and self.no_scf:
+            msg = "-g/--for-generator and --no-scf options cannot be set at the same time \
+because dcaspt2_input_generator needs eigenvalues information after SCF calculation."
+            raise ValueError(msg)
+
+        if self.for_generator:
+            self.no_scf = False
+            self.compress = True
+            self.positronic_write = False
+
+        if not (self.no_scf or self.positronic_write) and self.compress:
+            self.for_generator = True
+
+        if self.all_write and self.positronic_write:
+            msg = "-a/--all-write and -p/--positronic-write options cannot be set at the same time."
+            raise ValueError(msg)
+
+        if self.parallel < 1:
+            msg = f"-j/--parallel must be a positive integer, but got {self.parallel}."
+            raise ValueError(msg)
+        if self.follow and self.parallel != 1:
+            msg = "--follow and -j/--parallel options cannot be set at the same time."
+            raise ValueError(msg)
+        if (self.checkpoint_interval > 0 or self.resume) and self.parallel != 1:
+            msg = "--checkpoint-interval/--resume and -j/--parallel options cannot be set at the same time."
+            raise ValueError(msg)
+        if (self.checkpoint_interval > 0 or self.resume) and self.follow:
+            msg = "--checkpoint-interval/--resume and --follow options cannot be set at the same time."
+            raise ValueError(msg)
+
+        if self.energy_window is not None and self.energy_window[0] > self.energy_window[1]:
+            msg = f"--energy-window EMIN must be smaller than or equal to EMAX, but got EMIN={self.energy_window[0]} > EMAX={self.energy_window[1]}."
+            raise ValueError(msg)
+        if self.mo_range is not None:
+            for symmetry_type, ranges in self.mo_range.items():
+                for first, last in ranges:
+                    if first < 1 or first > last:
+                        msg = f"--mo-range must be 1 <= FIRST <= LAST, but got {symmetry_type}:{first}..{last}."
+                        raise ValueError(msg)
+
+        if self.moltra_active_only and not self.for_generator:
+            msg = "--moltra-active-only option can be used only with -g/--for-generator option \
+because the **MOLTRA > .ACTIVE ranges are read only for dcaspt2_input_generator."
+            raise ValueError(msg)
+        if self.header_only and not self.for_generator:
+            msg = "--header-only option can be used only with -g/--for-generator option because the header information is written only for dcaspt2_input_generator."
+            raise ValueError(msg)
+        if self.header_only and self.follow:
+            msg = "--header-only and --follow options cannot be set at the same time."
+            raise ValueError(msg)
+        if self.shells is not None and any(len(shell) != 1 for shell in self.shells):
+            msg = f"--shells must be comma separated azimuthal labels (e.g. s,p,d,f), but got {','.join(self.shells)}."
+            raise ValueError(msg)
+        if self.all_steps and (self.follow or self.checkpoint_interval > 0 or self.resume or self.header_only):
+            msg = "--all-steps option cannot be used with --follow, --checkpoint-interval, --resume and --header-only options."
+            raise ValueError(msg)
+        if self.group_by is not None:
+            invalid_levels = [level for level in self.group_by if level not in GROUP_BY_LEVELS]
+            if len(invalid_levels) > 0 or len(self.group_by) == 0:
+                msg = f"--group-by must be comma separated levels of {', '.join(GROUP_BY_LEVELS)}, but got {','.join(self.group_by)}."
+                raise ValueError(msg)
+            if len(set(self.group_by)) != len(self.group_by):
+                msg = f"--group-by levels must not be duplicated, but got {','.join(self.group_by)}."
+                raise ValueError(msg)
+            if self.follow or self.header_only:
+                msg = "--group-by option cannot be used with --follow and --header-only options."
+                raise ValueError(msg)
+        if self.variants is not None and (self.follow or self.header_only):
+            msg = "--variant option cannot be used with --follow and --header-only options."
+            raise ValueError(msg)
+        if self.moltra_margin < 0:
+            msg = f"--moltra-margin must be a non-negative integer, but got {self.moltra_margin}."
+            raise ValueError(msg)
+
+    def get_group_ignore_flags(self, group_by: str) -> Dict[str, bool]:
+        """Get the keyword arguments of DataMO.get_coefficients for the level of --group-by option (e.g. "atom+shell")"""
+        ignored = GROUP_BY_LEVELS[group_by]
+        return {
+            "ignore_atom_num": self.ignore_atom_num,
+            "ignore_ml": self.ignore_ml or "ml" in ignored,
+            "ignore_sym": self.ignore_sym or "sym" in ignored,
+            "ignore_atom": "atom" in ignored,
+            "ignore_shell": "shell" in ignored,
+        }
+
+    def get_variants_parse_options(self) -> "Options":
+        """Get the options to read the DIRAC output once for this output and all variants.
+
+        The data needed by any of the outputs are read (e.g. the header information if any of them is for dcaspt2_input_generator),
+        and the MOs are not sorted by energy because each output is sorted when it is written (see Result.with_options).
+        """
+        all_options = [self] if self.variants is None else [self, *self.variants.values()]
+        parse_options = copy.copy(self)
+        parse_options.for_generator = any(options.for_generator for options in all_options)
+        # mo_info is formatted again for each output, so compress is only set to satisfy the validation
+        parse_options.compress = parse_options.for_generator
+        electronic = any(options.should_write_electronic() for options in all_options)
+        positronic = any(options.should_write_positronic() for options in all_options)
+        parse_options.all_write = electronic and positronic
+        parse_options.positronic_write = positronic and not electronic
+        parse_options.no_sort = True
+        parse_options.group_by = None
+        parse_options.variants = None
+        parse_options.validate()
+        return parse_options
+
+    def should_write_electronic(self) -> bool:
+        return self.all_write or not self.positronic_write
+
+    def should_write_positronic(self) -> bool:
+        return self.all_write or self.positronic_write
+
+    def get_selected_sym_types(self) -> Optional[Set[str]]:
+        """Get the symmetry types selected by --symmetry and --mo-range options (None if all symmetry types are selected)"""
+        selected: Optional[Set[str]] = None
+        if self.symmetry is not None:
+            selected = set(self.symmetry)
+        if self.mo_range is not None:
+            selected = set(self.mo_range.keys()) if selected is None else selected & set(self.mo_range.keys())
+        return selected
+
+    def is_selected_mo(self, symmetry_type: str, eigenvalue_no: int, mo_energy: float) -> bool:
+        """Check whether the MO passes the --energy-window, --mo-range and --symmetry filters"""
+        if self.symmetry is not None and symmetry_type not in self.symmetry:
+            return False
+        if self.energy_window is not None and not self.energy_window[0] <= mo_energy <= self.energy_window[1]:
+            return False
+        if self.mo_range is not None and all(not first <= eigenvalue_no <= last for first, last in self.mo_range.get(symmetry_type, [])):
+            return False
+        return True
+
+
+def parse_mo_range(mo_range_strs: List[str]) -> Dict[str, List[Tuple[int, int]]]:
+    """Parse the arguments of --mo-range option.
+
+    (e.g.) ["E1g:10..20", "E1u:8..18", "E1g:30..30"] => {"E1g": [(10, 20), (30, 30)], "E1u": [(8, 18)]}
+
+    Raises:
+        ValueError: If the format of the argument is invalid
+    """
+    mo_range: Dict[str, List[Tuple[int, int]]] = {}
+    for mo_range_str in mo_range_strs:
+        symmetry_type, _, range_str = mo_range_str.rpartition(":")
+        first_str, sep, last_str = range_str.partition("..")
+        if symmetry_type == "" or sep == "" or not first_str.isdigit() or not last_str.isdigit():
+            msg = f"--mo-range must be written in the format of SYM:FIRST..LAST (e.g. E1g:10..20), but got {mo_range_str}."
+            raise ValueError(msg)
+        mo_range.setdefault(symmetry_type, []).append((int(first_str), int(last_str)))
+    return mo_range
@@ -1,13 +1,16 @@
 import concurrent.futures
+import contextlib
 from enum import Enum, auto
-from typing import Dict, List, Tuple
+from operator import attrgetter
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
-from sum_dirac_dfcoef.args import args
-from sum_dirac_dfcoef.atoms import AtomInfo
-from sum_dirac_dfcoef.coefficient import get_coefficient
-from sum_dirac_dfcoef.data import DataAllMO, DataMO
+from sum_dirac_dfcoef.atoms import AtomInfo, FuncIndices
+from sum_dirac_dfcoef.checkpoint import CheckpointWriter, PrivecCheckpoint
+from sum_dirac_dfcoef.coefficient import get_coefficient, get_coefficient_value
+from sum_dirac_dfcoef.data import DataAllMO, DataMO, NonPrintedMO, get_mo_info
 from sum_dirac_dfcoef.eigenvalues import Eigenvalues
 from sum_dirac_dfcoef.functions_info import FunctionsInfo
+from sum_dirac_dfcoef.options import Options
 from sum_dirac_dfcoef.utils import debug_print, fast_deepcopy_pickle, space_separated_parsing
 
 
@@ -33,23 +36,37 @@ class PrivecProcessor:
     Attributes:
         dirac_output (List[str]): Output file strings of DIRAC
         stage (STAGE): Stage of reading coefficients
+        mo_cnt (int): Number of MOs whose coefficients have been started to read (used to distribute MOs among processes).
+                      The MOs which are not written to the output file are not counted because they are skipped by all processes.
         is_electronic (bool): True if the current MO is electronic
-        is_less_than_dirac_21 (bool): True if the current version of DIRAC is less than 21.
-                                      Use this variable to determine which attribute (func_idx_dirac21/19) of AtomInfo should be used.
-        eigenvalues (Eigenvalues): Eigenvalues
+        is_less_than_dirac_21 (Optional[bool]): True if the version of DIRAC is less than 21.
+                                                Use this variable to determine which attribute (func_idx_dirac21/19) of AtomInfo should be used.
+                                                It is determined from the banner of the DIRAC output (FunctionsInfo.dirac_version) if possible,
+                                                otherwise from the function indices of the coefficients (None until it is determined).
+        get_func_idx (Callable[[AtomInfo], FuncIndices]): Returns the function indices of AtomInfo for the numbering of the DIRAC version
+        eigenvalues (Eigenvalues): Eigenvalues (used only by complete_data_all_mo, so it can be replaced after reading the Vector print section)
         mo_sym_type (str): Symmetry type of the current MO
         functions_info (FunctionsInfo): FunctionsInfo (used to handle which functions are used in the current MO)
         data_mo (DataMO): DataMO (temporary result of current reading MO)
         data_all_mo (DataAllMO): DataAllMO (final result)
         used_atom_info (Dict[str, AtomInfo]): Used AtomInfo
         current_atom_info (AtomInfo): Current AtomInfo
+        current_func_idx (FuncIndices): The function indices of current_atom_info (get_func_idx(current_atom_info))
+        is_current_atom_selected (bool): True if the atom label of current_atom_info is selected by --atoms option
+        read_sym_types (Set[str]): Symmetry types whose MOs have been started to read in the Vector print section
+        moltra_mo_range (Optional[Dict[str, List[Tuple[int, int]]]]): If set, only the electronic MOs within these eigenvalue number ranges are read
+                                                                     (set by HeaderInfo.get_moltra_mo_range() with options.moltra_active_only)
+        checkpoint_writer (Optional[CheckpointWriter]): Writes the checkpoints periodically if it is set (single-process version only)
+        options (Options): Options of sum_dirac_dfcoef
     """
 
-    def __init__(self, dirac_output: List[str], functions_info: FunctionsInfo, eigenvalues: Eigenvalues) -> None:
+    def __init__(self, dirac_output: List[str], functions_info: FunctionsInfo, eigenvalues: Eigenvalues, options: Options) -> None:
         self.dirac_output = dirac_output
         self.stage = STAGE.INIT
+        self.mo_cnt = 0
         self.is_electronic = False
-        self.is_less_than_dirac_21 = False
+        self.is_less_than_dirac_21: Optional[bool] = None
+        self.get_func_idx: Callable[[AtomInfo], FuncIndices] = attrgetter("func_idx_dirac21")
         self.eigenvalues = eigenvalues
         self.mo_sym_type = ""
         self.functions_info = functions_info
@@ -57,73 +74,123 @@ class PrivecProcessor:
         self.data_all_mo = DataAllMO()
         self.used_atom_info: Dict[str, AtomInfo] = {}
         self.current_atom_info = AtomInfo()
-
-    def read_privec_data(self, rank: int = 0) -> Tuple[DataAllMO, Eigenvalues]:
+        self.current_func_idx = FuncIndices()
+        self.is_current_atom_selected = True
+        self.read_sym_types: Set[str] = set()
+        self.moltra_mo_range: Optional[Dict[str, List[Tuple[int, int]]]] = None
+        self.checkpoint_writer: Optional[CheckpointWriter] = None
+        self.options = options
+        if functions_info.dirac_version is not None:
+            self.set_dirac_version(functions_info.dirac_version < 21)
+        if options.atoms is not None:
+            atom_labels = {atom_label for sym_dict in functions_info.values() for atom_dict in sym_dict.values() for atom_label in atom_dict.keys()}
+            unknown_atoms = [atom for atom in options.atoms if atom not in atom_labels]
+            if len(unknown_atoms) > 0:
+                print(f"WARNING: The atom labels {','.join(unknown_atoms)} of --atoms option are not found in the DIRAC output. atom labels: {','.join(sorted(atom_labels))}")
+
+    def set_dirac_version(self, is_less_than_dirac_21: bool) -> None:
+        self.is_less_than_dirac_21 = is_less_than_dirac_21
+        self.get_func_idx = attrgetter("func_idx_dirac19" if is_less_than_dirac_21 else "func_idx_dirac21")
+
+    def read_privec_data(self, rank: int = 0) -> DataAllMO:
         """Read coefficients from the output file of DIRAC and store them in data_all_mo.
 
         self.data_all is the final result of this function. You can get all results from this variable except header information.
         """
-        self.stage = STAGE.INIT
-        mo_cnt = 0
-        for line_str in self.dirac_output:
+        for line_idx, line_str in enumerate(self.dirac_output):
+            self.process_line(line_str, rank)
             if self.stage == STAGE.END:
                 break  # End of reading coefficients
-            elif self.stage == STAGE.SKIP_READING_COEF:
-                if len(line_str.strip()) == 0:
-                    self.transition_stage(STAGE.WAIT_END_READING_COEF)
-                continue
-            elif self.stage == STAGE.SKIP_AFTER_VECTOR_PRINT_LINE:
-                self.transition_stage(STAGE.VECTOR_PRINT)
-                continue
+            elif self.stage == STAGE.WAIT_END_READING_COEF and self.checkpoint_writer is not None:
+                # All MOs before the next line have been read
+                self.checkpoint_writer.write_if_needed(line_idx + 1, self)
 
-            words = space_separated_parsing(line_str)
+        return self.data_all_mo
 
-            if self.need_to_skip_this_line(words):
-                if self.stage == STAGE.VECTOR_PRINT and self.detect_next_titler(line_str):
-                    msg = "WARNING: The next title is detected before the end of reading coefficients.\n\
+    def process_line(self, line_str: str, rank: int = 0) -> None:
+        """Advance the reading stage by one line of the output file of DIRAC.
+
+        read_privec_data calls this method for each line, and the --follow mode calls it as lines are appended to the file.
+        The result of a MO is added to self.data_all_mo as soon as the MO is completed.
+        """
+        if self.stage == STAGE.END:
+            return
+        elif self.stage == STAGE.SKIP_READING_COEF:
+            if len(line_str.strip()) == 0:
+                self.transition_stage(STAGE.WAIT_END_READING_COEF)
+            return
+        elif self.stage == STAGE.SKIP_AFTER_VECTOR_PRINT_LINE:
+            self.transition_stage(STAGE.VECTOR_PRINT)
+            return
+
+        words = space_separated_parsing(line_str)
+
+        if self.need_to_skip_this_line(words):
+            if self.stage == STAGE.VECTOR_PRINT and self.detect_next_titler(line_str):
+                msg = "WARNING: The next title is detected before the end of reading coefficients.\n\
 In order to force DIRAC to print vector print, please add .ANALYZE and .PRIVEC option to the input file of DIRAC."
-                    print(msg)
-                    self.transition_stage(STAGE.END)
-                elif self.stage == STAGE.READING_COEF:
-                    if self.need_to_create_results_for_current_mo(words):
-                        self.add_current_mo_data_to_data_all_mo()
-                        self.transition_stage(STAGE.WAIT_END_READING_COEF)
-
-            elif self.stage == STAGE.INIT:
-                if self.check_start_vector_print(words):
-                    self.transition_stage(STAGE.SKIP_AFTER_VECTOR_PRINT_LINE)
-
-            elif self.stage == STAGE.VECTOR_PRINT:
-                if self.need_to_get_mo_sym_type(words):
-                    self.mo_sym_type = words[2]
+                print(msg)
+                self.transition_stage(STAGE.END)
+            elif self.stage == STAGE.READING_COEF:
+                if self.need_to_create_results_for_current_mo(words):
+                    self.add_current_mo_data_to_data_all_mo()
                     self.transition_stage(STAGE.WAIT_END_READING_COEF)
 
-            elif self.stage == STAGE.WAIT_END_READING_COEF:
-                if self.need_to_get_mo_sym_type(words):
-                    self.mo_sym_type = words[2]
-                elif self.need_to_start_mo_section(words):
-                    self.start_mo_section(words)
-                    self.transition_stage(STAGE.WAIT_FIRST_COEF)
-                elif self.check_end_vector_print(words):
+        elif self.stage == STAGE.INIT:
+            if self.check_start_vector_print(words):
+                self.read_sym_types.clear()
+                self.transition_stage(STAGE.SKIP_AFTER_VECTOR_PRINT_LINE)
+
+        elif self.stage == STAGE.VECTOR_PRINT:
+            if self.need_to_get_mo_sym_type(words):
+                self.mo_sym_type = words[2]
+                self.read_sym_types.add(self.mo_sym_type)
+                self.transition_stage(STAGE.WAIT_END_READING_COEF)
+
+        elif self.stage == STAGE.WAIT_END_READING_COEF:
+            if self.need_to_get_mo_sym_type(words):
+                self.mo_sym_type = words[2]
+                if self.is_all_selected_sym_types_read():
+                    # The MOs of the remaining symmetry types are not selected by --symmetry/--mo-range options
                     self.transition_stage(STAGE.END)
-
-            elif self.stage == STAGE.WAIT_FIRST_COEF:
-                if self.is_this_row_for_coefficients(words):
-                    if args.parallel == 1 or mo_cnt % args.parallel == rank:
-                        # Need to read coefficients of the current MO
-                        self.add_coefficient(line_str)
-                        self.transition_stage(STAGE.READING_COEF)
-                    else:
-                        # Don't need to read coefficients of the current MO because it is read by another process.
-                        # multi-process version only
-                        self.transition_stage(STAGE.SKIP_READING_COEF)
-                    mo_cnt += 1
-
-            elif self.stage == STAGE.READING_COEF:
-                if self.is_this_row_for_coefficients(words):
+                    return
+                self.read_sym_types.add(self.mo_sym_type)
+            elif self.need_to_start_mo_section(words):
+                self.start_mo_section(words)
+                if self.need_to_read_current_mo():
+                    self.transition_stage(STAGE.WAIT_FIRST_COEF)
+                else:
+                    # Don't need to read coefficients of the current MO because it is not written to the output file.
+                    # (e.g. positronic MOs without -a/--all-write or -p/--positronic-write option, MOs out of --energy-window)
+                    self.transition_stage(STAGE.SKIP_READING_COEF)
+            elif self.check_end_vector_print(words):
+                self.transition_stage(STAGE.END)
+
+        elif self.stage == STAGE.WAIT_FIRST_COEF:
+            if self.is_this_row_for_coefficients(words):
+                if self.options.parallel == 1 or self.mo_cnt % self.options.parallel == rank:
+                    # Need to read coefficients of the current MO
                     self.add_coefficient(line_str)
-
-        return self.data_all_mo, self.eigenvalues
+                    self.transition_stage(STAGE.READING_COEF)
+                else:
+                    # Don't need to read coefficients of the current MO because it is read by another process.
+                    # multi-process version only
+                    self.transition_stage(STAGE.SKIP_READING_COEF)
+                self.mo_cnt += 1
+
+        elif self.stage == STAGE.READING_COEF:
+            if self.is_this_row_for_coefficients(words):
+                self.add_coefficient(line_str)
+
+    def restore_checkpoint(self, checkpoint: PrivecCheckpoint) -> None:
+        """Restore the state just after a MO has been read. self.dirac_output must start from checkpoint.byte_offset."""
+        self.data_all_mo = checkpoint.data_all_mo
+        self.mo_sym_type = checkpoint.mo_sym_type
+        self.data_mo.eigenvalue_no = checkpoint.eigenvalue_no
+        self.mo_cnt = checkpoint.mo_cnt
+        # The symmetry types which have no stored MO may also have been read, but they are unknown here (used only to stop reading early)
+        self.read_sym_types = {mo.sym_type for mo in self.data_all_mo.electronic + self.data_all_mo.positronic} | {checkpoint.mo_sym_type}
+        self.transition_stage(STAGE.WAIT_END_READING_COEF)
 
     def transition_stage(self, new_stage: STAGE) -> None:
         self.stage = new_stage
@@ -132,6 +199,24 @@ In order to force DIRAC to print vector print, please add .ANALYZE and .PRIVEC o
         # min: 4 coefficients and other words => 5 words
         return True if 5 <= len(words) <= 9 and words[0].isdigit() else False
 
+    def need_to_read_current_mo(self) -> bool:
+        if not (self.options.should_write_electronic() if self.is_electronic else self.options.should_write_positronic()):
+            return False
+        if self.is_electronic and self.moltra_mo_range is not None:
+            eigenvalue_no = self.data_mo.eigenvalue_no
+            if all(not first <= eigenvalue_no <= last for first, last in self.moltra_mo_range.get(self.mo_sym_type, [])):
+                return False
+        return self.options.is_selected_mo(self.mo_sym_type, self.data_mo.eigenvalue_no, self.data_mo.mo_energy)
+
+    def is_all_selected_sym_types_read(self) -> bool:
+        """Check whether the MOs of all symmetry types selected by --symmetry/--mo-range options have been read.
+        The Vector print section is written for each symmetry type in turn, so this method is called when the next symmetry type starts.
+        """
+        selected_sym_types = self.options.get_selected_sym_types()
+        if selected_sym_types is None or self.mo_sym_type in selected_sym_types:
+            return False
+        return selected_sym_types.issubset(self.read_sym_types)
+
     def need_to_skip_this_line(self, words: List[str]) -> bool:
         return True if len(words) <= 1 else False
 
@@ -153,7 +238,8 @@ In order to force DIRAC to print vector print, please add .ANALYZE and .PRIVEC o
             return True
         return False
 
-    def check_start_vector_print(self, words: List[str]) -> bool:
+    @staticmethod
+    def check_start_vector_print(words: List[str]) -> bool:
         # ****************************** Vector print ******************************
         if len(words) < 4:
             return False
@@ -168,12 +254,7 @@ In order to force DIRAC to print vector print, please add .ANALYZE and .PRIVEC o
         return False
 
     def get_mo_info(self, eigenvalue_no: int) -> str:
-        if args.compress:
-            return f"{self.mo_sym_type} {eigenvalue_no}"
-        elif self.is_electronic:
-            return f"Electronic no. {eigenvalue_no} {self.mo_sym_type}"
-        else:
-            return f"Positronic no. {eigenvalue_no} {self.mo_sym_type}"
+        return get_mo_info(self.mo_sym_type, eigenvalue_no, self.is_electronic, self.options.compress)
 
     def start_mo_section(self, words: List[str]) -> None:
         """
@@ -214,123 +295,101 @@ In order to force DIRAC to print vector print, please add .ANALYZE and .PRIVEC o
         self.data_mo.mo_info = mo_info
         self.used_atom_info.clear()  # reset used_atom_info because we need to delete used_atom_info of the previous MO
         self.current_atom_info = AtomInfo()  # reset current_atom_info because self.current_atom_info.count_remaining_functions() may be larger than 0
+        self.current_func_idx = FuncIndices()
 
     def add_coefficient(self, line_str: str) -> None:
-        def get_func_no() -> int:
-            try:
-                num_functions = int(line_str[:10])
-            except ValueError as e:
-                msg = f"num_functions must be integer, but got {line_str[:10]}"
-                raise ValueError(msg) from e
-            return num_functions
-
-        def is_dirac_version_less_than_21():
-            if self.is_less_than_dirac_21:
-                return True
-            for atom_info in self.functions_info[component_func][symmetry_label][atom_label].values():
-                if atom_info.func_idx_dirac21.first <= num_functions <= atom_info.func_idx_dirac21.last:
-                    # If the num_functions is include in the range of the current atom_info indices, it means that the current atom is DIRAC 21 or later.
-                    return False
-            return True
+        try:
+            num_functions = int(line_str[:10])
+        except ValueError as e:
+            msg = f"num_functions must be integer, but got {line_str[:10]}"
+            raise ValueError(msg) from e
+        gto_type = line_str[18:22].strip()  # GTOTYP (e.g. "s   "), gto_type="s"
 
-        def need_to_update_current_atom_info():
-            first = self.current_atom_info.func_idx_dirac19.first if self.is_less_than_dirac_21 else self.current_atom_info.func_idx_dirac21.first
-            last = self.current_atom_info.func_idx_dirac19.last if self.is_less_than_dirac_21 else self.current_atom_info.func_idx_dirac21.last
-            if first <= num_functions <= last:
-                return False
-            return True
+        if not self.current_func_idx.first <= num_functions <= self.current_func_idx.last:
+            self.update_current_atom_info(line_str, num_functions)
+
+        self.current_atom_info.decrement_function(gto_type)
+        if not self.is_current_atom_selected or (self.options.shells is not None and line_str[18:19] not in self.options.shells):
+            # The atomic orbitals which are not selected by --atoms/--shells options are only used for the normalization constant
+            self.data_mo.add_norm_const(get_coefficient_value(line_str), self.current_atom_info.mul)
+            return
+        coef = get_coefficient(line_str, self.functions_info, self.current_atom_info.idx_within_same_atom)
+        self.data_mo.add_coefficient(coef)
 
-        num_functions = get_func_no()
+    def update_current_atom_info(self, line_str: str, num_functions: int) -> None:
+        """Find the AtomInfo which includes the function index num_functions and set it to self.current_atom_info.
+        This method is called only when the atom of the coefficient changes.
+        """
         component_func = "large" if line_str[10] == "L" else ("small" if line_str[10] == "S" else "")  # CLS
         symmetry_label = line_str[12:15].strip()  # REP (e.g. "Ag "), symmetry_label="Ag"
         atom_label = line_str[15:18].strip()  # NAMN (e.g. "Cm "), atom_labe="Cm"
-        gto_type = line_str[18:22].strip()  # GTOTYP (e.g. "s   "), gto_type="s"
         label = symmetry_label + atom_label
-
-        if need_to_update_current_atom_info():
-            self.is_less_than_dirac_21 = is_dirac_version_less_than_21()
-            found_next_atom_info = False
-            for atom_info in self.functions_info[component_func][symmetry_label][atom_label].values():
-                start = atom_info.func_idx_dirac19.first if self.is_less_than_dirac_21 else atom_info.func_idx_dirac21.first
-                end = atom_info.func_idx_dirac19.last if self.is_less_than_dirac_21 else atom_info.func_idx_dirac21.last
-                if start <= num_functions <= end:
-                    found_next_atom_info = True
-                    self.current_atom_info = fast_deepcopy_pickle(atom_info)
-                    self.used_atom_info[label] = atom_info
-                    break
-            if not found_next_atom_info:
-                msg = f"The corresponding atom_info is not found in functions_info[{component_func}][{symmetry_label}][{atom_label}],\
-                    list[atom_info] = {list(self.functions_info[component_func][symmetry_label][atom_label].values())}"
-                raise Exception(msg)
-
-        self.current_atom_info.decrement_function(gto_type)
-        coef = get_coefficient(line_str, self.functions_info, self.current_atom_info.idx_within_same_atom)
-        for idx in range(coef.multiplication):
-            atom_idx = coef.idx_within_same_atom + idx
-            self.data_mo.add_coefficient(atom_idx, coef)
+        atom_infos = self.functions_info[component_func][symmetry_label][atom_label].values()
+
+        if self.is_less_than_dirac_21 is None and all(not atom_info.func_idx_dirac21.first <= num_functions <= atom_info.func_idx_dirac21.last for atom_info in atom_infos):
+            # The DIRAC version is not written in the output. If num_functions is not included in the range of the DIRAC 21 or later indices,
+            # it means that the DIRAC version is less than 21. (Otherwise the function indices are the same for both versions so far)
+            self.set_dirac_version(is_less_than_dirac_21=True)
+
+        for atom_info in atom_infos:
+            func_idx = self.get_func_idx(atom_info)
+            if func_idx.first <= num_functions <= func_idx.last:
+                self.current_atom_info = fast_deepcopy_pickle(atom_info)
+                self.current_func_idx = func_idx
+                self.is_current_atom_selected = self.options.atoms is None or atom_label in self.options.atoms
+                self.used_atom_info[label] = atom_info
+                return
+        msg = f"The corresponding atom_info is not found in functions_info[{component_func}][{symmetry_label}][{atom_label}],\
+            list[atom_info] = {list(atom_infos)}"
+        raise Exception(msg)
 
     def add_current_mo_data_to_data_all_mo(self) -> None:
-        self.data_mo.filter_coefficients_by_threshold()
         # add current MO data to data_all_mo
         # create a new DataMO object using pickle
         copy_data_mo = fast_deepcopy_pickle(self.data_mo)
         if self.is_electronic:
             self.data_all_mo.electronic.append(copy_data_mo)
-            cur_sym = self.mo_sym_type
-            if args.for_generator:
-                self.eigenvalues.energies_used[cur_sym][self.data_mo.eigenvalue_no] = True
         else:
             self.data_all_mo.positronic.append(copy_data_mo)
         debug_print(f"End of reading {self.data_mo.eigenvalue_no}th MO")
 
-    def read_privec_data_wrapper(self):
+    def read_privec_data_wrapper(self, executor: Optional[concurrent.futures.Executor] = None) -> None:
         """Read coefficients from the output file of DIRAC and store them in data_all_mo.
         This function is intended to wrap the processing of
         read_privec_data between the single-process and multiprocess versions.
-        """
+        Call complete_data_all_mo after this method to finish data_all_mo.
 
-        def merge_energies_used(eigenvalues: Eigenvalues) -> None:
-            """If multi-process version is used, eigenvalues.energies_used is stored in different memory space.
-            Therefore, we need to merge eigenvalues.energies_used of each process.
-
-            Args:
-                eigenvalues (Eigenvalues): eigenvalues.energies_used of each process is stored in this variable.
-            """
-            for sym_type_key, val in eigenvalues.energies_used.items():
-                for eigenvalue_no, is_found in val.items():
-                    if is_found:
-                        self.eigenvalues.energies_used[sym_type_key][eigenvalue_no] = True
+        Args:
+            executor (Optional[concurrent.futures.Executor]): The process pool used by the multi-process version.
+                                                              A new process pool is created if it is None.
+        """
 
-        num_processes = int(args.parallel)
+        num_processes = int(self.options.parallel)
         if num_processes > 1:
             # Multi-process version
-            with concurrent.futures.ProcessPoolExecutor() as executor:
-                futures = [executor.submit(self.read_privec_data, i) for i in range(num_processes)]
+            with concurrent.futures.ProcessPoolExecutor() if executor is None else contextlib.nullcontext(executor) as pool:
+                futures = [pool.submit(self.read_privec_data, i) for i in range(num_processes)]
                 result_list = [future.result() for future in concurrent.futures.as_completed(futures)]
-            for result in result_list:
-                data_all_mo = result[0]
+            for data_all_mo in result_list:
                 self.data_all_mo.electronic.extend(data_all_mo.electronic)
                 self.data_all_mo.positronic.extend(data_all_mo.positronic)
-                eigenvalues = result[1]
-                merge_energies_used(eigenvalues)
         else:
             # Single-process version
             self.read_privec_data()
 
-        if args.for_generator:
+    def complete_data_all_mo(self) -> None:
+        """Finish self.data_all_mo after all coefficients have been read."""
+        if self.options.for_generator:
             self.fill_non_moltra_range_electronic_eigenvalues()
         self.data_all_mo.sort_mo_sym_type()
 
     def fill_non_moltra_range_electronic_eigenvalues(self):
-        self.is_electronic = True
-        for sym_type_key, val in self.eigenvalues.energies_used.items():
-            self.mo_sym_type = sym_type_key
-            for eigenvalue_no, used in val.items():
-                if not used:
-                    self.data_mo.reset()
-                    self.data_mo.eigenvalue_no = eigenvalue_no
-                    self.data_mo.mo_info = self.get_mo_info(eigenvalue_no)
-                    self.data_mo.sym_type = sym_type_key
-                    self.data_mo.mo_energy = self.eigenvalues.energies[sym_type_key][eigenvalue_no]
-                    copy_data_mo = fast_deepcopy_pickle(self.data_mo)
-                    self.data_all_mo.electronic.append(copy_data_mo)
+        # The eigenvalues are marked here (not while reading) so that the Vector print section can be read before the eigenvalues are read.
+        # self.data_all_mo already has the MOs read by all processes, so the used eigenvalues of each process don't need to be merged.
+        for mo in self.data_all_mo.electronic:
+            self.eigenvalues.set_energy_used(mo.sym_type, mo.eigenvalue_no)
+        for sym_type_key in self.eigenvalues.energies_used.keys():
+            self.data_all_mo.electronic.extend(
+                NonPrintedMO(sym_type_key, eigenvalue_no, self.eigenvalues.get_energy(sym_type_key, eigenvalue_no), self.options.compress)
+                for eigenvalue_no in self.eigenvalues.get_unused_eigenvalue_nos(sym_type_key)
+            )
@@ -1,4 +1,5 @@
-from typing import ClassVar, List, Tuple
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
 
 class Subshell:
@@ -7,10 +8,14 @@ class Subshell:
     Attributes:
         orbital_labels (str): All possible orbital labels.
         gto_label_order (List[List[str]]): All possible subshell labels and their order. i.e. gto_label_order = [["s"], ["px", "py", "pz"], ...] after initialization.
+        orbital_label_rank (Dict[str, int]): Order of the orbital labels. i.e. orbital_label_rank = {"s": 0, "p": 1, ...}
+        gto_label_rank (Dict[str, Dict[str, int]]): Order of the GTO labels for each orbital label. i.e. gto_label_rank = {"s": {"s": 0}, "p": {"px": 0, "py": 1, "pz": 2}, ...}
     """
 
     orbital_labels = "spdfghiklmnoqrtuvwxyz"
-    gto_label_order: ClassVar[List[List[str]]] = []
+    gto_label_order: List[List[str]]
+    orbital_label_rank: Dict[str, int]
+    gto_label_rank: Dict[str, Dict[str, int]]
 
     def __lmnval(self, idx: int, nfun: int, istep: List[int], mval: List[int], nval: List[int]) -> Tuple[List[int], List[int], List[int]]:
         # https://gitlab.com/dirac/dirac/-/blob/b10f505a6f00c29a062f5cad70ca156e72e012d7/src/abacus/hergam.F#L218-236
@@ -34,6 +39,7 @@ class Subshell:
         return istep, mval, nval
 
     def __init__(self):
+        self.gto_label_order = []
         istep, mval, nval = self.__carpow()
         # https://gitlab.com/dirac/dirac/-/blob/b10f505a6f00c29a062f5cad70ca156e72e012d7/src/abacus/herrdn.F#L4995-5021
         for idx, orbital_label in enumerate(self.orbital_labels):
@@ -42,7 +48,7 @@ class Subshell:
             elif orbital_label == "p":
                 self.gto_label_order.append(["px", "py", "pz"])
             elif orbital_label == "d":
-                self.gto_label_order.append(["dxy", "dxy", "dxz", "dyy", "dyz", "dzz"])
+                self.gto_label_order.append(["dxx", "dxy", "dxz", "dyy", "dyz", "dzz"])
             elif orbital_label == "f":
                 self.gto_label_order.append(["fxxx", "fxxy", "fxxz", "fxyy", "fxyz", "fxzz", "fyyy", "fyyz", "fyzz", "fzzz"])
             else:
@@ -52,6 +58,13 @@ class Subshell:
                 for k in range(nfun):
                     li.append(self.orbital_labels[idx] + str(ix[k]) + str(iy[k]) + str(iz[k]))
                 self.gto_label_order.append(li)
+        self.orbital_label_rank = {orbital_label: rank for rank, orbital_label in enumerate(self.orbital_labels)}
+        self.gto_label_rank = {
+            orbital_label: {gto_label: rank for rank, gto_label in enumerate(gto_labels)} for orbital_label, gto_labels in zip(self.orbital_labels, self.gto_label_order)
+        }
 
 
-subshell_order = Subshell()
+@lru_cache(maxsize=None)
+def get_subshell_order() -> Subshell:
+    """Get the Subshell table. The table is built at the first call (not at import) and shared after that."""
+    return Subshell()
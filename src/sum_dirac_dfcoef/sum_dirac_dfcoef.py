@@ -1,42 +1,66 @@
 #!/usr/bin/env python3
-from sum_dirac_dfcoef.args import args
-from sum_dirac_dfcoef.file_writer import output_file_writer
-from sum_dirac_dfcoef.functions_info import get_functions_info
-from sum_dirac_dfcoef.header_info import HeaderInfo
-from sum_dirac_dfcoef.privec_reader import PrivecProcessor
-from sum_dirac_dfcoef.utils import get_dirac_filepath, should_write_electronic_results_to_file, should_write_positronic_results_to_file
+from pathlib import Path
+from typing import IO, Union
+
+from sum_dirac_dfcoef.args import parse_args
+from sum_dirac_dfcoef.options import Options
+from sum_dirac_dfcoef.utils import enable_debug_print, get_dirac_filepath
 
 
 def main() -> None:
-    dirac_filepath = get_dirac_filepath()
-    dirac_output = open(dirac_filepath, encoding="utf-8")
-    dirac_output.seek(0)  # rewind to the beginning of the file
-    header_info = HeaderInfo()
-    if args.for_generator:
-        header_info.read_header_info(dirac_output)
-    dirac_output.seek(0)
-    functions_info = get_functions_info(dirac_output)
-    output_file_writer.create_blank_file()
-
-    dirac_output_lines = dirac_output.readlines()
-    # Read coefficients from the output file of DIRAC and store them in data_all_mo.
-    privec_processor = PrivecProcessor(dirac_output_lines, functions_info, header_info.eigenvalues)
-    privec_processor.read_privec_data_wrapper()
-
-    # Write the header information to the output file.
-    if args.for_generator:
-        header_info.calculate_moltra_idx_range(privec_processor.data_all_mo)
-        output_file_writer.write_headerinfo(header_info)
-    else:
-        # If the output file is not for dcaspt2_input_generator, don't write header information.
-        output_file_writer.write_no_header_info()
-
-    # Sort the MOs by energy.
-    if not args.no_sort:
-        privec_processor.data_all_mo.sort_mo_energy()
-
-    # Write the MO data to the output file.
-    if should_write_electronic_results_to_file():
-        output_file_writer.write_mo_data(privec_processor.data_all_mo.electronic)
-    if should_write_positronic_results_to_file():
-        output_file_writer.write_mo_data(privec_processor.data_all_mo.positronic)
+    # -v and -h options exit in parse_args(), so the modules to read DIRAC outputs are imported after parsing the arguments.
+    args = parse_args()
+    if args.debug:
+        enable_debug_print()
+    options: Options = args.options
+    if args.batch:
+        from sum_dirac_dfcoef.batch import run_batch
+
+        run_batch(args, options)
+        return
+    from sum_dirac_dfcoef.file_writer import get_output_path
+
+    write_summary(get_dirac_filepath(args.input), get_output_path(args.output), options)
+
+
+def write_summary(dirac_filepath: Union[Path, IO[str]], output_path: Path, options: Options) -> None:
+    """Summarize the coefficients of dirac_filepath and write the results to output_path.
+
+    Args:
+        dirac_filepath (Union[Path, IO[str]]): File path of the DIRAC output,
+            or the seekable DIRAC output opened in text mode (e.g. a member of a tar archive read into memory)
+        output_path (Path): File path of the sum_dirac_dfcoef output
+        options (Options): Options of sum_dirac_dfcoef
+    """
+    from sum_dirac_dfcoef.checkpoint import get_checkpoint_path
+    from sum_dirac_dfcoef.file_writer import OutputFileWriter, get_group_output_path, get_output_path, get_step_output_path
+    from sum_dirac_dfcoef.summary import Result, summarize, summarize_steps
+
+    # The main output and the variants (--variant) are written from the same result
+    outputs = [(output_path, options)]
+    if options.variants is not None:
+        outputs.extend((get_output_path(variant_output), variant_options) for variant_output, variant_options in options.variants.items())
+    parse_options = options if options.variants is None else options.get_variants_parse_options()
+
+    def write_result(result: Result, result_path: Path, write_options: Options) -> None:
+        if options.variants is not None:
+            result = result.with_options(write_options)
+        if write_options.group_by is None:
+            result.write(result_path)
+            return
+        # Write the coefficients grouped by each level to OUTPUT_NAME.LEVEL.OUTPUT_SUFFIX from the same result
+        for group_by in write_options.group_by:
+            result.write(get_group_output_path(result_path, group_by), group_by)
+
+    if options.all_steps:
+        # Write the result of each Vector print section to OUTPUT_NAME.stepN.OUTPUT_SUFFIX
+        for step, step_result in enumerate(summarize_steps(dirac_filepath, parse_options), start=1):
+            for path, write_options in outputs:
+                write_result(step_result, get_step_output_path(path, step), write_options)
+        return
+    if options.group_by is None:
+        # Create the output file first so that the user can see where the result will be written (e.g. --follow mode)
+        OutputFileWriter(output_path, options).create_blank_file()
+    result = summarize(dirac_filepath, parse_options, get_checkpoint_path(output_path))
+    for path, write_options in outputs:
+        write_result(result, path, write_options)
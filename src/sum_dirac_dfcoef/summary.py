@@ -0,0 +1,288 @@
+import concurrent.futures
+import contextlib
+import copy
+from pathlib import Path
+from typing import IO, List, Optional, Tuple, Union
+
+from sum_dirac_dfcoef.checkpoint import CheckpointWriter, load_checkpoint
+from sum_dirac_dfcoef.data import DataAllMO, DataMO, NonPrintedMO, get_mo_info
+from sum_dirac_dfcoef.eigenvalues import Eigenvalues
+from sum_dirac_dfcoef.file_writer import OutputFileWriter
+from sum_dirac_dfcoef.follow import DiracOutputFollower
+from sum_dirac_dfcoef.functions_info import FunctionsInfo, get_functions_info
+from sum_dirac_dfcoef.header_info import HeaderInfo
+from sum_dirac_dfcoef.options import Options
+from sum_dirac_dfcoef.privec_reader import STAGE, PrivecProcessor
+from sum_dirac_dfcoef.utils import get_compression, open_dirac_output, space_separated_parsing
+
+
+class Result:
+    """Summarized coefficients of a DIRAC output returned by summarize().
+
+    Attributes:
+        options (Options): Options used to summarize the DIRAC output
+        header_info (HeaderInfo): Header information (read only if options.for_generator is True)
+        data_all_mo (DataAllMO): Coefficients of the MOs (sorted by energy unless options.no_sort is True, empty if options.header_only is True).
+                                 Only the MOs written to the output file are read (e.g. positronic MOs are read only if options.all_write or options.positronic_write is True).
+    """
+
+    options: Options
+    header_info: HeaderInfo
+    data_all_mo: DataAllMO
+
+    def __init__(self, options: Options, header_info: HeaderInfo, data_all_mo: DataAllMO) -> None:
+        self.options = options
+        self.header_info = header_info
+        self.data_all_mo = data_all_mo
+
+    def __repr__(self) -> str:
+        return f"Result(electronic: {len(self.data_all_mo.electronic)} MOs, positronic: {len(self.data_all_mo.positronic)} MOs, options: {self.options})"
+
+    def with_options(self, options: Options) -> "Result":
+        """Get the result written with other write options (e.g. threshold, decimal, compress, sort and electronic/positronic selection)
+        from the same coefficients without reading the DIRAC output again.
+
+        self must be read with the options which cover the options (see Options.get_variants_parse_options).
+        The coefficients are shared with self, so don't modify them.
+        """
+
+        def select_mos(mos: List[Union[DataMO, NonPrintedMO]], is_electronic: bool) -> List[Union[DataMO, NonPrintedMO]]:
+            selected: List[Union[DataMO, NonPrintedMO]] = []
+            for mo in mos:
+                if isinstance(mo, NonPrintedMO):
+                    # The MOs outside the .PRIVEC range are written only for dcaspt2_input_generator
+                    if options.for_generator:
+                        selected.append(NonPrintedMO(mo.sym_type, mo.eigenvalue_no, mo.mo_energy, options.compress))
+                elif options.compress == self.options.compress:
+                    selected.append(mo)
+                else:
+                    mo = copy.copy(mo)
+                    mo.mo_info = get_mo_info(mo.sym_type, mo.eigenvalue_no, is_electronic, options.compress)
+                    selected.append(mo)
+            if not options.no_sort:
+                selected.sort(key=lambda mo: mo.mo_energy)
+            return selected
+
+        data_all_mo = DataAllMO()
+        if options.should_write_electronic():
+            data_all_mo.electronic = select_mos(self.data_all_mo.electronic, is_electronic=True)
+        if options.should_write_positronic():
+            data_all_mo.positronic = select_mos(self.data_all_mo.positronic, is_electronic=False)
+        return Result(options, self.header_info, data_all_mo)
+
+    def write(self, output_path: Union[str, Path], group_by: str = "label") -> None:
+        """Write the result to output_path in the same format as the sum_dirac_dfcoef command.
+
+        Args:
+            output_path (Union[str, Path]): File path of the sum_dirac_dfcoef output
+            group_by (str): Level of --group-by option (one of GROUP_BY_LEVELS) used to group the coefficients.
+                            The result can be written with each level without reading the DIRAC output again.
+        """
+        output_file_writer = OutputFileWriter(Path(output_path), self.options, group_by)
+        output_file_writer.create_blank_file()
+        # Write the header information to the output file.
+        if self.options.for_generator:
+            output_file_writer.write_headerinfo(self.header_info)
+        else:
+            # If the output file is not for dcaspt2_input_generator, don't write header information.
+            output_file_writer.write_no_header_info()
+
+        # Write the MO data to the output file.
+        if self.options.header_only:
+            return
+        if self.options.should_write_electronic():
+            output_file_writer.write_mo_data(self.data_all_mo.electronic)
+        if self.options.should_write_positronic():
+            output_file_writer.write_mo_data(self.data_all_mo.positronic)
+
+
+def summarize(dirac_filepath: Union[str, Path, IO[str]], options: Optional[Options] = None, checkpoint_path: Optional[Path] = None) -> Result:
+    """Summarize the coefficients of the Vector print section of a DIRAC output.
+
+    This function doesn't read sys.argv and doesn't write any file except the checkpoint,
+    so it can be called many times in the same process with different options.
+    gzip, bz2 and xz compressed DIRAC outputs are decompressed while reading.
+
+    Args:
+        dirac_filepath (Union[str, Path, IO[str]]): File path of the DIRAC output,
+            or the seekable DIRAC output opened in text mode (e.g. a member of a tar archive read into memory)
+        options (Optional[Options]): Options of sum_dirac_dfcoef. Default: Options()
+        checkpoint_path (Optional[Path]): File path of the checkpoint used by options.checkpoint_interval and options.resume
+
+    Raises:
+        FileNotFoundError: If dirac_filepath is not found
+        ValueError: If options.checkpoint_interval or options.resume is set without checkpoint_path,
+            or options.follow, options.checkpoint_interval or options.resume is set for the compressed DIRAC output or the text stream
+
+    Returns:
+        Result: Summarized coefficients
+    """
+    options = Options() if options is None else options
+    # dirac_output_stream is None if the DIRAC output is given by the file path
+    dirac_output_stream: Optional[IO[str]] = None
+    if isinstance(dirac_filepath, (str, Path)):
+        dirac_filepath = resolve_dirac_filepath(dirac_filepath)
+        if (options.checkpoint_interval > 0 or options.resume) and checkpoint_path is None:
+            msg = "checkpoint_path is required to use options.checkpoint_interval or options.resume."
+            raise ValueError(msg)
+        if (options.follow or options.checkpoint_interval > 0 or options.resume) and get_compression(dirac_filepath) is not None:
+            # These options need the byte offset of the DIRAC output, which cannot be used to seek in the compressed file
+            msg = "--follow, --checkpoint-interval and --resume options cannot be used with the compressed DIRAC output. Please decompress it first."
+            raise ValueError(msg)
+    else:
+        dirac_output_stream = dirac_filepath
+        if options.follow or options.checkpoint_interval > 0 or options.resume:
+            # These options need the file path of the DIRAC output
+            msg = "--follow, --checkpoint-interval and --resume options cannot be used with the DIRAC output given as a text stream."
+            raise ValueError(msg)
+
+    if options.follow and isinstance(dirac_filepath, Path):
+        # Follow the DIRAC output that is still being written and print each MO as soon as it is completed.
+        follower = DiracOutputFollower(dirac_filepath, options)
+        privec_processor = follower.follow()
+        privec_processor.complete_data_all_mo()
+        return create_result(options, follower.header_info, privec_processor.data_all_mo)
+
+    # With -g and -j/--parallel, the header information is read by another process of the process pool while the Vector print section is read.
+    # (--moltra-active-only needs the header information before reading the Vector print section,
+    #  and the text stream cannot be read by another process)
+    read_header_concurrently = (
+        dirac_output_stream is None and options.for_generator and options.parallel > 1 and not options.moltra_active_only and not options.header_only
+    )
+    with concurrent.futures.ProcessPoolExecutor(max_workers=options.parallel + 1) if read_header_concurrently else contextlib.nullcontext() as executor:
+        header_future = None if executor is None else executor.submit(read_header_info_file, dirac_filepath)
+        with open_dirac_output(dirac_filepath) if dirac_output_stream is None else contextlib.nullcontext(dirac_output_stream) as dirac_output:
+            header_info = HeaderInfo()
+            if (options.for_generator or options.header_only) and header_future is None:
+                header_info.read_header_info(dirac_output)
+            if options.header_only:
+                # Don't read the Vector print section. The **MOLTRA ranges are calculated from the eigenvalues of the SCF calculation.
+                header_info.calculate_moltra_idx_range_from_eigenvalues()
+                return Result(options, header_info, DataAllMO())
+            dirac_output.seek(0)
+            functions_info = get_functions_info(dirac_output)
+
+            checkpoint = load_checkpoint(checkpoint_path, dirac_filepath, options) if options.resume and checkpoint_path is not None else None
+            start_byte_offset = 0 if checkpoint is None else checkpoint.byte_offset
+            dirac_output.seek(start_byte_offset)
+            dirac_output_lines = dirac_output.readlines()
+        # Read coefficients from the output file of DIRAC and store them in data_all_mo.
+        privec_processor = create_privec_processor(dirac_output_lines, functions_info, header_info, options)
+        if checkpoint is not None:
+            privec_processor.restore_checkpoint(checkpoint)
+        if options.checkpoint_interval > 0 and checkpoint_path is not None:
+            privec_processor.checkpoint_writer = CheckpointWriter(checkpoint_path, dirac_filepath, options.checkpoint_interval, start_byte_offset)
+        privec_processor.read_privec_data_wrapper(executor)
+        if header_future is not None:
+            # The eigenvalues are used only after the Vector print section has been read
+            header_info = header_future.result()
+            privec_processor.eigenvalues = header_info.eigenvalues
+    privec_processor.complete_data_all_mo()
+    if privec_processor.checkpoint_writer is not None:
+        # Keep the checkpoint if the Vector print section is not completed yet (e.g. DIRAC is still running)
+        privec_processor.checkpoint_writer.close(remove=privec_processor.stage == STAGE.END)
+    elif checkpoint is not None and checkpoint_path is not None and privec_processor.stage == STAGE.END:
+        checkpoint_path.unlink()
+
+    return create_result(options, header_info, privec_processor.data_all_mo)
+
+
+def summarize_steps(dirac_filepath: Union[str, Path, IO[str]], options: Optional[Options] = None) -> List[Result]:
+    """Summarize every Vector print section of a DIRAC output (e.g. each step of a geometry optimization or a scan).
+
+    The DIRAC output is read once and split at the start of each Vector print section.
+    The MOLTRA ranges and the number of orbitals of each step are calculated from the eigenvalues of the last SCF calculation before its Vector print section.
+    If no Vector print section is found, the whole DIRAC output is summarized as one step.
+
+    Args:
+        dirac_filepath (Union[str, Path, IO[str]]): File path of the DIRAC output, or the seekable DIRAC output opened in text mode
+        options (Optional[Options]): Options of sum_dirac_dfcoef. Default: Options(all_steps=True)
+
+    Raises:
+        FileNotFoundError: If dirac_filepath is not found
+
+    Returns:
+        List[Result]: Summarized coefficients of each step in the order of the DIRAC output
+    """
+    options = Options(all_steps=True) if options is None else options
+    if isinstance(dirac_filepath, (str, Path)):
+        with open_dirac_output(resolve_dirac_filepath(dirac_filepath)) as dirac_output:
+            base_header_info, functions_info, dirac_output_lines = read_dirac_output(dirac_output, options)
+    else:
+        base_header_info, functions_info, dirac_output_lines = read_dirac_output(dirac_filepath, options)
+
+    vector_print_idxs = [
+        line_idx
+        for line_idx, line_str in enumerate(dirac_output_lines)
+        if "Vector print" in line_str and PrivecProcessor.check_start_vector_print(space_separated_parsing(line_str))
+    ]
+    step_start_idxs = vector_print_idxs if len(vector_print_idxs) > 0 else [0]
+    step_end_idxs = step_start_idxs[1:] + [len(dirac_output_lines)]
+
+    results: List[Result] = []
+    prev_end_idx = 0
+    header_info = base_header_info
+    for start_idx, end_idx in zip(step_start_idxs, step_end_idxs):
+        # The MOLTRA ranges (range_dict) are calculated for each step, so the header information is copied
+        header_info = copy.deepcopy(header_info)
+        if options.for_generator:
+            scf_idxs = [line_idx for line_idx in range(prev_end_idx, start_idx) if "SCF - CYCLE" in dirac_output_lines[line_idx]]
+            if len(scf_idxs) > 0:
+                # Otherwise (no SCF calculation in this step) the eigenvalues of the previous step are used
+                header_info.eigenvalues = Eigenvalues()
+                header_info.eigenvalues.get_eigenvalues(dirac_output_lines[scf_idxs[-1] : start_idx])
+            else:
+                header_info.eigenvalues.reset_energies_used()
+        privec_processor = create_privec_processor(dirac_output_lines[start_idx:end_idx], functions_info, header_info, options)
+        privec_processor.read_privec_data_wrapper()
+        privec_processor.complete_data_all_mo()
+        results.append(create_result(options, header_info, privec_processor.data_all_mo))
+        prev_end_idx = start_idx
+    return results
+
+
+def create_privec_processor(dirac_output_lines: List[str], functions_info: FunctionsInfo, header_info: HeaderInfo, options: Options) -> PrivecProcessor:
+    """Create PrivecProcessor to read the Vector print section in dirac_output_lines (shared by summarize and summarize_steps)."""
+    privec_processor = PrivecProcessor(dirac_output_lines, functions_info, header_info.eigenvalues, options)
+    if options.moltra_active_only:
+        privec_processor.moltra_mo_range = header_info.get_moltra_mo_range(options.moltra_margin)
+    return privec_processor
+
+
+def read_dirac_output(dirac_output: IO[str], options: Options) -> Tuple[HeaderInfo, FunctionsInfo, List[str]]:
+    """Read the header information (only if options.for_generator is True), the functions information and all lines of the DIRAC output."""
+    header_info = HeaderInfo()
+    if options.for_generator:
+        header_info.read_header_info(dirac_output)
+    dirac_output.seek(0)
+    functions_info = get_functions_info(dirac_output)
+    dirac_output.seek(0)
+    return header_info, functions_info, dirac_output.readlines()
+
+
+def resolve_dirac_filepath(dirac_filepath: Union[str, Path]) -> Path:
+    dirac_filepath = Path(dirac_filepath).expanduser().resolve()
+    if not dirac_filepath.is_file():
+        msg = f"DIRAC output file is not found. file={dirac_filepath}"
+        raise FileNotFoundError(msg)
+    return dirac_filepath
+
+
+def read_header_info_file(dirac_filepath: Path) -> HeaderInfo:
+    # This function is called in another process with -g and -j/--parallel options, so it opens the DIRAC output by itself
+    header_info = HeaderInfo()
+    with open_dirac_output(dirac_filepath) as dirac_output:
+        header_info.read_header_info(dirac_output)
+    return header_info
+
+
+def create_result(options: Options, header_info: HeaderInfo, data_all_mo: DataAllMO) -> Result:
+    """Calculate the MOLTRA ranges and sort the MOs after all coefficients have been read."""
+    if options.for_generator:
+        header_info.calculate_moltra_idx_range(data_all_mo)
+
+    # Sort the MOs by energy.
+    if not options.no_sort:
+        data_all_mo.sort_mo_energy()
+
+    return Result(options, header_info, data_all_mo)
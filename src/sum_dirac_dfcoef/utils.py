@@ -1,8 +1,24 @@
+import logging
 import pickle
 import re
 import sys
 from pathlib import Path
-from typing import Any, List
+from typing import IO, Any, Dict, List, Optional
+
+logger = logging.getLogger("sum_dirac_dfcoef")
+
+# Magic bytes of the compressed files which can be read without decompressing them in advance
+# (key: magic bytes, value: compression format)
+COMPRESSION_MAGIC_BYTES: Dict[bytes, str] = {b"\x1f\x8b": "gzip", b"BZh": "bz2", b"\xfd7zXZ\x00": "xz"}
+# Suffixes of the output file to compress the output (key: suffix, value: compression format)
+COMPRESSION_SUFFIXES: Dict[str, str] = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+# Patterns of the DIRAC input file (compiled once because they are matched to every line of the input file)
+DIRAC_INPUT_KEYWORD_PATTERN = re.compile(r" *\.[0-9A-Z]+")
+DIRAC_INPUT_SECTION_PATTERN = re.compile(r" *\*{1,2}[0-9A-Z]+")
+DIRAC_INPUT_SECTION_ONE_STAR_PATTERN = re.compile(r" *\*[0-9A-Z]+")
+DIRAC_INPUT_SECTION_TWO_STARS_PATTERN = re.compile(r" *\*{2}[0-9A-Z]+")
+DIRAC_INPUT_COMMENT_OUT_PATTERN = re.compile(r" *[!#]")
 
 
 def space_separated_parsing(line: str) -> List[str]:
@@ -26,11 +42,20 @@ def fast_deepcopy_pickle(obj: Any) -> Any:
 
 
 def debug_print(message: str) -> None:
-    from sum_dirac_dfcoef.args import args
+    # The debug messages are printed if --debug option is used (see enable_debug_print)
+    logger.debug(message)
 
-    # print debug message if --debug option is used
-    if args.debug:
-        print(message)
+
+def enable_debug_print() -> None:
+    """Print the debug messages to stdout. (--debug option)
+
+    If you use sum_dirac_dfcoef as a library, you can also get the debug messages from the "sum_dirac_dfcoef" logger.
+    """
+    if len(logger.handlers) == 0:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
 
 
 def is_float(parameter: str) -> bool:
@@ -50,28 +75,23 @@ def is_end_dirac_input_field(line: str) -> bool:
 
 
 def is_dirac_input_keyword(word: str) -> bool:
-    regex_keyword = r" *\.[0-9A-Z]+"
-    return re.match(regex_keyword, word) is not None
+    return DIRAC_INPUT_KEYWORD_PATTERN.match(word) is not None
 
 
 def is_dirac_input_section(word: str) -> bool:
-    regex_section = r" *\*{1,2}[0-9A-Z]+"
-    return re.match(regex_section, word) is not None
+    return DIRAC_INPUT_SECTION_PATTERN.match(word) is not None
 
 
 def is_dirac_input_section_one_star(word: str) -> bool:
-    regex_section = r" *\*[0-9A-Z]+"
-    return re.match(regex_section, word) is not None
+    return DIRAC_INPUT_SECTION_ONE_STAR_PATTERN.match(word) is not None
 
 
 def is_dirac_input_section_two_stars(word: str) -> bool:
-    regex_section = r" *\*{2}[0-9A-Z]+"
-    return re.match(regex_section, word) is not None
+    return DIRAC_INPUT_SECTION_TWO_STARS_PATTERN.match(word) is not None
 
 
 def is_dirac_input_line_comment_out(word: str) -> bool:
-    regex_comment_out = r" *[!#]"
-    return re.match(regex_comment_out, word) is not None
+    return DIRAC_INPUT_COMMENT_OUT_PATTERN.match(word) is not None
 
 
 def is_dirac_input_line_should_be_skipped(words: List[str]) -> bool:
@@ -83,17 +103,14 @@ def is_dirac_input_line_should_be_skipped(words: List[str]) -> bool:
 
 
 def delete_dirac_input_comment_out(line: str) -> str:
-    regex_comment_out = r" *[!#]"
-    idx_comment_out = re.search(regex_comment_out, line)
+    idx_comment_out = DIRAC_INPUT_COMMENT_OUT_PATTERN.search(line)
     if idx_comment_out is None:
         return line
     return line[: idx_comment_out.start()]
 
 
-def get_dirac_filepath() -> Path:
-    from sum_dirac_dfcoef.args import args
-
-    input_path = Path(args.input).expanduser().resolve()
+def get_dirac_filepath(input_path_str: str) -> Path:
+    input_path = Path(input_path_str).expanduser().resolve()
     if not input_path.exists():
         sys.exit(f"ERROR: DIRAC output file is not found. file={input_path}")
     elif input_path.is_dir():
@@ -104,19 +121,40 @@ Please check your -i or --input option is correct."
     return input_path
 
 
-def should_write_positronic_results_to_file() -> bool:
-    from sum_dirac_dfcoef.args import args
+def get_compression(dirac_filepath: Path) -> Optional[str]:
+    """Get the compression format ("gzip", "bz2" or "xz") of the file from its magic bytes (None if the file is not compressed)"""
+    with open(dirac_filepath, "rb") as f:
+        head = f.read(max(len(magic_bytes) for magic_bytes in COMPRESSION_MAGIC_BYTES))
+    return next((compression for magic_bytes, compression in COMPRESSION_MAGIC_BYTES.items() if head.startswith(magic_bytes)), None)
 
-    if args.all_write or args.positronic_write:
-        return True
-    else:
-        return False
 
+def get_output_compression(output_path: Path) -> Optional[str]:
+    """Get the compression format of the output file from its suffix (e.g. sum_dirac_dfcoef.out.gz => "gzip", None if the output is not compressed)"""
+    return COMPRESSION_SUFFIXES.get(output_path.suffix.lower())
 
-def should_write_electronic_results_to_file() -> bool:
-    from sum_dirac_dfcoef.args import args
 
-    if args.all_write or not args.positronic_write:
-        return True
-    else:
-        return False
+def open_compressed_text(path: Path, mode: str, compression: Optional[str]) -> IO[str]:
+    """Open the file in text mode (mode: "r", "w" or "a"), compressed or decompressed while reading/writing if compression is set"""
+    # The compression modules are imported only when they are needed not to slow down the startup (e.g. -v and -h options)
+    if compression == "gzip":
+        import gzip
+
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    elif compression == "bz2":
+        import bz2
+
+        return bz2.open(path, mode + "t", encoding="utf-8")
+    elif compression == "xz":
+        import lzma
+
+        return lzma.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def open_dirac_output(dirac_filepath: Path) -> IO[str]:
+    """Open the DIRAC output in text mode.
+
+    gzip, bz2 and xz compressed DIRAC outputs (detected by the magic bytes, not by the suffix)
+    are decompressed while reading, so they don't need to be decompressed in advance.
+    """
+    return open_compressed_text(dirac_filepath, "r", get_compression(dirac_filepath))
@@ -1,8 +1,10 @@
 import os
 import re
 import subprocess
+import sys
+import time
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, List
 
 import pytest
 
@@ -45,6 +47,9 @@ def get_output_list(filepath: Path) -> List[List[str]]:
         ("ref.methane.whitespace.compress.out"      , "result.methane.whitespace.compress.out"      , "methane.whitespace_mol.out"   , "-d 15 -c"),
         # multiprocess (should be the same as the single process case)
         ("ref.ucl4.compress.out"                    , "result.ucl4.compress.multi-process.out"      , "x2c_ucl4.out"                 , "-j2 -d 15 -g"),
+        ("ref.uo2.compress.out"                     , "result.uo2.compress.multi-process.out"       , "x2c_uo2_238.out"              , "-j2 -d 15 -g"),
+        # follow mode with a completed DIRAC output (should be the same as the normal case)
+        ("ref.uo2.compress.out"                     , "result.uo2.compress.follow.out"              , "x2c_uo2_238.out"              , "--follow -d 15 -g"),
         # DIRAC 19 UO2 x2c (https://github.com/RQC-HU/sum_dirac_dfcoef/issues/93#issue-2164290127)
         ("ref.uo2.compress.out"                     , "result.uo2.compress.out"                     , "x2c_uo2_238.out"              , "-d 15 -g"),
         # DIRAC 19 N2 4component (https://github.com/RQC-HU/sum_dirac_dfcoef/issues/93#issuecomment-1976947902)
@@ -58,6 +63,7 @@ def get_output_list(filepath: Path) -> List[List[str]]:
         ("ref.N2.scheme6.dirac23.compress.out"      , "result.N2.scheme6.dirac23.compress.out"      , "dirac23_scheme6_N2.out"       , "-d 15 -g"),
         # Ignore magnetic quantum number label (https://github.com/RQC-HU/sum_dirac_dfcoef/issues/115)
         ("ref.ucl4.ignore_ml.compress.out"          , "result.ucl4.ignore_ml.compress.out"          , "x2c_ucl4.out"                 , "-d 15 -g --ignore-ml"),
+        ("ref.uo2.ignore_ml.compress.out"           , "result.uo2.ignore_ml.compress.out"           , "x2c_uo2_238.out"              , "-d 15 -c --ignore-ml"),
         # Ignore symmetry label (https://github.com/RQC-HU/sum_dirac_dfcoef/issues/117)
         ("ref.uo2.ignore_sym.compress.out"          , "result.uo2.ignore_sym.compress.out"          , "x2c_uo2_238.out"              , "-d 15 -c --ignore-sym"),
         # Ignore atom num label (https://github.com/RQC-HU/sum_dirac_dfcoef/issues/123)
@@ -168,6 +174,11 @@ def test_sum_dirac_dfcoeff(ref_filename: str, result_filename: str, input_filena
         ("H2.noscf_H2.out"         , "-g -d 15"    , "Cannot find SCF calculation settings"),
         ("Ar_Ar.out"               , "-g --no-scf" , "-g/--for-generator and --no-scf options cannot be set at the same time"),
         ("Ar_Ar.out"               , "-g -p"       , "-g/--for-generator and -p/--positronic-write options cannot be set at the same time"),
+        ("Ar_Ar.out"               , "--mo-range E1g:3" , "--mo-range must be written in the format of SYM:FIRST..LAST"),
+        ("Ar_Ar.out"               , "--energy-window 1.0 -1.0" , "--energy-window EMIN must be smaller than or equal to EMAX"),
+        ("Ar_Ar.out"               , "--header-only" , "--header-only option can be used only with -g/--for-generator option"),
+        ("Ar_Ar.out"               , "--shells sp" , "--shells must be comma separated azimuthal labels"),
+        ("Ar_Ar.out"               , "--all-steps --header-only -g" , "--all-steps option cannot be used with --follow, --checkpoint-interval, --resume and --header-only options"),
     ],
     # fmt: on
 )
@@ -227,6 +238,400 @@ def test_no_vector_print_data(ref_filename: str, result_filename: str, input_fil
                     ), f"Contribution of the AO in the MO in line {line_idx} of {ref_filename} and {result_filename} are different."
 
 
+def test_follow_growing_file():
+    env = Env("x2c_uo2_238.out", "", "ref.uo2.compress.out", "result.uo2.compress.follow_growing.out")
+    os.chdir(env.test_path)
+    growing_filepath = Path.joinpath(env.test_path, "results", "result.growing_x2c_uo2_238.out")
+    content = open(env.input_filepath, encoding="utf-8").read()
+    # Write the output of DIRAC until the middle of the Vector print section
+    written = content.index("* Vector print *") + 20000
+    with open(growing_filepath, "w", encoding="utf-8") as f:
+        f.write(content[:written])
+    command = f"sum_dirac_dfcoef -i {growing_filepath} -o {env.result_filepath} -d 15 -g --follow --follow-interval 0.05"
+    print(f"{env.test_path} test start...\ncommand: {command}")
+    p = subprocess.Popen(command.split(), encoding="utf-8", stdout=subprocess.PIPE)
+    while written < len(content):
+        with open(growing_filepath, "a", encoding="utf-8") as f:
+            f.write(content[written : written + 10000])
+        written += 10000
+        time.sleep(0.01)
+    stdout, _ = p.communicate(timeout=60)
+    assert p.returncode == 0
+    # Completed MOs are printed to stdout
+    assert "E1g 17 " in stdout
+
+    # The output file should be the same as the result of the completed DIRAC output
+    no_follow_filepath = Path.joinpath(env.test_path, "results", "result.uo2.compress.no_follow.out")
+    ref_command = f"sum_dirac_dfcoef -i {env.input_filepath} -o {no_follow_filepath} -d 15 -g"
+    subprocess.run(ref_command.split(), encoding="utf-8", check=True)
+    assert open(env.result_filepath).read() == open(no_follow_filepath).read()
+
+
+def start_follow(dirac_filepath: Path, output_filepath: Path) -> "subprocess.Popen[str]":
+    command = f"sum_dirac_dfcoef -i {dirac_filepath} -o {output_filepath} -d 15 -g --follow --follow-interval 0.05"
+    p = subprocess.Popen(command.split(), encoding="utf-8", stdout=subprocess.PIPE)
+    assert p.stdout is not None
+    # Wait until the first completed MO is printed (all lines written so far have been read)
+    for line in p.stdout:
+        if re.match(r"E1[gu] [0-9]+ ", line):
+            break
+    return p
+
+
+def test_follow_truncated_file(tmp_path: Path):
+    input_filepath = Path(__file__).resolve().parent / "data" / "x2c_uo2_238.out"
+    content = input_filepath.read_text(encoding="utf-8")
+    growing_filepath = tmp_path / "growing.out"
+    written = content.index("* Vector print *") + 20000
+    growing_filepath.write_text(content[:written], encoding="utf-8")
+    p = start_follow(growing_filepath, tmp_path / "result.out")
+    # The last lines of the MO being read are truncated and written again
+    truncated = content.rfind("\n", 0, content.rfind("\n", 0, written - 1)) + 1
+    with open(growing_filepath, "r+", encoding="utf-8") as f:
+        f.truncate(truncated)
+    time.sleep(1)  # The truncation is detected before the file grows again
+    with open(growing_filepath, "a", encoding="utf-8") as f:
+        f.write(content[truncated:])
+    stdout, _ = p.communicate(timeout=60)
+    assert p.returncode == 0
+    # Reading restarts after the last completed MO, so no MO is printed twice
+    printed_mos = [tuple(line.split()[:2]) for line in stdout.splitlines() if re.match(r"E1[gu] [0-9]+ ", line)]
+    assert len(printed_mos) == len(set(printed_mos))
+
+    subprocess.run(f"sum_dirac_dfcoef -i {input_filepath} -o {tmp_path / 'ref.out'} -d 15 -g".split(), encoding="utf-8", check=True)
+    assert (tmp_path / "result.out").read_text() == (tmp_path / "ref.out").read_text()
+
+
+def test_follow_rotated_file(tmp_path: Path):
+    data_path = Path(__file__).resolve().parent / "data"
+    content = (data_path / "x2c_uo2_238.out").read_text(encoding="utf-8")
+    growing_filepath = tmp_path / "growing.out"
+    growing_filepath.write_text(content[: content.index("* Vector print *") + 20000], encoding="utf-8")
+    p = start_follow(growing_filepath, tmp_path / "result.out")
+    # The DIRAC output is rotated and a new DIRAC run (another molecule) is written to the same path
+    growing_filepath.rename(tmp_path / "growing.out.1")
+    growing_filepath.write_text((data_path / "N2_N2.out").read_text(encoding="utf-8"), encoding="utf-8")
+    p.communicate(timeout=60)
+    assert p.returncode == 0
+
+    # The header and the MOs are read from the new DIRAC output only
+    subprocess.run(f"sum_dirac_dfcoef -i {data_path / 'N2_N2.out'} -o {tmp_path / 'ref.out'} -d 15 -g".split(), encoding="utf-8", check=True)
+    assert (tmp_path / "result.out").read_text() == (tmp_path / "ref.out").read_text()
+
+
+def test_resume_from_checkpoint():
+    env = Env("x2c_uo2_238.out", "", "ref.uo2.compress.out", "result.uo2.compress.resume.out")
+    os.chdir(env.test_path)
+    interrupted_filepath = Path.joinpath(env.test_path, "results", "result.interrupted_x2c_uo2_238.out")
+    checkpoint_filepath = Path(f"{env.result_filepath}.checkpoint")
+    content = open(env.input_filepath, encoding="utf-8").read()
+    # The DIRAC output is interrupted in the middle of the Vector print section
+    interrupted_idx = content.index("* Vector print *") + 20000
+    with open(interrupted_filepath, "w", encoding="utf-8") as f:
+        f.write(content[:interrupted_idx])
+    command = f"sum_dirac_dfcoef -i {interrupted_filepath} -o {env.result_filepath} -d 15 -g --checkpoint-interval 1e-9"
+    print(f"{env.test_path} test start...\ncommand: {command}")
+    subprocess.run(command.split(), encoding="utf-8", check=True)
+    assert checkpoint_filepath.exists(), "The checkpoint should be kept because the Vector print section is not completed."
+
+    with open(interrupted_filepath, "a", encoding="utf-8") as f:
+        f.write(content[interrupted_idx:])
+    command = f"sum_dirac_dfcoef -i {interrupted_filepath} -o {env.result_filepath} -d 15 -g --resume --debug"
+    p = subprocess.run(command.split(), encoding="utf-8", check=True, stdout=subprocess.PIPE)
+    assert "Resume from PrivecCheckpoint" in p.stdout
+    assert not checkpoint_filepath.exists(), "The checkpoint should be removed after the Vector print section is completed."
+
+    # The result should be the same as the result without interruption
+    no_interruption_filepath = Path.joinpath(env.test_path, "results", "result.uo2.compress.no_interruption.out")
+    ref_command = f"sum_dirac_dfcoef -i {env.input_filepath} -o {no_interruption_filepath} -d 15 -g"
+    subprocess.run(ref_command.split(), encoding="utf-8", check=True)
+    assert open(env.result_filepath).read() == open(no_interruption_filepath).read()
+
+
+def test_batch_mode(tmp_path: Path):
+    test_path = Path(__file__).resolve().parent
+    input_filenames = ["N2_N2.out", "dirac19_N2_N2.out", "x2c_uo2_238.out"]
+    command = f"sum_dirac_dfcoef batch {test_path / 'data' / '*N2_N2.out'} {test_path / 'data' / 'x2c_uo2_238.out'} -o {tmp_path} -j 2 -d 15 -g"
+    print(f"{test_path} test start...\ncommand: {command}")
+    subprocess.run(command.split(), encoding="utf-8", check=True)
+
+    # The results should be the same as the results of the single-file mode
+    for input_filename in input_filenames:
+        env = Env(input_filename, "-d 15 -g", "dummy", f"result.batch.single.{Path(input_filename).stem}.out")
+        subprocess.run(env.command.split(), encoding="utf-8", check=True)
+        batch_result_filepath = tmp_path / f"{Path(input_filename).stem}.sum_dirac_dfcoef.out"
+        assert open(batch_result_filepath).read() == open(env.result_filepath).read()
+
+
+def test_batch_mode_continue_after_error(tmp_path: Path):
+    test_path = Path(__file__).resolve().parent
+    broken_filepath = tmp_path / "broken.out"
+    broken_filepath.write_text("This is not a DIRAC output.\n")
+    command = f"sum_dirac_dfcoef batch {broken_filepath} {test_path / 'data' / 'N2_N2.out'} -o {tmp_path} -d 15 -g"
+    p = subprocess.run(command.split(), encoding="utf-8", stderr=subprocess.PIPE)
+    assert p.returncode != 0
+    assert f"Failed to summarize {broken_filepath}" in p.stderr
+    assert (tmp_path / "N2_N2.sum_dirac_dfcoef.out").exists()
+
+
+@pytest.mark.parametrize("archive_name, mode, parallel", [("campaign.tar", "w", "-j 1"), ("campaign.tar.gz", "w:gz", "-j 2")])
+def test_batch_mode_tar_archive(tmp_path: Path, archive_name: str, mode: str, parallel: str):
+    # The *.out members of the tar archive are summarized without extracting them, and the other members are skipped
+    import tarfile
+
+    test_path = Path(__file__).resolve().parent
+    archive_filepath = tmp_path / archive_name
+    with tarfile.open(archive_filepath, mode) as tar:
+        tar.add(test_path / "data" / "N2_N2.out", arcname="N2/N2_N2.out")
+        tar.add(test_path / "data" / "x2c_uo2_238.out", arcname="UO2/x2c_uo2_238.out")
+        tar.add(test_path / "data" / "N2_N2.out", arcname="N2/N2_N2.inp")
+        tar.add(test_path / "data" / "CO_CO.out", arcname="CO/N2_N2.out")  # the same output name as N2/N2_N2.out
+    output_dir = tmp_path / "outputs"
+    command = f"sum_dirac_dfcoef batch {archive_filepath} -o {output_dir} {parallel} -d 15 -g"
+    p = subprocess.run(command.split(), encoding="utf-8", stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    assert p.returncode != 0
+    assert f"Failed to summarize {archive_filepath}:CO/N2_N2.out" in p.stderr
+    assert f"{archive_filepath}:UO2/x2c_uo2_238.out => {output_dir / 'x2c_uo2_238.sum_dirac_dfcoef.out'}" in p.stdout
+
+    assert sorted(path.name for path in output_dir.iterdir()) == ["N2_N2.sum_dirac_dfcoef.out", "x2c_uo2_238.sum_dirac_dfcoef.out"]
+    for input_filename in ("N2_N2.out", "x2c_uo2_238.out"):
+        ref_filepath = tmp_path / f"ref.{input_filename}"
+        subprocess.run(f"sum_dirac_dfcoef -i {test_path / 'data' / input_filename} -o {ref_filepath} -d 15 -g".split(), encoding="utf-8", check=True)
+        assert (output_dir / f"{Path(input_filename).stem}.sum_dirac_dfcoef.out").read_text() == ref_filepath.read_text()
+
+
+@pytest.mark.parametrize(
+    "options, expected_mo_num",
+    # fmt: off
+    [
+        ("--energy-window -2.0 0.5"            , 15),
+        ("--mo-range E1g:3..5 E1u:2..2"        , 4),
+        ("--symmetry E1u"                      , 48),
+        ("-a --mo-range E1g:1..2 E1g:10..10"   , 6),
+    ],
+    # fmt: on
+)
+def test_mo_selection_filters(tmp_path: Path, options: str, expected_mo_num: int):
+    # The selected MOs must be the same as the MOs in the result without the filters
+    def get_mo_blocks(filepath: Path) -> List[str]:
+        return [block.strip() for block in open(filepath).read().split("\n\n") if " no. " in block]
+
+    input_filepath = Path(__file__).resolve().parent / "data" / "N2_N2.out"
+    all_filepath = tmp_path / "all.out"
+    subprocess.run(f"sum_dirac_dfcoef -i {input_filepath} -o {all_filepath} -a -d 15".split(), encoding="utf-8", check=True)
+    filtered_filepath = tmp_path / "filtered.out"
+    subprocess.run(f"sum_dirac_dfcoef -i {input_filepath} -o {filtered_filepath} -d 15 {options}".split(), encoding="utf-8", check=True)
+
+    all_blocks = get_mo_blocks(all_filepath)
+    filtered_blocks = get_mo_blocks(filtered_filepath)
+    assert len(filtered_blocks) == expected_mo_num
+    assert all(block in all_blocks for block in filtered_blocks)
+
+
+def test_moltra_active_only(tmp_path: Path):
+    input_filepath = Path(__file__).resolve().parent / "data" / "N2_N2.out"
+    results = {}
+    for name, options in (("full", "-g"), ("active", "-g --moltra-active-only"), ("margin", "-g --moltra-active-only --moltra-margin 5")):
+        result_filepath = tmp_path / f"{name}.out"
+        subprocess.run(f"sum_dirac_dfcoef -i {input_filepath} -o {result_filepath} -d 15 {options}".split(), encoding="utf-8", check=True)
+        results[name] = open(result_filepath).read().splitlines()
+
+    # The header information and the MOs within **MOLTRA > .ACTIVE (E1g 1..43, E1u 1..43) are the same as the full result,
+    # and the MOs outside the ranges are written without coefficients.
+    assert results["active"][:3] == results["full"][:3]
+    assert len(results["active"]) == len(results["full"])
+    for full_line, active_line in zip(results["full"], results["active"]):
+        if full_line != active_line:
+            assert int(active_line.split()[1]) > 43
+            assert len(active_line.split()) == 3
+    # The margin covers the MOs outside the ranges
+    assert results["margin"] == results["full"]
+
+
+@pytest.mark.parametrize("input_filename", ["x2c_uo2_238.out", "N2_N2.out", "dirac23_scheme6_N2.out"])
+def test_header_only(tmp_path: Path, input_filename: str):
+    # The output of --header-only must be the same as the header information of -g output
+    input_filepath = Path(__file__).resolve().parent / "data" / input_filename
+    full_filepath = tmp_path / "full.out"
+    header_filepath = tmp_path / "header.out"
+    subprocess.run(f"sum_dirac_dfcoef -i {input_filepath} -o {full_filepath} -g".split(), encoding="utf-8", check=True)
+    subprocess.run(f"sum_dirac_dfcoef -i {input_filepath} -o {header_filepath} -g --header-only".split(), encoding="utf-8", check=True)
+    assert open(header_filepath).read().splitlines() == open(full_filepath).read().splitlines()[:3]
+
+
+@pytest.mark.parametrize(
+    "options, label_regex",
+    # fmt: off
+    [
+        ("--atoms U"             , r"[A-Z][0-9a-z]*U"),
+        ("--shells f,p"          , r"[A-Z][0-9a-z]*(U|O)[fp]"),
+        ("--atoms U --shells f"  , r"[A-Z][0-9a-z]*Uf"),
+    ],
+    # fmt: on
+)
+def test_atomic_orbital_filters(tmp_path: Path, options: str, label_regex: str):
+    # The filtered coefficients must be the same as the coefficients without the filters (the normalization constant is not changed)
+    input_filepath = Path(__file__).resolve().parent / "data" / "x2c_uo2_238.out"
+    full_filepath = tmp_path / "full.out"
+    filtered_filepath = tmp_path / "filtered.out"
+    subprocess.run(f"sum_dirac_dfcoef -i {input_filepath} -o {full_filepath} -d 15 -c -t 0".split(), encoding="utf-8", check=True)
+    subprocess.run(f"sum_dirac_dfcoef -i {input_filepath} -o {filtered_filepath} -d 15 -c -t 0 {options}".split(), encoding="utf-8", check=True)
+
+    full_lines = open(full_filepath).read().splitlines()
+    filtered_lines = open(filtered_filepath).read().splitlines()
+    assert len(full_lines) == len(filtered_lines)
+    for full_line, filtered_line in zip(full_lines[3:], filtered_lines[3:]):
+        full_words, filtered_words = full_line.split(), filtered_line.split()
+        assert full_words[:3] == filtered_words[:3]
+        expected = [(label, value) for label, value in zip(full_words[3::2], full_words[4::2]) if re.match(label_regex, label)]
+        assert list(zip(filtered_words[3::2], filtered_words[4::2])) == expected
+
+
+@pytest.mark.parametrize(
+    "ref_filename, options",
+    [
+        ("ref.uo2.ignore_atom_num.compress.out", "-d 15 -c --ignore-atom-num"),
+        ("ref.uo2.ignore_all.compress.out", "-d 15 -c --ignore-ml --ignore-sym --ignore-atom-num"),
+    ],
+)
+def test_ignore_atom_num_same_as_each_atom(tmp_path: Path, ref_filename: str, options: str):
+    # The symmetry-equivalent atoms are stored once with the multiplicity,
+    # but the grouped coefficients must be exactly the same as adding the coefficient of each atom (the references are written in this way)
+    input_filepath = Path(__file__).resolve().parent / "data" / "x2c_uo2_238.out"
+    ref_filepath = Path(__file__).resolve().parent / "references" / ref_filename
+    subprocess.run(f"sum_dirac_dfcoef -i {input_filepath} -o {tmp_path / 'result.out'} {options}".split(), encoding="utf-8", check=True)
+    assert (tmp_path / "result.out").read_text() == ref_filepath.read_text()
+
+
+@pytest.mark.parametrize("options", ["-g", "-a"])
+def test_all_steps(tmp_path: Path, options: str):
+    # A DIRAC output with two SCF calculations and Vector print sections (like a geometry scan with the same basis)
+    single_filepath = Path(__file__).resolve().parent / "data" / "x2c_uo2_238.out"
+    input_filepath = tmp_path / "two_steps.out"
+    input_filepath.write_text(single_filepath.read_text() * 2)
+    ref_filepath = tmp_path / "ref.out"
+    subprocess.run(f"sum_dirac_dfcoef -i {single_filepath} -o {ref_filepath} {options}".split(), encoding="utf-8", check=True)
+    subprocess.run(f"sum_dirac_dfcoef -i {input_filepath} -o {tmp_path / 'result.out'} {options} --all-steps".split(), encoding="utf-8", check=True)
+
+    assert not (tmp_path / "result.out").exists()
+    assert not (tmp_path / "result.step3.out").exists()
+    for step in (1, 2):
+        assert (tmp_path / f"result.step{step}.out").read_text() == ref_filepath.read_text()
+
+
+def test_compressed_dirac_output(tmp_path: Path):
+    # gzip, bz2 and xz compressed DIRAC outputs are detected by the magic bytes (not by the suffix) and give the same result as the plain DIRAC output
+    import bz2
+    import gzip
+    import lzma
+
+    plain_filepath = Path(__file__).resolve().parent / "data" / "x2c_uo2_238.out"
+    ref_filepath = tmp_path / "ref.out"
+    subprocess.run(f"sum_dirac_dfcoef -i {plain_filepath} -o {ref_filepath} -d 15 -g".split(), encoding="utf-8", check=True)
+    for name, compress in (("uo2.out.gz", gzip.compress), ("uo2.out.bz2", bz2.compress), ("uo2.xz.out", lzma.compress)):
+        input_filepath = tmp_path / name
+        input_filepath.write_bytes(compress(plain_filepath.read_bytes()))
+        result_filepath = tmp_path / f"result.{input_filepath.stem}.out"
+        subprocess.run(f"sum_dirac_dfcoef -i {input_filepath} -o {result_filepath} -d 15 -g".split(), encoding="utf-8", check=True)
+        assert result_filepath.read_text() == ref_filepath.read_text()
+
+    # The output is compressed if its path ends with .gz, .bz2 or .xz
+    compressed_result_filepath = tmp_path / "result.out.gz"
+    subprocess.run(f"sum_dirac_dfcoef -i {tmp_path / 'uo2.out.bz2'} -o {compressed_result_filepath} -d 15 -g".split(), encoding="utf-8", check=True)
+    assert gzip.decompress(compressed_result_filepath.read_bytes()).decode("utf-8") == ref_filepath.read_text()
+
+    # --follow, --checkpoint-interval and --resume options need the byte offset of the plain DIRAC output
+    process = subprocess.run(f"sum_dirac_dfcoef -i {tmp_path / 'uo2.out.gz'} -o {tmp_path / 'follow.out'} --follow".split(), encoding="utf-8", capture_output=True)
+    assert process.returncode != 0
+    assert "cannot be used with the compressed DIRAC output" in process.stderr
+
+
+def test_group_by(tmp_path: Path):
+    # All levels are written from the same coefficients, and each level is the sum of the finer level
+    def get_mo_percentages(filepath: Path) -> List[Dict[str, float]]:
+        # -c format: "SYM NO ENERGY LABEL PERCENTAGE LABEL PERCENTAGE ..." after the header lines and a blank line
+        mo_lines = [line.split()[3:] for line in filepath.read_text().split("\n\n", 1)[1].splitlines() if line.strip() != ""]
+        return [{words[i]: float(words[i + 1]) for i in range(0, len(words), 2)} for words in mo_lines]
+
+    def sum_by(percentages: Dict[str, float], get_label: Callable[[str], str]) -> Dict[str, float]:
+        summed: Dict[str, float] = {}
+        for label, percentage in percentages.items():
+            summed[get_label(label)] = summed.get(get_label(label), 0.0) + percentage
+        return summed
+
+    input_filepath = Path(__file__).resolve().parent / "data" / "x2c_uo2_238.out"
+    subprocess.run(f"sum_dirac_dfcoef -i {input_filepath} -o {tmp_path / 'result.out'} -c -t 0 -d 15 --group-by label,atom+shell,atom,shell".split(), encoding="utf-8", check=True)
+    assert not (tmp_path / "result.out").exists()
+    subprocess.run(f"sum_dirac_dfcoef -i {input_filepath} -o {tmp_path / 'ref.out'} -c -t 0 -d 15".split(), encoding="utf-8", check=True)
+    assert (tmp_path / "result.label.out").read_text() == (tmp_path / "ref.out").read_text()
+    subprocess.run(f"sum_dirac_dfcoef -i {input_filepath} -o {tmp_path / 'ref.ignore.out'} -c -t 0 -d 15 --ignore-sym --ignore-ml".split(), encoding="utf-8", check=True)
+    assert (tmp_path / "result.atom+shell.out").read_text() == (tmp_path / "ref.ignore.out").read_text()
+
+    # The labels of atom+shell are like Uf or Op(1) (U and O are one-character atom labels)
+    atom_shell_mos = get_mo_percentages(tmp_path / "result.atom+shell.out")
+    atom_mos = get_mo_percentages(tmp_path / "result.atom.out")
+    shell_mos = get_mo_percentages(tmp_path / "result.shell.out")
+    assert len(atom_shell_mos) == len(atom_mos) == len(shell_mos) > 0
+    for atom_shell, atom, shell in zip(atom_shell_mos, atom_mos, shell_mos):
+        assert atom == pytest.approx(sum_by(atom_shell, lambda label: label[0] + label[2:]), abs=1e-10)
+        assert shell == pytest.approx(sum_by(atom_shell, lambda label: label[1]), abs=1e-10)
+
+
+def test_variants(tmp_path: Path):
+    # All variants are written from one parse and must be the same as the results of the separate runs
+    input_filepath = Path(__file__).resolve().parent / "data" / "x2c_uo2_238.out"
+    variant_options = {"compress.out": "-c", "generator.out": "-g -d 15", "threshold.out": "-t 1.0 --no-sort", "all.out": "-a -d 3", "positronic.out": "-p"}
+    variant_args = [f"--variant={tmp_path / name}={options}" for name, options in variant_options.items()]
+    subprocess.run(["sum_dirac_dfcoef", "-i", str(input_filepath), "-o", str(tmp_path / "main.out"), "-d", "15", *variant_args], encoding="utf-8", check=True)
+
+    for name, options in {"main.out": "-d 15", **variant_options}.items():
+        ref_filepath = tmp_path / f"ref.{name}"
+        subprocess.run(f"sum_dirac_dfcoef -i {input_filepath} -o {ref_filepath} {options}".split(), encoding="utf-8", check=True)
+        assert (tmp_path / name).read_text() == ref_filepath.read_text()
+
+
+def test_library_api():
+    # Importing sum_dirac_dfcoef must not parse sys.argv, and summarize() can be called repeatedly with different options
+    from sum_dirac_dfcoef import Options, summarize
+
+    for options_str, options in (("-d 15 -g", Options(for_generator=True, decimal=15)), ("-d 15 -c --ignore-sym", Options(compress=True, decimal=15, ignore_sym=True))):
+        env = Env("x2c_uo2_238.out", options_str, "dummy", "result.uo2.library_api.out")
+        subprocess.run(env.command.split(), encoding="utf-8", check=True)
+        library_result_filepath = Path.joinpath(env.test_path, "results", "result.uo2.library_api.summarize.out")
+        summarize(env.input_filepath, options).write(library_result_filepath)
+        assert open(library_result_filepath).read() == open(env.result_filepath).read()
+
+
+def test_calculate_moltra_idx_range_after_sort():
+    # The **MOLTRA ranges must not depend on the order of the MOs (the result of summarize() is sorted by energy)
+    from sum_dirac_dfcoef import Options, summarize
+
+    input_filepath = Path(__file__).resolve().parent / "data" / "x2c_uo2_238.out"
+    result = summarize(input_filepath, Options(for_generator=True))
+    expected = dict(result.header_info.moltra_info.range_dict)
+    mo_order = [(mo.sym_type, mo.eigenvalue_no) for mo in result.data_all_mo.electronic]
+    result.header_info.calculate_moltra_idx_range(result.data_all_mo)
+    assert result.header_info.moltra_info.range_dict == expected
+    assert [(mo.sym_type, mo.eigenvalue_no) for mo in result.data_all_mo.electronic] == mo_order
+
+
+def test_read_dirac_input_deck(tmp_path: Path):
+    # The DIRAC outputs can be grouped by the input settings (comments and spaces are ignored)
+    from sum_dirac_dfcoef import read_dirac_input_deck
+
+    uo2_filepath = Path(__file__).resolve().parent / "data" / "x2c_uo2_238.out"
+    commented_filepath = tmp_path / "commented.out"
+    commented_filepath.write_text(uo2_filepath.read_text().replace(".ANALYZE", "  .ANALYZE ! analyze the MOs", 1))
+    uo2_deck = read_dirac_input_deck(uo2_filepath)
+    assert read_dirac_input_deck(uo2_filepath) is uo2_deck
+    assert read_dirac_input_deck(commented_filepath) == uo2_deck
+    assert uo2_deck.has_keyword(".SCF")
+    n2_deck = read_dirac_input_deck(Path(__file__).resolve().parent / "data" / "N2_N2.out")
+    assert n2_deck != uo2_deck
+    active = n2_deck.get_keyword(".ACTIVE", "**MOLTRA")
+    assert active is not None and active.args == ["1..43", "1..43"]
+
+
 def test_version_option():
     command = "sum_dirac_dfcoef -v"
     p = subprocess.run(command.split(), encoding="utf-8", check=True, stdout=subprocess.PIPE)
@@ -240,6 +645,24 @@ def test_version_option():
     assert out_version_str == ref_version_str
 
 
+@pytest.mark.parametrize("option", ["-v", "-h", "batch -h"])
+def test_startup_does_not_import_heavy_modules(option: str):
+    # sum_dirac_dfcoef is called many times in array jobs, so -v and -h must not import the modules to read DIRAC outputs
+    heavy_modules = ["pydantic", "sum_dirac_dfcoef.atoms", "sum_dirac_dfcoef.coefficient", "sum_dirac_dfcoef.subshell", "sum_dirac_dfcoef.summary"]
+    code = f"""
+import sys
+sys.argv = ["sum_dirac_dfcoef"] + {option.split()!r}
+from sum_dirac_dfcoef import main
+try:
+    main()
+except SystemExit:
+    pass
+print([module for module in {heavy_modules!r} if module in sys.modules], file=sys.stderr)
+"""
+    p = subprocess.run([sys.executable, "-c", code], encoding="utf-8", check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    assert p.stderr.strip().splitlines()[-1] == "[]", f"Heavy modules are imported at startup: {p.stderr}"
+
+
 def test_help_option():
     command = "sum_dirac_dfcoef -h"
     p = subprocess.run(command.split(), check=True)
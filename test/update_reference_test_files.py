@@ -15,8 +15,8 @@ def main():
     references_dir = this_file_dir / "references"
     result_list = list(results_dir.glob("result.*.out"))
     for result in result_list:
-        # if result includes "multi-process", skip it
-        if "multi-process" in str(result):
+        # if result includes "multi-process", "follow", "growing", "resume", "interrupt", "batch" or "library_api", skip it
+        if any(tag in str(result) for tag in ("multi-process", "follow", "growing", "resume", "interrupt", "batch", "library_api")):
             continue
         # replace only the first occurrence of "result" with "reference"
         ref_name = result.name.replace("result", "ref", 1)